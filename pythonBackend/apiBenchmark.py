@@ -0,0 +1,293 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Benchmark für alle Endpunkte aus backendAPI.py mit repräsentativen Abfragen.
+#
+# Ablauf:
+#   1. Werte für die Abfragen (Paper-/Autoren-IDs, Namen, Titelwörter, Tags) aus der Datenbank ziehen
+#   2. jeden Endpunkt --requests mal aufrufen (nach --warmup nicht gemessenen Aufrufen)
+#   3. optional --mixed Aufrufe im gewichteten Mix wie im Produktivbetrieb
+#   4. pro Endpunkt Durchsatz, p50/p95/p99-Latenz, Antwortgrößen und Statuscodes ausgeben
+#
+# Ziele:
+#   - ohne --url: die App läuft im Prozess (FastAPI TestClient) gegen BENCHMARK_DB;
+#     mit --mongomock statt MongoDB gegen einen In-Memory-Stand-in (Korpus wird dann immer erzeugt)
+#   - mit --url: ein laufender Server (z.B. gunicorn), Abfragewerte kommen aus MONGO_URI/--db
+# /papers/similar, /papers/semantic und /graph/* liefern 503, solange für die Datenbank kein Embedding-Index
+# bzw. Koautoren-Graph gebaut wurde (embeddingIndex.py / coauthorGraph.py mit db=<Benchmark-DB>).
+#
+# Regressionen: --json schreibt die Ergebnisse, --baseline vergleicht p95 mit einem früheren Lauf
+# und beendet sich mit Exit-Code 1, wenn ein Endpunkt mehr als --tolerance langsamer geworden ist.
+#
+# python syntheticCorpus.py --papers 20000 --drop
+# python apiBenchmark.py --requests 200 --mixed 2000 --json results.json
+# python apiBenchmark.py --url http://localhost:8000 --concurrency 8 --baseline results.json
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+BENCHMARK_DB = os.getenv("BENCHMARK_DB", "hub_benchmark")
+
+SAMPLE_SIZE = 200
+SORTS = [None, "views", "date", "relevance", "trending"]
+AUTHOR_SORTS = [None, "citations", "h_index", "hub_paper_count"]
+
+
+# ---------------------------------------
+# Abfrage-Mix
+# ---------------------------------------
+
+def load_samples(db, rng: random.Random) -> dict:
+    """Zufällige, aber echte Werte aus dem Korpus, damit die Abfragen Treffer haben."""
+    papers = list(db["papers"].aggregate([
+        {"$sample": {"size": SAMPLE_SIZE}},
+        {"$project": {"title": 1, "tag": 1, "published": 1}}
+    ]))
+    authors = list(db["authors"].aggregate([{"$sample": {"size": SAMPLE_SIZE}}, {"$project": {"name": 1}}]))
+    if not papers or not authors:
+        raise SystemExit("Keine Papers/Autoren gefunden, zuerst syntheticCorpus.py ausführen.")
+
+    words = [w for p in papers for w in (p.get("title") or "").split() if len(w) > 3 and w.isalpha()]
+    # Titelwort + Tag aus demselben Paper, damit kombinierte Suchen nicht überwiegend leer sind
+    word_tags = [(w, p["tag"]) for p in papers if p.get("tag") for w in (p.get("title") or "").split()[:1] if w.isalpha()]
+    return {
+        "paper_ids": [str(p["_id"]) for p in papers],
+        "author_ids": [str(a["_id"]) for a in authors],
+        "author_names": [a["name"] for a in authors if a.get("name")],
+        "words": words or ["learning"],
+        "word_tags": word_tags or [("learning", "ml")],
+        "tags": sorted({p["tag"] for p in papers if p.get("tag")}) or ["ml"],
+        "years": sorted({int(p["published"][:4]) for p in papers if (p.get("published") or "")[:4].isdigit()}) or [2024],
+    }
+
+
+def _paging(rng, sorts=SORTS, max_page: int = 5) -> str:
+    query = f"page={rng.randint(1, max_page)}&page_size={rng.choice([15, 15, 50])}"
+    sort = rng.choice(sorts)
+    if sort:
+        query += f"&sort={sort}&descending={rng.choice(['true', 'false'])}"
+    return query
+
+
+# name -> (Gewicht im gemischten Lauf, Funktion (rng, samples) -> Pfad)
+ENDPOINTS = {
+    "papers_all": (20, lambda r, s: f"/papers/all?{_paging(r)}"),
+    "papers_all_filtered": (8, lambda r, s: f"/papers/all?{_paging(r, max_page=1)}&year={r.choice(s['years'])}&min_citations={r.choice([0, 5, 50])}"),
+    "paper_detail": (20, lambda r, s: f"/papers/id/{r.choice(s['paper_ids'])}"),
+    "search": (10, lambda r, s: "/papers/search?title={}&tag={}&include_content=false&{}".format(*r.choice(s["word_tags"]), _paging(r, max_page=1))),
+    "search_author": (4, lambda r, s: f"/papers/search?author={r.choice(s['author_names'])}&include_content=false"),
+    "papers_author_regex": (3, lambda r, s: f"/papers/author/{r.choice(s['author_names'])}?mode=regex&{_paging(r, max_page=1)}"),
+    "papers_author_key": (5, lambda r, s: f"/papers/author/{r.choice(s['author_names'])}?mode=key&{_paging(r, max_page=1)}"),
+    "papers_tag": (4, lambda r, s: f"/papers/tag/{r.choice(s['tags'])}?{_paging(r, max_page=2)}"),
+    "papers_title": (5, lambda r, s: f"/papers/title/{r.choice(s['words'])}?include_content=false"),
+    "papers_content": (2, lambda r, s: f"/papers/content/{r.choice(s['words'])}?include_content=false&highlight=true"),
+    "papers_similar": (2, lambda r, s: f"/papers/similar/{r.choice(s['paper_ids'])}"),
+    "papers_semantic": (2, lambda r, s: f"/papers/semantic?q={r.choice(s['words'])}+{r.choice(s['words'])}"),
+    "authors": (5, lambda r, s: f"/authors?{_paging(r, AUTHOR_SORTS)}"),
+    "author_by_name": (3, lambda r, s: f"/authors/{r.choice(s['author_names'])}"),
+    "author_by_id": (3, lambda r, s: f"/authors/objnr/{r.choice(s['author_ids'])}"),
+    "graph_collaborators": (1, lambda r, s: f"/graph/collaborators/{r.choice(s['author_ids'])}"),
+    "graph_collaboration": (1, lambda r, s: f"/graph/collaboration?a={r.choice(s['author_ids'])}&b={r.choice(s['author_ids'])}"),
+    "graph_path": (1, lambda r, s: f"/graph/path?source={r.choice(s['author_ids'])}&target={r.choice(s['author_ids'])}"),
+    "graph_ego": (1, lambda r, s: f"/graph/ego/{r.choice(s['author_ids'])}"),
+    "suggest": (10, lambda r, s: f"/suggest?q={r.choice(s['words'])[:r.randint(2, 4)]}"),
+    # Exporte sind große Einzelabfragen und zählen im gemischten Lauf nicht mit
+    "export_papers": (0, lambda r, s: f"/export/papers?format=ndjson&year={r.choice(s['years'])}&fields=title,authors,citations"),
+    "export_authors": (0, lambda r, s: "/export/authors?format=ndjson"),
+    "metrics": (0, lambda r, s: "/metrics"),
+}
+
+
+# ---------------------------------------
+# Messung
+# ---------------------------------------
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-Rank-Perzentil einer sortierten Liste."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(name: str, samples: list, wall_seconds: float) -> dict:
+    latencies = sorted(s[0] for s in samples)
+    sizes = [s[1] for s in samples]
+    statuses = {}
+    for _, _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "endpoint": name,
+        "requests": len(samples),
+        "throughput": round(len(samples) / wall_seconds, 1) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_bytes": int(sum(sizes) / len(sizes)) if sizes else 0,
+        "max_bytes": max(sizes) if sizes else 0,
+        "statuses": statuses,
+    }
+
+
+def run_requests(get, paths: list, concurrency: int):
+    """Führt die Pfade aus; gibt ([(latenz_s, bytes, status)], Wall-Clock-Sekunden) zurück."""
+    def timed(path):
+        start = time.perf_counter()
+        status, size = get(path)
+        return (time.perf_counter() - start, size, status)
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        samples = [timed(p) for p in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(timed, paths))
+    return samples, time.perf_counter() - start
+
+
+def benchmark(get, samples: dict, endpoints: list, requests: int, warmup: int, mixed: int, concurrency: int, seed: int) -> list:
+    rng = random.Random(seed)
+    results = []
+    for name in endpoints:
+        _, make_path = ENDPOINTS[name]
+        run_requests(get, [make_path(rng, samples) for _ in range(warmup)], concurrency)
+        measured, wall = run_requests(get, [make_path(rng, samples) for _ in range(requests)], concurrency)
+        results.append(summarize(name, measured, wall))
+        print(f"[Benchmark] {name}: {results[-1]['p50_ms']} ms p50")
+
+    if mixed:
+        weighted = [n for n in endpoints if ENDPOINTS[n][0] > 0]
+        names = rng.choices(weighted, weights=[ENDPOINTS[n][0] for n in weighted], k=mixed)
+        measured, wall = run_requests(get, [ENDPOINTS[n][1](rng, samples) for n in names], concurrency)
+        results.append(summarize("mixed", measured, wall))
+    return results
+
+
+def print_table(results: list):
+    header = f"{'endpoint':<22}{'req':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'mean B':>10}{'max B':>10}  status"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        statuses = ",".join(f"{k}:{v}" for k, v in sorted(r["statuses"].items()))
+        print(f"{r['endpoint']:<22}{r['requests']:>6}{r['throughput']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+              f"{r['p99_ms']:>9}{r['mean_bytes']:>10}{r['max_bytes']:>10}  {statuses}")
+
+
+def compare_to_baseline(results: list, baseline_path: str, tolerance: float) -> list:
+    """Endpunkte, deren p95 mehr als tolerance (0.2 = 20 %) über der Baseline liegt."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {r["endpoint"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        before = baseline.get(r["endpoint"])
+        if before and before["p95_ms"] > 0 and r["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append((r["endpoint"], before["p95_ms"], r["p95_ms"]))
+    return regressions
+
+
+# ---------------------------------------
+# Ziele
+# ---------------------------------------
+
+def in_process_target(args):
+    """Startet backendAPI im Prozess; gibt (get, db, close) zurück."""
+    os.environ["db"] = args.db
+    if args.mongomock:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("--mongomock benötigt das Paket 'mongomock'.")
+        import pymongo
+        shared = mongomock.MongoClient()
+        # backendAPI und alle Hilfsmodule sollen denselben In-Memory-Client sehen
+        pymongo.MongoClient = lambda *a, **k: shared
+
+    from pymongo import MongoClient
+    db = MongoClient(MONGO_URI)[args.db]
+    if args.mongomock or args.generate:
+        from syntheticCorpus import generate_corpus
+        generate_corpus(db, args.papers, args.authors, args.content_size, seed=args.seed, drop=True)
+
+    import backendAPI
+    from fastapi.testclient import TestClient
+    client = TestClient(backendAPI.app)
+    client.__enter__()   # startup-Events (Suggest-Index, Graph, View-Counter, ...)
+
+    def get(path):
+        response = client.get(path)
+        return response.status_code, len(response.content)
+
+    return get, db, lambda: client.__exit__(None, None, None)
+
+
+def http_target(args):
+    import requests
+    from pymongo import MongoClient
+    session = requests.Session()
+    base = args.url.rstrip("/")
+    mongo = MongoClient(MONGO_URI)
+
+    def get(path):
+        response = session.get(base + path, timeout=120)
+        return response.status_code, len(response.content)
+
+    return get, mongo[args.db], mongo.close
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark aller API-Endpunkte gegen einen (synthetischen) Korpus.")
+    parser.add_argument("--url", default=None, help="Laufender Server; ohne --url läuft die App im Prozess")
+    parser.add_argument("--db", default=BENCHMARK_DB, help="Datenbank mit dem Korpus (Default: BENCHMARK_DB)")
+    parser.add_argument("--mongomock", action="store_true", help="In-Memory-Stand-in statt MongoDB (nur ohne --url)")
+    parser.add_argument("--generate", action="store_true", help="Korpus vor dem Lauf neu erzeugen (nur ohne --url)")
+    parser.add_argument("--papers", type=int, default=2000)
+    parser.add_argument("--authors", type=int, default=400)
+    parser.add_argument("--content-size", type=int, default=5000)
+    parser.add_argument("--endpoints", default=None, help="Kommagetrennte Auswahl, Default: alle")
+    parser.add_argument("--requests", type=int, default=50, help="Gemessene Aufrufe pro Endpunkt")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--mixed", type=int, default=0, help="Zusätzliche Aufrufe im gewichteten Mix")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Ergebnisse als JSON speichern")
+    parser.add_argument("--baseline", default=None, help="JSON eines früheren Laufs zum Vergleich")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Erlaubte p95-Verschlechterung (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints.split(",") if args.endpoints else list(ENDPOINTS)
+    unknown = [e for e in endpoints if e not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unbekannte Endpunkte: {', '.join(unknown)}")
+
+    get, db, close = http_target(args) if args.url else in_process_target(args)
+    try:
+        samples = load_samples(db, random.Random(args.seed))
+        results = benchmark(get, samples, endpoints, args.requests, args.warmup, args.mixed, args.concurrency, args.seed)
+    finally:
+        close()
+
+    print_table(results)
+    if args.json:
+        meta = {"target": args.url or ("mongomock" if args.mongomock else "in-process"), "db": args.db,
+                "papers": db["papers"].estimated_document_count() if not args.url else None,
+                "concurrency": args.concurrency, "requests": args.requests}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=2)
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        for endpoint, before, after in regressions:
+            print(f"[Benchmark] Regression {endpoint}: p95 {before} ms -> {after} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import time
+import threading
+from bisect import bisect_left
+from pymongo import monitoring
+
+# Prometheus-Metriken für die API (Textformat 0.0.4, ohne zusätzliche Abhängigkeit).
+#
+#   - MetricsMiddleware:      Latenz-Histogramm und Antwortgröße pro Route (Routen-Template, nicht die URL)
+#   - MongoMetricsListener:   Dauer jedes MongoDB-Kommandos und Anzahl zurückgegebener Dokumente,
+#                             registriert über MongoClient(event_listeners=[...])
+#   - register_callback:      Werte, die erst beim Abruf von /metrics gelesen werden (z.B. Cache-Treffer)
+#
+# Die Werte gelten pro Prozess; bei mehreren Workern summiert Prometheus über die Instanzen.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 20_000_000)
+MONGO_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def expose(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label_values -> [bucket_counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def expose(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    labels = _format_labels(self.labels, label_values, [f'le="{bound}"'])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, label_values, ['le="+Inf"'])
+                lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+                plain = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{plain} {series[-2]}")
+                lines.append(f"{self.name}_count{plain} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._callbacks = []   # (name, documentation, callback, label_names, type)
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def register_callback(self, name: str, documentation: str, callback, labels=(), metric_type: str = "gauge"):
+        """
+        callback() liefert eine Zahl oder ein dict {Label-Tupel: Wert}; wird erst bei /metrics aufgerufen.
+        metric_type: "gauge" oder "counter" (für Zähler, die an anderer Stelle ohnehin geführt werden, z.B. Cache-Treffer)
+        """
+        self._callbacks.append((name, documentation, callback, tuple(labels), metric_type))
+
+    def expose(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        for name, documentation, callback, labels, metric_type in self._callbacks:
+            try:
+                values = callback()
+            except Exception:
+                continue
+            if values is None:
+                continue
+            if not isinstance(values, dict):
+                values = {(): values}
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for label_values, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labels, label_values)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "hub_http_request_duration_seconds", "Latenz der API-Requests", labels=("method", "route", "status")
+)
+http_response_bytes = registry.histogram(
+    "hub_http_response_bytes", "Größe der Antwort-Bodies in Bytes", labels=("method", "route"), buckets=SIZE_BUCKETS
+)
+mongo_command_duration = registry.histogram(
+    "hub_mongo_command_duration_seconds", "Dauer der MongoDB-Kommandos", labels=("command", "collection"), buckets=MONGO_BUCKETS
+)
+mongo_command_failures = registry.counter(
+    "hub_mongo_command_failures_total", "Fehlgeschlagene MongoDB-Kommandos", labels=("command", "collection")
+)
+mongo_documents_returned = registry.counter(
+    "hub_mongo_documents_returned_total", "Von MongoDB zurückgegebene Dokumente", labels=("command", "collection")
+)
+
+
+# ---------------------------------------
+# HTTP-Middleware
+# ---------------------------------------
+
+def _route_label(scope) -> str:
+    """Routen-Template ("/papers/id/{obj_id}") statt der konkreten URL, damit die Label-Anzahl begrenzt bleibt."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    root_path = scope.get("root_path", "")
+    if root_path:
+        # Mounts (/pdfs, /images) setzen root_path auf ihren Präfix
+        return root_path
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Reine ASGI-Middleware: misst Latenz, Statuscode und Bytes jeder HTTP-Antwort."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        state = {"status": 500, "bytes": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = _route_label(scope)
+            method = scope.get("method", "")
+            http_request_duration.observe(time.perf_counter() - start, method, route, str(state["status"]))
+            http_response_bytes.observe(state["bytes"], method, route)
+
+
+# ---------------------------------------
+# MongoDB-Command-Listener
+# ---------------------------------------
+
+# Kommandos, deren Antwort einen Cursor mit Dokumenten enthält
+CURSOR_COMMANDS = {"find", "aggregate", "getMore"}
+IGNORED_COMMANDS = {"hello", "isMaster", "ismaster", "ping", "endSessions", "saslStart", "saslContinue", "buildInfo"}
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = collection if isinstance(collection, str) else ""
+
+    def _pop_collection(self, event):
+        with self._lock:
+            return self._collections.pop((event.connection_id, event.request_id), "")
+
+    def succeeded(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = self._pop_collection(event)
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, event.command_name, collection)
+        if event.command_name in CURSOR_COMMANDS:
+            cursor = (event.reply or {}).get("cursor") or {}
+            batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+            if batch:
+                mongo_documents_returned.inc(event.command_name, collection, amount=len(batch))
+
+    def failed(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = self._pop_collection(event)
+        mongo_command_duration.observe(event.duration_micros / 1_000_000, event.command_name, collection)
+        mongo_command_failures.inc(event.command_name, collection)
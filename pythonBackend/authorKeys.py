@@ -0,0 +1,185 @@
+import os
+import re
+import argparse
+import unicodedata
+from pymongo import MongoClient, UpdateOne, ASCENDING
+from dotenv import load_dotenv
+
+# Normalisierte Autoren-Schlüssel ("nachname_initial"), damit dieselbe Person unabhängig vom
+# Namensformat gefunden wird:
+#   "Kristian Kersting" (ArXiv)  -> "kersting_k"
+#   "Kersting K"        (PubMed) -> "kersting_k"
+#   "Carlo d’Eramo"              -> "deramo_c"
+#   "Oskar von Stryk" / "von Stryk O" -> "stryk_o"
+#   "Hamed Shariat Yazdi" / "Shariat Yazdi H" -> "yazdi_h"   (Nachname = letztes Token, in beiden Formaten)
+#   "M Emtiyaz Khan" / "Emtiyaz Khan M"       -> "khan_m"
+#
+# Umlaute werden je nach Quelle weggelassen oder umschrieben ("Kühne", "Kuhne", "Kuehne"). Ein Name mit
+# Umlaut bekommt deshalb zwei Schlüssel ("kuhne_h" und "kuehne_h", siehe author_key_variants); gesucht wird
+# mit allen Varianten des Suchnamens ($in), so treffen sich beide Schreibweisen.
+#
+# Jedes Paper bekommt das Feld "author_keys" (Multikey-Index), jeder Autor das Feld "name_key".
+# Damit ersetzt get_papers_via_author (mode=key/id) die Regex-Suche über alle authors-Arrays.
+# Ergibt ein Suchname keinen Schlüssel mit Initial ("Kersting", "Kristian"), sucht author_key_query
+# stattdessen per Regex im Feld "authors" – so ein Schlüssel steht in keinem Paper.
+# Ausführen dieser Datei füllt die Felder für bereits vorhandene Dokumente nach und legt die Indizes an
+# (--check: nur die Selbstprüfung der Schlüssel).
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+AUTHORS_COLLECTION = "authors"
+PAPERS_COLLECTION = "papers"
+
+NAME_PARTICLES = {"von", "van", "de", "der", "den", "del", "di", "da", "du", "la", "le", "zu", "ten", "ter"}
+INITIALS_PATTERN = re.compile(r"^[A-Z]{1,3}$")
+UMLAUT_TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "Ä": "Ae", "Ö": "Oe", "Ü": "Ue"})
+
+
+def _fold(text: str, transliterate: bool = False) -> str:
+    """
+    Entfernt Akzente/Umlaute-Punkte und vereinheitlicht Apostrophe: 'Kühne' -> 'Kuhne'.
+    transliterate=True schreibt Umlaute vorher um: 'Kühne' -> 'Kuehne'.
+    """
+    text = text.replace("’", "'").replace("‘", "'").replace("ß", "ss")
+    if transliterate:
+        text = text.translate(UMLAUT_TRANSLITERATION)
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def _clean_last_name(tokens) -> str:
+    """Letztes Token ohne Namenszusätze: ['Shariat', 'Yazdi'] -> 'yazdi', ['von', 'Stryk'] -> 'stryk'."""
+    tokens = [t for t in tokens if t.lower() not in NAME_PARTICLES] or tokens
+    return re.sub(r"[^a-z0-9]", "", tokens[-1].lower())
+
+
+def author_key(name: str, transliterate: bool = False) -> str:
+    """Normalisierter Schlüssel "nachname_initial" für einen Autorennamen (leerer String wenn unbrauchbar)."""
+    if not name:
+        return ""
+    name = _fold(name, transliterate).strip()
+
+    if "," in name:
+        # "Buxmann, Peter"
+        last, first = [part.strip() for part in name.split(",", 1)]
+        last_tokens = last.split()
+        initial = first[:1]
+    else:
+        tokens = name.replace(".", ". ").split()
+        if not tokens:
+            return ""
+        if len(tokens) == 1:
+            return _clean_last_name(tokens)
+        last = tokens[-1].rstrip(".")
+        if INITIALS_PATTERN.match(last) or len(last) == 1:
+            # PubMed-Format: "Kersting K", "Rothkopf CA", "Shariat Yazdi H", klein geschrieben "kersting k"
+            last_tokens = tokens[:-1]
+            initial = last[0]
+        else:
+            # "Kristian Kersting", "Dominik L. Michels", "Oskar von Stryk"
+            last_tokens = [tokens[-1]]
+            initial = tokens[0][0]
+
+    last_name = _clean_last_name(last_tokens)
+    if not last_name:
+        return ""
+    return f"{last_name}_{initial.lower()}" if initial else last_name
+
+
+def author_key_variants(name: str) -> list:
+    """Alle Schlüssel eines Namens: ohne und mit Umschreibung der Umlaute (meist nur einer)."""
+    keys = []
+    for transliterate in (False, True):
+        key = author_key(name, transliterate)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def author_key_query(name: str) -> dict:
+    """
+    MongoDB-Prädikat auf 'author_keys' für einen gesuchten Namen (alle Schreibvarianten).
+    Ohne Initial (nur ein Namensteil) Teilstring-Suche im Feld 'authors' (ohne Index).
+    """
+    keys = [key for key in author_key_variants(name) if "_" in key]
+    if not keys:
+        return {"authors": {"$regex": re.escape(name.strip()), "$options": "i"}}
+    if len(keys) == 1:
+        return {"author_keys": keys[0]}
+    return {"author_keys": {"$in": keys}}
+
+
+def author_keys(names) -> list:
+    """Schlüssel (inkl. Varianten) für alle Autoren eines Papers (ohne Duplikate, Reihenfolge bleibt erhalten)."""
+    keys = []
+    for name in names or []:
+        for key in author_key_variants(name):
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+def ensure_author_key_indexes(db):
+    db[PAPERS_COLLECTION].create_index([("author_keys", ASCENDING)])
+    db[AUTHORS_COLLECTION].create_index([("name_key", ASCENDING)])
+
+
+def backfill_author_keys(db, batch_size: int = 1000):
+    """Setzt author_keys/name_key für alle vorhandenen Dokumente."""
+    ensure_author_key_indexes(db)
+
+    for collection_name, source_field, target_field, build in (
+        (PAPERS_COLLECTION, "authors", "author_keys", author_keys),
+        (AUTHORS_COLLECTION, "name", "name_key", author_key),
+    ):
+        collection = db[collection_name]
+        updates = []
+        count = 0
+        for doc in collection.find({}, {source_field: 1}):
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {target_field: build(doc.get(source_field))}}))
+            if len(updates) >= batch_size:
+                collection.bulk_write(updates, ordered=False)
+                count += len(updates)
+                updates = []
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+            count += len(updates)
+        print(f"[AuthorKeys] {count} Dokumente in '{collection_name}' aktualisiert ({target_field}).")
+
+
+def _check_author_keys():
+    """Selbstprüfung: Schreibweisen derselben Person ergeben denselben Schlüssel, Teilnamen fallen auf Regex zurück."""
+    same_person = [
+        ("Kristian Kersting", "Kersting K", "kersting k", "Kersting K.", "Kersting, Kristian"),
+        ("Oskar von Stryk", "von Stryk O"),
+        ("Hamed Shariat Yazdi", "Shariat Yazdi H"),
+        ("Hilde Kühne", "Kuehne H", "Kuhne H"),
+    ]
+    for names in same_person:
+        variants = [set(author_key_variants(name)) for name in names]
+        assert all(v & variants[0] for v in variants), (names, variants)
+    for name in ("Kersting", "Kristian", "kersting", "  kersting "):
+        assert author_key_query(name) == {"authors": {"$regex": name.strip(), "$options": "i"}}, name
+    assert author_key_query("kersting k") == {"author_keys": "kersting_k"}
+    assert author_key_query("Wei Li") == {"author_keys": "li_w"}
+    print(f"author_key: {len(same_person)} Namensgruppen und Teilnamen ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Füllt author_keys/name_key nach und legt die Indizes an.")
+    parser.add_argument("--check", action="store_true", help="Nur die Selbstprüfung der Schlüssel ausführen")
+    args = parser.parse_args()
+
+    if args.check:
+        _check_author_keys()
+        return
+
+    client = MongoClient(MONGO_URI)
+    backfill_author_keys(client[DB_NAME])
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import os
+import argparse
+from datetime import datetime
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from dotenv import load_dotenv
+from ingestEpoch import bump_ingest_epoch
+
+# Diese Datei berechnet hub-eigene Kennzahlen pro Autor aus der papers-Collection
+# und schreibt sie per $merge in die authors-Collection:
+#   - hub_paper_count:   Anzahl Papers im Hub
+#   - hub_citations:     Summe der Zitationen dieser Papers (citationCount aus Semantic Scholar, sonst citations)
+#   - hub_recent_papers: Papers der letzten RECENT_YEARS Jahre
+#   - hub_h_index:       h-Index nur über die Papers im Hub
+#
+# Inkrementell: metadata-extraction.py markiert Autoren beim Hinzufügen eines Papers mit
+# "metrics_dirty": True. Ohne --full werden nur diese Autoren neu berechnet.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+AUTHORS_COLLECTION = "authors"
+PAPERS_COLLECTION = "papers"
+RECENT_YEARS = 3
+
+# Felder, nach denen get_all_authors sortieren kann (bekommen jeweils einen Index)
+AUTHOR_METRIC_FIELDS = ["hub_paper_count", "hub_citations", "hub_recent_papers", "hub_h_index"]
+
+
+def build_author_metrics_pipeline(authors_collection_name: str, papers_collection_name: str, full: bool, recent_from_year: int):
+    """
+    Aggregation auf der authors-Collection: holt die Papers über das (indizierte) _id-Feld per $lookup,
+    berechnet die Kennzahlen und schreibt sie mit $merge zurück in dieselbe Collection.
+    """
+    match_stage = {} if full else {"metrics_dirty": True}
+
+    return [
+        {"$match": match_stage},
+        {"$project": {"papers": {"$ifNull": ["$papers", []]}}},
+        {"$lookup": {
+            "from": papers_collection_name,
+            "localField": "papers",
+            "foreignField": "_id",
+            "as": "hub_papers",
+            "pipeline": [
+                {"$project": {
+                    "_id": 0,
+                    "cites": {"$ifNull": ["$citationCount", {"$ifNull": ["$citations", 0]}]},
+                    # "published" ist ein String ("2024-01-12T..." bzw. "2024 Apr"), die ersten 4 Zeichen sind das Jahr
+                    "year": {"$convert": {
+                        "input": {"$substrCP": [{"$ifNull": ["$published", ""]}, 0, 4]},
+                        "to": "int",
+                        "onError": 0,
+                        "onNull": 0
+                    }}
+                }}
+            ]
+        }},
+        {"$project": {
+            "hub_paper_count": {"$size": "$hub_papers"},
+            "hub_citations": {"$sum": "$hub_papers.cites"},
+            "hub_recent_papers": {"$size": {"$filter": {
+                "input": "$hub_papers",
+                "as": "p",
+                "cond": {"$gte": ["$$p.year", recent_from_year]}
+            }}},
+            "sorted_cites": {"$sortArray": {"input": "$hub_papers.cites", "sortBy": -1}}
+        }},
+        # h-Index: größtes h, sodass h Papers mindestens h Zitationen haben
+        {"$project": {
+            "hub_paper_count": 1,
+            "hub_citations": 1,
+            "hub_recent_papers": 1,
+            "hub_h_index": {"$size": {"$filter": {
+                "input": {"$range": [0, {"$size": "$sorted_cites"}]},
+                "as": "i",
+                "cond": {"$gte": [{"$arrayElemAt": ["$sorted_cites", "$$i"]}, {"$add": ["$$i", 1]}]}
+            }}},
+            "metrics_dirty": {"$literal": False},
+            "metrics_updated_at": "$$NOW"
+        }},
+        {"$merge": {
+            "into": authors_collection_name,
+            "on": "_id",
+            "whenMatched": "merge",
+            "whenNotMatched": "discard"
+        }}
+    ]
+
+
+def ensure_author_metric_indexes(authors_col):
+    """Indizes für die Sortierung in get_all_authors und für den inkrementellen Lauf."""
+    for field in AUTHOR_METRIC_FIELDS:
+        authors_col.create_index([(field, DESCENDING)])
+    authors_col.create_index([("metrics_dirty", ASCENDING)], sparse=True)
+
+
+def materialize_author_metrics(db, full: bool = False, bump_epoch: bool = True):
+    """
+    Berechnet die Kennzahlen (alle Autoren oder nur die als dirty markierten) und legt die Indizes an.
+    bump_epoch=False: keine neue Ingest-Epoche (der Orchestrator erhöht sie einmal am Ende).
+    """
+    authors_col = db[AUTHORS_COLLECTION]
+    ensure_author_metric_indexes(authors_col)
+
+    recent_from_year = datetime.now().year - RECENT_YEARS + 1
+    pipeline = build_author_metrics_pipeline(AUTHORS_COLLECTION, PAPERS_COLLECTION, full, recent_from_year)
+
+    pending = authors_col.count_documents({} if full else {"metrics_dirty": True})
+    authors_col.aggregate(pipeline)
+    if pending and bump_epoch:
+        bump_ingest_epoch(db, source="authorMetrics")
+    print(f"[AuthorMetrics] Kennzahlen für {pending} Autoren berechnet ({'voll' if full else 'inkrementell'}).")
+    return pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Berechnet hub-eigene Autor-Kennzahlen aus der papers-Collection.")
+    parser.add_argument("--full", action="store_true", help="Alle Autoren neu berechnen (nicht nur metrics_dirty)")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    materialize_author_metrics(client[DB_NAME], full=args.full)
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -29,7 +29,8 @@ def extract_authors(container):
             author_dict.update({f"{author.text}": auth_data})
     return author_dict
 
-if __name__ == "__main__":    
+def scrape_authors():
+    """Liefert {gruppe: [{name: {image_URL, profile_URL}}, ...]} für die Gruppen der Webseite."""
     page = requests.get(URL)
     soup = BeautifulSoup(page.content, "html.parser")
     tags = {"executeive_board": "Vorstand",
@@ -47,6 +48,11 @@ if __name__ == "__main__":
         for auth_container in groups_container.select("li"):
             author_groups.append(extract_authors(auth_container)) 
         author_list[tag] = author_groups
-    
-    with open('authors.json', 'w', encoding='utf8') as f:
-        json.dump(author_list, f, indent=4, ensure_ascii=False)
\ No newline at end of file
+    return author_list
+
+def save_authors(author_list, path='authors.json'):
+    with open(path, 'w', encoding='utf8') as f:
+        json.dump(author_list, f, indent=4, ensure_ascii=False)
+
+if __name__ == "__main__":    
+    save_authors(scrape_authors())
@@ -1,20 +1,40 @@
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, Response
 from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.server_api import ServerApi
 from dotenv import load_dotenv
 import os
+import time
+import threading
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 # from datetime import datetime
 from bson import ObjectId
+from staticServing import CachedStaticFiles, etag_cache
+from authorKeys import author_key_query
+from ingestEpoch import EpochWatcher, get_ingest_epoch
+from suggestIndex import build_suggest_index
+from embeddingIndex import EmbeddingIndex, DEFAULT_NPROBE, MAX_NPROBE
+from coauthorGraph import CoauthorGraph
+from viewCounter import ViewCounter
+from slowQueryLog import SlowQueryLog
+from queryCache import QueryCache, QUERY_STATS_COLLECTION
+from apiMetrics import registry, MetricsMiddleware, MongoMetricsListener, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from searchPlanner import SearchPlanner
+from snippets import compile_terms, build_snippets
+from queryFilters import build_filter_query
+import exporter
+from fastSerialization import (
+    FastJSONResponse, paper_to_dict, author_to_dict,
+    PAPER_PROJECTION, PAPER_PROJECTION_WITHOUT_CONTENT, AUTHOR_PROJECTION
+)
 
 # So sieht eine vollständige Abfrage aus:
 #  http://127.0.0.1:8000/papers/title/llm?page=1&page_size=10&sort=date&descending=true
 # - page: gewünschte Seite
 # - page_size: Anzahl Ergebnisse pro Seite
-# - sort: "relevance", "views", oder "date"
+# - sort: "relevance", "views", "date" oder "trending"
 # - descending: true/false
 
 load_dotenv()
@@ -22,7 +42,10 @@ load_dotenv()
 uri = os.getenv("MongoDB-uri")
 db_name = os.getenv("db")
 
-client = MongoClient(uri, server_api=ServerApi('1'))
+# Der Listener misst Dauer und zurückgegebene Dokumente jedes MongoDB-Kommandos (siehe apiMetrics.py)
+# connect=False: Verbindungen und Monitor-Threads entstehen erst beim ersten Kommando. Mit gunicorn --preload
+# (siehe gunicorn.conf.py) wird dieses Modul im Master importiert; jeder Worker verbindet sich so erst nach dem fork.
+client = MongoClient(uri, server_api=ServerApi('1'), event_listeners=[MongoMetricsListener()], connect=False)
 db = client[db_name]
 
 papers_collection = db["papers"]
@@ -34,6 +57,9 @@ IMAGE_DIR = os.path.join(BASE_DIR, "images")
 
 app = FastAPI()
 
+# Latenz und Antwortgröße pro Route für /metrics
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -42,13 +68,166 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.mount("/pdfs", StaticFiles(directory=PDF_DIR), name="pdfs")
-app.mount("/images", StaticFiles(directory=IMAGE_DIR), name="images")
+# Views: Aufrufe der Detailseite und PDF-Abrufe werden gepuffert und periodisch per bulk_write
+# ($inc auf "views") geschrieben, siehe viewCounter.py
+view_counter = ViewCounter(papers_collection)
+slow_query_log = SlowQueryLog()
+
+# Statische Dateien mit ETags, Cache-Headern und Range-Support (siehe staticServing.py)
+app.mount("/pdfs", CachedStaticFiles(directory=PDF_DIR, url_prefix="pdfs", on_access=view_counter.record_path), name="pdfs")
+app.mount("/images", CachedStaticFiles(directory=IMAGE_DIR, url_prefix="images"), name="images")
+
+# ---------------------------------------
+# IN-MEMORY-STRUKTUREN & INGEST-EPOCHE
+# ---------------------------------------
+
+# Suggest-Index für /suggest (siehe suggestIndex.py); wird beim Start und bei jeder neuen
+# Ingest-Epoche im Hintergrund neu aufgebaut und dann atomar ausgetauscht.
+suggest_index = None
+epoch_watcher = EpochWatcher(db)
+
+def refresh_suggest_index(epoch=None):
+    global suggest_index
+    suggest_index = build_suggest_index(papers_collection, authors_collection)
+    print(f"[Suggest] Index mit {len(suggest_index)} Einträgen aufgebaut (Epoche {epoch}).")
+
+# Embedding-Index für /papers/similar und /papers/semantic (siehe embeddingIndex.py, offline gebaut).
+# Die Vektoren werden per mmap geladen; fehlt der Index, antworten die Endpunkte mit 503.
+embedding_index = None
+
+def refresh_embedding_index(epoch=None):
+    global embedding_index
+    embedding_index = EmbeddingIndex.load_current()
+    if embedding_index is not None:
+        print(f"[Embeddings] Index {embedding_index.build_dir} geladen ({embedding_index.meta['count']} Papers).")
+
+# Ko-Autorenschaftsgraph für /graph/... (siehe coauthorGraph.py, offline gebaut, CSR-Arrays per mmap).
+coauthor_graph = None
+
+def refresh_coauthor_graph(epoch=None):
+    global coauthor_graph
+    coauthor_graph = CoauthorGraph.load_current()
+    if coauthor_graph is not None:
+        print(f"[CoauthorGraph] Graph {coauthor_graph.build_dir} geladen ({coauthor_graph.meta['authors']} Autoren).")
+
+# Query-Planer für /papers/search; kennt die vorhandenen Indizes und prüft sie bei jeder neuen Epoche erneut.
+# Die Indizes werden erst in warm_up() gelesen, damit der Import keine Verbindung öffnet.
+search_planner = SearchPlanner(papers_collection, load_indexes=False)
+
+epoch_watcher.register(refresh_suggest_index)
+epoch_watcher.register(refresh_embedding_index)
+epoch_watcher.register(refresh_coauthor_graph)
+epoch_watcher.register(search_planner.refresh_indexes)
+
+# ---------------------------------------
+# PRELOAD & WARM-UP (mehrere Worker, siehe gunicorn.conf.py)
+# ---------------------------------------
+
+# Epoche, zu der preload_shared_state() die Strukturen im gunicorn-Master gebaut hat (None = kein Preload)
+preloaded_epoch = None
+warmup_done = threading.Event()
+WARMUP_RETRY_SECONDS = 5
+
+def preload_shared_state():
+    """
+    Baut Suggest-Index, Embedding-Index und Graph einmal im gunicorn-Master vor dem fork.
+    Die Worker teilen sich den Page-Cache (mmap-Arrays) bzw. übernehmen die numpy-Arrays des Suggest-Index
+    copy-on-write; Python-Objekte werden beim ersten Zugriff eines Workers kopiert (Referenzzähler).
+    """
+    global suggest_index, preloaded_epoch
+    # Eigener, kurzlebiger Client: der Client der Worker darf vor dem fork keine Verbindung öffnen
+    with MongoClient(uri, server_api=ServerApi('1')) as preload_client:
+        preload_db = preload_client[db_name]
+        epoch = get_ingest_epoch(preload_db)
+        suggest_index = build_suggest_index(preload_db["papers"], preload_db["authors"])
+    print(f"[Preload] Suggest-Index mit {len(suggest_index)} Einträgen aufgebaut (Epoche {epoch}).")
+    refresh_embedding_index(epoch)
+    refresh_coauthor_graph(epoch)
+    preloaded_epoch = epoch
+
+def warm_up():
+    """Lädt die In-Memory-Strukturen dieses Workers; danach meldet /ready 200."""
+    while not warmup_done.is_set():
+        try:
+            epoch = epoch_watcher.read()
+            search_planner.refresh_indexes(epoch)
+            # Vorgeladene Strukturen nur neu bauen, wenn seit dem Preload ein Ingest lief
+            if suggest_index is None or preloaded_epoch != epoch:
+                refresh_suggest_index(epoch)
+            if embedding_index is None or preloaded_epoch != epoch:
+                refresh_embedding_index(epoch)
+            if coauthor_graph is None or preloaded_epoch != epoch:
+                refresh_coauthor_graph(epoch)
+            query_cache.warm()
+        except Exception as e:
+            print(f"[WarmUp] Fehler, neuer Versuch in {WARMUP_RETRY_SECONDS}s: {e}")
+            time.sleep(WARMUP_RETRY_SECONDS)
+            continue
+        warmup_done.set()
+        print(f"[WarmUp] Worker {os.getpid()} bereit (Epoche {epoch}).")
+
+# Werte, die erst beim Abruf von /metrics gelesen werden
+registry.register_callback(
+    "hub_cache_requests_total", "Cache-Zugriffe nach Ergebnis",
+    lambda: {
+        ("static_etag", "hit"): etag_cache.hits, ("static_etag", "miss"): etag_cache.misses,
+        ("query", "hit"): query_cache.hits, ("query", "miss"): query_cache.misses,
+        ("query", "coalesced"): query_cache.coalesced,
+    },
+    labels=("cache", "result"), metric_type="counter"
+)
+registry.register_callback("hub_ready", "1, sobald das Warm-up dieses Workers abgeschlossen ist", lambda: int(warmup_done.is_set()))
+registry.register_callback("hub_ingest_epoch", "Zuletzt geladene Ingest-Epoche", lambda: epoch_watcher.epoch)
+registry.register_callback("hub_views_flushed_total", "Geschriebene Views", lambda: view_counter.flushed_views, metric_type="counter")
+registry.register_callback("hub_slow_queries_total", "Abfragen über SLOW_QUERY_MS", lambda: slow_query_log.logged, metric_type="counter")
+registry.register_callback("hub_slow_query_explains_dropped_total", "Explains verworfen (Warteschlange voll)", lambda: slow_query_log.explains_dropped, metric_type="counter")
+registry.register_callback(
+    "hub_index_entries", "Einträge der In-Memory-Strukturen",
+    lambda: {
+        ("suggest",): len(suggest_index) if suggest_index is not None else 0,
+        ("embeddings",): embedding_index.meta["count"] if embedding_index is not None else 0,
+        ("coauthor_graph",): coauthor_graph.meta["authors"] if coauthor_graph is not None else 0,
+        ("query_cache",): len(query_cache),
+    },
+    labels=("index",)
+)
+
+@app.on_event("startup")
+def startup():
+    # Läuft in jedem Worker nach dem fork: Hintergrund-Threads erst hier starten.
+    # Kein Datenbankzugriff hier, damit der Worker auch ohne MongoDB startet (/ready bleibt 503)
+    epoch_watcher.start()
+    view_counter.start()
+    query_cache.start()
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+@app.on_event("shutdown")
+def shutdown():
+    epoch_watcher.stop()
+    view_counter.stop()
+    query_cache.stop()
 
 @app.get("/")
 def welcome():
     return "Hallo!"
 
+@app.get("/health", include_in_schema=False)
+def health():
+    """Liveness: der Prozess nimmt Anfragen an."""
+    return {"status": "ok"}
+
+@app.get("/ready", include_in_schema=False)
+def ready():
+    """Readiness: 503, bis warm_up() in diesem Worker abgeschlossen ist."""
+    if not warmup_done.is_set():
+        raise HTTPException(status_code=503, detail="Warm-up is still running.")
+    return {"status": "ready", "epoch": epoch_watcher.epoch}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus-Metriken dieses Prozesses (Textformat)."""
+    return Response(content=registry.expose(), media_type=METRICS_CONTENT_TYPE)
+
 # ---------------------------------------
 # PAPER-DATENSTRUKTUR
 # ---------------------------------------
@@ -58,6 +237,7 @@ class Paper(BaseModel):
     Pydantic-Modell für ein Paper, mit optionalen Standardwerten.
     Fehlende Felder in MongoDB erzeugen keine Fehler.
     """
+    objectId: str = ""
     title: str
     published: str = ""
     authors: List[str] = []
@@ -65,101 +245,83 @@ class Paper(BaseModel):
     abstract: str = "unknown"
     citations: int = 0
     views: int = 0
-    content: str = "unknown"
+    # None, wenn der Volltext mit include_content=false weggelassen wurde
+    content: Optional[str] = "unknown"
     journal: Optional[str] = "unknown"
     path: Optional[str] = "no PDF existing"
     path_image: Optional[str] = "no image found"
+    # Thumbnail-Varianten aus thumbnailGenerator.py: {"small": {"jpeg": ..., "webp": ...}, ...}
+    thumbnails: Dict[str, Dict[str, str]] = {}
     is_hess_paper: str = ""
     # Felder aus Semantic Scholar
     citationCount: int = 0
     highlyInfluentialCitations: int = 0
+    # Hervorgehobene Ausschnitte (snippets.py), nur bei highlight=true: {"title": [...], "abstract": [...], "content": [...]}
+    snippets: Optional[Dict[str, List[str]]] = None
+
+# Paginierte Paper-Antwort. Die Endpunkte liefern paper_to_dict + FastJSONResponse (siehe fastSerialization.py);
+# die Modelle dienen nur noch der Dokumentation (responses=...), validiert wird nicht.
+class PapersPaginationResponse(BaseModel):
+    total_count: int
+    page: int
+    page_size: int
+    papers: List[Paper]
+
+PAPERS_RESPONSES = {200: {"model": PapersPaginationResponse}}
 
 # Mögliche Sortier-Felder (Mapping)
 sort_fields = {
     "relevance": "relevance",
     "views": "views",
-    "date": "published"
+    "date": "published",
+    # zeitlich abklingende Popularität (Views + neue Zitationen), siehe trendingScores.py
+    "trending": "trending_score"
 }
 
-def replaceNoneTypes(field, replacer):
-    if field == None:
-        return replacer
-    else:
-        return field
-
-def dict_to_paper(paper_dict: dict) -> Paper:
-    """
-    Konvertiert ein Dictionary aus MongoDB in ein Paper-Objekt (Pydantic).
-    """
-    if not type(paper_dict['abstract']) is str:
-        print(f"type: {type(paper_dict['abstract'])}")
-        print(f"type: {paper_dict['abstract'] == None }")
-
-    # not all papers are from semantic scholar and thus have these fields
-    if not "citationCount" in paper_dict:
-        paper_dict.update({"citationCount": 0})
-    if not "highlyInfluentialCitations" in paper_dict:
-        paper_dict.update({"highlyInfluentialCitations": 0})
-
-
-    return Paper(
-        title= replaceNoneTypes(paper_dict['title'], 'unknown'),
-        published=replaceNoneTypes(paper_dict['published'], ""),
-        authors=replaceNoneTypes(paper_dict['authors'], []),
-        relevance=replaceNoneTypes(paper_dict['relevance'], 0),
-        abstract=replaceNoneTypes(paper_dict['abstract'], 'unknown'),
-        citations=replaceNoneTypes(paper_dict['citations'], 0),
-        views=replaceNoneTypes(paper_dict['views'], 0),
-        content=replaceNoneTypes(paper_dict['content'], 'unknown'),
-        journal=replaceNoneTypes(paper_dict['journal'], 'unknown'),
-        path=replaceNoneTypes(paper_dict['path'], 'no PDF existing'),
-        path_image=replaceNoneTypes(paper_dict['path_image'], 'no image found'),
-        citationCount=replaceNoneTypes(paper_dict['citationCount'], 0),
-        highlyInfluentialCitations=replaceNoneTypes(paper_dict['highlyInfluentialCitations'], 0)
-    )
-
-
-def build_filter_query(
-    query, 
-    year: Optional[List[int]] = Query(None),
-    min_views: int = 0,  
-    max_views: Optional[int] = None,
-    min_citations: int = 0,  
-    max_citations: Optional[int] = None,
-    # min_hi_citations: int = 0,  
-    # max_hi_citations: Optional[int] = None
-    ):
-
-    query.update({"published": { "$ne" : "null" }})
-    
-    if year:
-        query.update({"$or": [{"published": {"$regex": f"{y}" }}for y in year]})
-    if max_views:
-        query.update({"views": {"$gte": min_views, "$lte": max_views}})
-    if max_citations:
-        query.update({"citations": {"$gte": min_citations, "$lte": max_citations}})
-    # if max_hi_citations:
-    #     query.update({"highlyInfluentialCitations": {"$gte": min_hi_citations, "$lte": max_hi_citations}})
-
-    return query
-
 def apply_sorting_and_pagination(
     query: dict,
     page: int,
     page_size: int,
     sort: Optional[str],
-    descending: bool
+    descending: bool,
+    hint: Optional[str] = None,
+    projection: Optional[dict] = None
 ):
     """
     Hilfsfunktion, die die Datenbank-Abfrage ausführt,
     Sortierung und Paginierung anwendet und die Resultate liefert.
+    - hint: optionaler Indexname (vom SearchPlanner), der für Count und Find erzwungen wird
+    - projection: optionale MongoDB-Projektion (z.B. {"content": 0})
+
+    Die Ergebnisse kommen aus dem query_cache (siehe queryCache.py) und dürfen nicht verändert werden.
     """
+    return query_cache.get(
+        query=query, page=page, page_size=page_size, sort=sort, descending=descending,
+        hint=hint, projection=projection
+    )
+
+def run_sorted_query(
+    query: dict,
+    page: int,
+    page_size: int,
+    sort: Optional[str],
+    descending: bool,
+    hint: Optional[str] = None,
+    projection: Optional[dict] = None
+):
+    """Die eigentliche Abfrage hinter apply_sorting_and_pagination (ohne Cache)."""
     skip = (page - 1) * page_size
     limit = page_size
 
-    total_count = papers_collection.count_documents(query)
+    start = time.perf_counter()
+    if hint:
+        total_count = papers_collection.count_documents(query, hint=hint)
+    else:
+        total_count = papers_collection.count_documents(query)
+    count_ms = (time.perf_counter() - start) * 1000
 
     if total_count == 0:
+        slow_query_log.record(papers_collection, query, None, skip, limit, hint, count_ms, 0.0, 0)
         return ([], 0)
 
     sort_spec = None
@@ -170,19 +332,45 @@ def apply_sorting_and_pagination(
 
     if sort_spec:
         cursor = (
-            papers_collection.find(query)
+            papers_collection.find(query, projection)
             .sort(sort_spec)
             .skip(skip)
             .limit(limit)
         )
     else:
         cursor = (
-            papers_collection.find(query)
+            papers_collection.find(query, projection)
             .skip(skip)
             .limit(limit)
         )
-
-    return (list(cursor), total_count)
+    if hint:
+        cursor = cursor.hint(hint)
+
+    start = time.perf_counter()
+    results = list(cursor)
+    find_ms = (time.perf_counter() - start) * 1000
+    slow_query_log.record(papers_collection, query, sort_spec, skip, limit, hint, count_ms, find_ms, len(results))
+
+    return (results, total_count)
+
+# Ergebnis-Cache mit Request-Coalescing; nach einer neuen Ingest-Epoche geleert und mit den häufigsten
+# Abfragen aus "query_stats" neu gefüllt (siehe queryCache.py)
+query_cache = QueryCache(run_sorted_query, db[QUERY_STATS_COLLECTION])
+epoch_watcher.register(query_cache.on_epoch)
+
+def content_projection(include_content: bool, highlight: bool) -> dict:
+    """Den Volltext nur aus MongoDB laden, wenn er ausgeliefert oder für Snippets gebraucht wird."""
+    if include_content or highlight:
+        return PAPER_PROJECTION
+    return PAPER_PROJECTION_WITHOUT_CONTENT
+
+def papers_with_snippets(results: list, terms: List[str], include_content: bool, highlight: bool) -> List[dict]:
+    """Wandelt die Treffer in Antwort-dicts um und hängt bei highlight=true die Snippets an."""
+    pattern = compile_terms(terms) if highlight else None
+    return [
+        paper_to_dict(r, include_content=include_content, snippets=build_snippets(r, pattern) if pattern else None)
+        for r in results
+    ]
 
 # ---------------------------------------
 # PAPERS ENDPOINTS
@@ -192,7 +380,7 @@ def apply_sorting_and_pagination(
 def papers():
     return "Hier werden als nächstes die Papers kommen"
 
-@app.get("/papers/all")
+@app.get("/papers/all", responses=PAPERS_RESPONSES)
 def get_all_papers(
     page: int = 1,
     page_size: int = 15,
@@ -210,19 +398,154 @@ def get_all_papers(
     query = build_filter_query(query, year, min_views, max_views, min_citations, max_citations) # , min_hi_citations, max_hi_citations)
 
 
-    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending)
+    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending, projection=PAPER_PROJECTION)
 
     if not results:
         raise HTTPException(status_code=404, detail="No papers found.")
 
-    return {
+    return FastJSONResponse({
         "total_count": total,
         "page": page,
         "page_size": page_size,
-        "papers": [dict_to_paper(r) for r in results]
-    }
+        "papers": [paper_to_dict(r) for r in results]
+    })
+
+def papers_by_ids_in_order(ids_with_scores):
+    """
+    Holt Papers für [(paper_id, score), ...] mit einer einzigen $in-Abfrage
+    und gibt sie in der Reihenfolge der Eingabe zurück.
+    """
+    oids = [ObjectId(paper_id) for paper_id, _ in ids_with_scores]
+    docs = {doc["_id"]: doc for doc in papers_collection.find({"_id": {"$in": oids}}, PAPER_PROJECTION)}
+    papers = []
+    scores = []
+    for oid, (_, score) in zip(oids, ids_with_scores):
+        if oid in docs:
+            papers.append(paper_to_dict(docs[oid]))
+            scores.append(round(score, 4))
+    return papers, scores
+
+@app.get("/papers/similar/{obj_id}")
+def get_similar_papers(obj_id: str, k: int = 10, nprobe: int = Query(DEFAULT_NPROBE, ge=1, le=MAX_NPROBE)):
+    """
+    Liefert die k inhaltlich ähnlichsten Papers (Titel + Abstract, Embedding-Index).
+    """
+    if embedding_index is None:
+        raise HTTPException(status_code=503, detail="Embedding index not available.")
+    try:
+        ObjectId(obj_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ObjectId format.")
+
+    results = embedding_index.similar_to(obj_id, k=max(1, min(k, 100)), nprobe=nprobe)
+    if results is None:
+        raise HTTPException(status_code=404, detail=f"No embedding found for paper '{obj_id}'")
+
+    papers, scores = papers_by_ids_in_order(results)
+    return FastJSONResponse({"papers": papers, "scores": scores})
+
+@app.get("/papers/semantic")
+def get_papers_semantic(q: str, k: int = 10, nprobe: int = Query(DEFAULT_NPROBE, ge=1, le=MAX_NPROBE)):
+    """
+    Semantische Suche: vergleicht die Anfrage mit Titel + Abstract aller Papers (Embedding-Index).
+    """
+    if embedding_index is None:
+        raise HTTPException(status_code=503, detail="Embedding index not available.")
+
+    results = embedding_index.search_text(q, k=max(1, min(k, 100)), nprobe=nprobe)
+    papers, scores = papers_by_ids_in_order(results)
+    if not papers:
+        raise HTTPException(status_code=404, detail=f"No papers found for '{q}'.")
+    return FastJSONResponse({"papers": papers, "scores": scores})
+
+@app.get("/papers/id/{obj_id}")
+def get_paper_by_objectid(obj_id: str):
+    """
+    Detailansicht: ein Paper plus die vorberechneten verwandten Papers (relatedPapers.py).
+    Die verwandten Papers werden mit einer einzigen $in-Abfrage geholt, ohne Berechnung zur Laufzeit.
+    """
+    try:
+        oid = ObjectId(obj_id)
+    except:
+        raise HTTPException(status_code=400, detail="Invalid ObjectId format.")
+
+    paper_doc = papers_collection.find_one({"_id": oid}, {**PAPER_PROJECTION, "related_papers": 1})
+    if not paper_doc:
+        raise HTTPException(status_code=404, detail=f"No paper found for _id '{obj_id}'")
+    view_counter.record_paper(oid)
+
+    related_ids = paper_doc.get("related_papers") or []
+    related, _ = papers_by_ids_in_order([(str(related_id), 0.0) for related_id in related_ids])
+    return FastJSONResponse({
+        "paper": paper_to_dict(paper_doc),
+        "related_papers": related
+    })
+
+@app.get("/papers/search")
+def search_papers(
+    title: Optional[str] = None,
+    author: Optional[str] = None,
+    author_id: Optional[str] = None,
+    tag: Optional[str] = None,
+    content: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 15,
+    sort: Optional[str] = None,
+    descending: bool = False,
+    year: Optional[List[int]] = Query(None),
+    min_views: int = 0,
+    max_views: Optional[int] = None,
+    min_citations: int = 0,
+    max_citations: Optional[int] = None,
+    include_content: bool = True,
+    highlight: bool = False
+):
+    """
+    Kombinierte Suche: beliebige Kombination aus Titel, Autor (Name oder ObjectId), Tag und Inhalt
+    plus die üblichen Filter, in einer einzigen Abfrage.
+    Der SearchPlanner (searchPlanner.py) wählt das selektivste indizierte Kriterium als Einstieg,
+    alle anderen Kriterien werden in dieselbe Abfrage geschoben.
+    - author: Name, wird über den normalisierten Schlüssel gesucht (wie mode="key")
+    - author_id: ObjectId eines Autors, Papers über dessen "papers"-Liste
+    - include_content: false lässt den Volltext weg
+    - highlight: true liefert hervorgehobene Ausschnitte für die Titel-/Inhaltsbegriffe (Feld "snippets")
+    """
+    if not any([title, author, author_id, tag, content]):
+        raise HTTPException(status_code=400, detail="Provide at least one of title, author, author_id, tag, content.")
+
+    author_papers = None
+    if author_id:
+        try:
+            oid = ObjectId(author_id)
+        except:
+            raise HTTPException(status_code=400, detail="Invalid ObjectId format.")
+        author_doc = authors_collection.find_one({"_id": oid}, {"papers": 1})
+        if not author_doc:
+            raise HTTPException(status_code=404, detail=f"No author found for _id '{author_id}'")
+        author_papers = author_doc.get("papers", [])
+
+    query, hint, plan = search_planner.plan(
+        title=title, author=author, author_papers=author_papers, tag=tag, content=content
+    )
+    query = build_filter_query(query, year, min_views, max_views, min_citations, max_citations)
 
-@app.get("/papers/author/{author_name}")
+    results, total = apply_sorting_and_pagination(
+        query, page, page_size, sort, descending,
+        hint=hint, projection=content_projection(include_content, highlight)
+    )
+
+    if not results:
+        raise HTTPException(status_code=404, detail="No papers found for the given criteria.")
+
+    return FastJSONResponse({
+        "total_count": total,
+        "page": page,
+        "page_size": page_size,
+        "plan": plan,
+        "papers": papers_with_snippets(results, [title, content], include_content, highlight)
+    })
+
+@app.get("/papers/author/{author_name}", responses=PAPERS_RESPONSES)
 def get_papers_via_author(
     author_name: str,
     page: int = 1,
@@ -233,26 +556,46 @@ def get_papers_via_author(
     min_views: int = 0,  
     max_views: Optional[int] = None,
     min_citations: int = 0,  
-    max_citations: Optional[int] = None #,
+    max_citations: Optional[int] = None,
+    mode: str = "regex" #,
 #    min_hi_citations: int = 0,  
 #    max_hi_citations: Optional[int] = None
 ):
     """
-    Liefert alle Papers für einen bestimmten Autor
-    (case-insensitive Suche im Feld 'authors'),
+    Liefert alle Papers für einen bestimmten Autor,
     mit Paginierung & optionaler Sortierung.
+
+    mode:
+    - "regex": (Default) case-insensitive Teilstring-Suche im Feld 'authors' (Full Scan)
+    - "key":   Suche über den normalisierten Namensschlüssel (Multikey-Index auf 'author_keys');
+               Namen ohne Initial (z.B. nur der Nachname) werden wie bei "regex" gesucht
+    - "id":    author_name ist die ObjectId eines Autors; Papers über dessen 'papers'-Liste ($in auf _id)
     """
-    query = {
-        "authors": {
-            "$regex": f".*{author_name}.*",
-            "$options": "i"
+    if mode == "id":
+        try:
+            oid = ObjectId(author_name)
+        except:
+            raise HTTPException(status_code=400, detail="Invalid ObjectId format.")
+        author_doc = authors_collection.find_one({"_id": oid}, {"papers": 1})
+        if not author_doc:
+            raise HTTPException(status_code=404, detail=f"No author found for _id '{author_name}'")
+        query = {"_id": {"$in": author_doc.get("papers", [])}}
+    elif mode == "key":
+        query = author_key_query(author_name)
+    elif mode == "regex":
+        query = {
+            "authors": {
+                "$regex": f".*{author_name}.*",
+                "$options": "i"
+            }
         }
-    }
+    else:
+        raise HTTPException(status_code=400, detail=f"Invalid mode '{mode}'. Use 'regex', 'key' or 'id'.")
 
     # update query
     query = build_filter_query(query, year, min_views, max_views, min_citations, max_citations) # , min_hi_citations, max_hi_citations)
 
-    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending)
+    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending, projection=PAPER_PROJECTION)
 
     if not results:
         raise HTTPException(
@@ -260,14 +603,14 @@ def get_papers_via_author(
             detail=f"No papers found for author '{author_name}'"
         )
     
-    return {
+    return FastJSONResponse({
         "total_count": total,
         "page": page,
         "page_size": page_size,
-        "papers": [dict_to_paper(r) for r in results]
-    }
+        "papers": [paper_to_dict(r) for r in results]
+    })
 
-@app.get("/papers/tag/{tag}")
+@app.get("/papers/tag/{tag}", responses=PAPERS_RESPONSES)
 def get_papers_via_tag(
     tag: str,
     page: int = 1,
@@ -288,7 +631,7 @@ def get_papers_via_tag(
     query = {"tag": tag}
     # update query
     query = build_filter_query(query, year, min_views, max_views, min_citations, max_citations) # , min_hi_citations, max_hi_citations)
-    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending)
+    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending, projection=PAPER_PROJECTION)
 
     if not results:
         raise HTTPException(
@@ -296,14 +639,14 @@ def get_papers_via_tag(
             detail=f"No papers found for tag '{tag}'."
         )
 
-    return {
+    return FastJSONResponse({
         "total_count": total,
         "page": page,
         "page_size": page_size,
-        "papers": [dict_to_paper(r) for r in results]
-    }
+        "papers": [paper_to_dict(r) for r in results]
+    })
 
-@app.get("/papers/title/{title}")
+@app.get("/papers/title/{title}", responses=PAPERS_RESPONSES)
 def get_papers_via_title(
     title: str,
     page: int = 1,
@@ -314,12 +657,16 @@ def get_papers_via_title(
     min_views: int = 0,  
     max_views: Optional[int] = None,
     min_citations: int = 0,  
-    max_citations: Optional[int] = None #,
+    max_citations: Optional[int] = None,
+    include_content: bool = True,
+    highlight: bool = False #,
 #    min_hi_citations: int = 0,  
 #    max_hi_citations: Optional[int] = None
 ):
     """
     Sucht nach Papers, deren "title" den gesuchten String enthält.
+    - include_content: false lässt den Volltext weg
+    - highlight: true liefert hervorgehobene Ausschnitte (Feld "snippets")
     """
     query = {
         "title": {
@@ -329,7 +676,9 @@ def get_papers_via_title(
     }
     # update query
     query = build_filter_query(query, year, min_views, max_views, min_citations, max_citations) # , min_hi_citations, max_hi_citations)
-    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending)
+    results, total = apply_sorting_and_pagination(
+        query, page, page_size, sort, descending, projection=content_projection(include_content, highlight)
+    )
 
     if not results:
         raise HTTPException(
@@ -337,14 +686,14 @@ def get_papers_via_title(
             detail=f"No papers found for title containing '{title}'."
         )
 
-    return {
+    return FastJSONResponse({
         "total_count": total,
         "page": page,
         "page_size": page_size,
-        "papers": [dict_to_paper(r) for r in results]
-    }
+        "papers": papers_with_snippets(results, [title], include_content, highlight)
+    })
 
-@app.get("/papers/content/{content}")
+@app.get("/papers/content/{content}", responses=PAPERS_RESPONSES)
 def get_papers_via_content(
     content: str,
     page: int = 1,
@@ -355,12 +704,16 @@ def get_papers_via_content(
     min_views: int = 0,  
     max_views: Optional[int] = None,
     min_citations: int = 0,  
-    max_citations: Optional[int] = None #,
+    max_citations: Optional[int] = None,
+    include_content: bool = True,
+    highlight: bool = False #,
 #    min_hi_citations: int = 0,  
 #    max_hi_citations: Optional[int] = None
 ):
     """
     Sucht in "content" nach dem String (case-insensitive).
+    - include_content: false lässt den Volltext weg
+    - highlight: true liefert hervorgehobene Ausschnitte (Feld "snippets")
     """
     query = {
         "content": {
@@ -370,7 +723,9 @@ def get_papers_via_content(
     }
     # update query
     query = build_filter_query(query, year, min_views, max_views, min_citations, max_citations) # , min_hi_citations, max_hi_citations)
-    results, total = apply_sorting_and_pagination(query, page, page_size, sort, descending)
+    results, total = apply_sorting_and_pagination(
+        query, page, page_size, sort, descending, projection=content_projection(include_content, highlight)
+    )
 
     if not results:
         raise HTTPException(
@@ -378,12 +733,12 @@ def get_papers_via_content(
             detail=f"No papers found for content containing '{content}'."
         )
 
-    return {
+    return FastJSONResponse({
         "total_count": total,
         "page": page,
         "page_size": page_size,
-        "papers": [dict_to_paper(r) for r in results]
-    }
+        "papers": papers_with_snippets(results, [content], include_content, highlight)
+    })
 
 # ---------------------------------------
 # AUTHORS: Pydantic-Model & Endpunkte
@@ -397,6 +752,11 @@ class AuthorModel(BaseModel):
     citations: int = 0
     highly_influential_citations: int = 0
     image_path: str = "images/placeholder_author.png"
+    # Hub-eigene Kennzahlen (materialisiert von authorMetrics.py)
+    hub_paper_count: int = 0
+    hub_citations: int = 0
+    hub_recent_papers: int = 0
+    hub_h_index: int = 0
 
 # B) Modell für paginierte Antwort
 class AuthorsPaginationResponse(BaseModel):
@@ -405,21 +765,7 @@ class AuthorsPaginationResponse(BaseModel):
     page_size: int
     authors: List[AuthorModel]
 
-def author_doc_to_model(doc: dict) -> AuthorModel:
-    """
-    Wandelt ein Autor-Dokument in ein AuthorModel um.
-    papers wird ignoriert.
-    """
-    return AuthorModel(
-        objectId=str(doc["_id"]),
-        name=doc.get("name", ""),
-        h_index=doc.get("h_index", 0),
-        citations=doc.get("citations", 0),
-        highly_influential_citations=doc.get("highly_influential_citations", 0),
-        image_path=doc.get("image_path", "images/placeholder_author.png")
-    )
-
-@app.get("/authors/{author_name}", response_model=AuthorModel)
+@app.get("/authors/{author_name}", responses={200: {"model": AuthorModel}})
 def get_author_by_name(author_name: str):
     """
     Sucht (case-insensitive) nach einem Autor mit passendem Namen.
@@ -432,14 +778,14 @@ def get_author_by_name(author_name: str):
             "$options": "i"
         }
     }
-    author_doc = authors_collection.find_one(regex_query)
+    author_doc = authors_collection.find_one(regex_query, AUTHOR_PROJECTION)
 
     if not author_doc:
         raise HTTPException(status_code=404, detail=f"No author found for name '{author_name}'")
 
-    return author_doc_to_model(author_doc)
+    return FastJSONResponse(author_to_dict(author_doc))
 
-@app.get("/authors", response_model=AuthorsPaginationResponse)
+@app.get("/authors", responses={200: {"model": AuthorsPaginationResponse}})
 def get_all_authors(
     page: int = 1,
     page_size: int = 15,
@@ -457,7 +803,12 @@ def get_all_authors(
         "name": "name",
         "h_index": "h_index",
         "citations": "citations",
-        "highly_influential_citations": "highly_influential_citations"
+        "highly_influential_citations": "highly_influential_citations",
+        # indiziert, siehe authorMetrics.py
+        "hub_paper_count": "hub_paper_count",
+        "hub_citations": "hub_citations",
+        "hub_recent_papers": "hub_recent_papers",
+        "hub_h_index": "hub_h_index"
     }
 
     total_count = authors_collection.count_documents({})
@@ -472,21 +823,20 @@ def get_all_authors(
         sort_spec = [(sort_field, sort_dir)]
 
     if sort_spec:
-        cursor = authors_collection.find({}).sort(sort_spec).skip(skip).limit(limit)
+        cursor = authors_collection.find({}, AUTHOR_PROJECTION).sort(sort_spec).skip(skip).limit(limit)
     else:
-        cursor = authors_collection.find({}).skip(skip).limit(limit)
+        cursor = authors_collection.find({}, AUTHOR_PROJECTION).skip(skip).limit(limit)
 
-    author_docs = list(cursor)
-    authors_list = [author_doc_to_model(doc) for doc in author_docs]
+    authors_list = [author_to_dict(doc) for doc in cursor]
 
-    return AuthorsPaginationResponse(
-        total_count=total_count,
-        page=page,
-        page_size=page_size,
-        authors=authors_list
-    )
+    return FastJSONResponse({
+        "total_count": total_count,
+        "page": page,
+        "page_size": page_size,
+        "authors": authors_list
+    })
 
-@app.get("/authors/objnr/{obj_id}", response_model=AuthorModel)
+@app.get("/authors/objnr/{obj_id}", responses={200: {"model": AuthorModel}})
 def get_author_by_objectid(obj_id: str):
     """
     Sucht nach einem Autor mit bestimmter MongoDB-ObjektID.
@@ -497,11 +847,153 @@ def get_author_by_objectid(obj_id: str):
     except:
         raise HTTPException(status_code=400, detail="Invalid ObjectId format.")
 
-    author_doc = authors_collection.find_one({"_id": oid})
+    author_doc = authors_collection.find_one({"_id": oid}, AUTHOR_PROJECTION)
     if not author_doc:
         raise HTTPException(
             status_code=404,
             detail=f"No author found for _id '{obj_id}'"
         )
 
-    return author_doc_to_model(author_doc)
+    return FastJSONResponse(author_to_dict(author_doc))
+
+# ---------------------------------------
+# KO-AUTORENSCHAFTSGRAPH
+# ---------------------------------------
+
+def require_coauthor_graph():
+    if coauthor_graph is None:
+        raise HTTPException(status_code=503, detail="Co-authorship graph not available.")
+    return coauthor_graph
+
+def validate_objectid(obj_id: str):
+    try:
+        ObjectId(obj_id)
+    except:
+        raise HTTPException(status_code=400, detail=f"Invalid ObjectId format: '{obj_id}'.")
+
+@app.get("/graph/collaborators/{obj_id}")
+def get_collaborators(obj_id: str, limit: int = 20):
+    """
+    Ko-Autoren eines Autors (MongoDB-ObjektID), absteigend nach Anzahl gemeinsamer Papers.
+    """
+    graph = require_coauthor_graph()
+    validate_objectid(obj_id)
+    collaborators = graph.collaborators(obj_id, limit=max(1, min(limit, 500)))
+    if collaborators is None:
+        raise HTTPException(status_code=404, detail=f"No author found for _id '{obj_id}'")
+    return {"author": obj_id, "collaborators": collaborators}
+
+@app.get("/graph/collaboration")
+def get_collaboration_strength(a: str, b: str):
+    """
+    Stärke der Zusammenarbeit zweier Autoren: gemeinsame Papers und Jaccard-Koeffizient.
+    """
+    graph = require_coauthor_graph()
+    validate_objectid(a)
+    validate_objectid(b)
+    result = graph.collaboration_strength(a, b)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Author not found in co-authorship graph.")
+    return result
+
+@app.get("/graph/path")
+def get_collaboration_path(source: str, target: str, max_depth: int = 6):
+    """
+    Kürzeste Kette von Ko-Autorenschaften zwischen zwei Autoren (z.B. "A -> B -> C").
+    """
+    graph = require_coauthor_graph()
+    validate_objectid(source)
+    validate_objectid(target)
+    path = graph.shortest_path(source, target, max_depth=max(1, min(max_depth, 10)))
+    if path is None:
+        raise HTTPException(status_code=404, detail="Author not found in co-authorship graph.")
+    if not path:
+        raise HTTPException(status_code=404, detail=f"No collaboration path within {max_depth} steps.")
+    return {"length": len(path) - 1, "path": path}
+
+@app.get("/graph/ego/{obj_id}")
+def get_ego_network(obj_id: str, limit: int = 50):
+    """
+    Ego-Netzwerk eines Autors für die Netzwerk-Visualisierung: Knoten (Autor + stärkste Ko-Autoren)
+    und alle Kanten zwischen ihnen, mit Anzahl gemeinsamer Papers als Gewicht.
+    """
+    graph = require_coauthor_graph()
+    validate_objectid(obj_id)
+    network = graph.ego_network(obj_id, limit=max(1, min(limit, 200)))
+    if network is None:
+        raise HTTPException(status_code=404, detail=f"No author found for _id '{obj_id}'")
+    return network
+
+# ---------------------------------------
+# BULK-EXPORT
+# ---------------------------------------
+
+def export_response(collection, kind: str, query: dict, format: str, fields: Optional[str]):
+    """
+    Ein sequentieller Cursor-Durchlauf (siehe exporter.py).
+    Alle Formate werden gestreamt, Parquet/Arrow batchweise (siehe exporter.iter_columnar).
+    """
+    if format not in exporter.EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format '{format}'. Use one of {exporter.EXPORT_FORMATS}.")
+    if format != "ndjson" and exporter.pa is None:
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow on the server.")
+
+    field_list = exporter.parse_fields(fields, kind)
+    docs = exporter.iter_export_docs(collection, query, field_list)
+    filename = f"{kind}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == "ndjson":
+        return StreamingResponse(exporter.iter_ndjson(docs), media_type=exporter.MEDIA_TYPES[format], headers=headers)
+
+    return StreamingResponse(
+        exporter.iter_columnar(docs, format, field_list),
+        media_type=exporter.MEDIA_TYPES[format],
+        headers=headers
+    )
+
+@app.get("/export/papers")
+def export_papers(
+    format: str = "ndjson",
+    fields: Optional[str] = None,
+    year: Optional[List[int]] = Query(None),
+    min_views: int = 0,
+    max_views: Optional[int] = None,
+    min_citations: int = 0,
+    max_citations: Optional[int] = None
+):
+    """
+    Export aller Papers (mit den üblichen Filtern) in einem Durchlauf.
+    - format: "ndjson" (gestreamt), "parquet" oder "arrow"
+    - fields: kommagetrennte Feldliste, Default: alle Listenfelder ohne content
+    """
+    query = build_filter_query({}, year, min_views, max_views, min_citations, max_citations)
+    return export_response(papers_collection, "papers", query, format, fields)
+
+@app.get("/export/authors")
+def export_authors(format: str = "ndjson", fields: Optional[str] = None):
+    """
+    Export aller Autoren in einem Durchlauf ("ndjson", "parquet" oder "arrow").
+    """
+    return export_response(authors_collection, "authors", {}, format, fields)
+
+# ---------------------------------------
+# SUGGEST / TYPEAHEAD
+# ---------------------------------------
+
+@app.get("/suggest")
+def suggest(q: str, k: int = 10, type: Optional[str] = None):
+    """
+    Typeahead für Paper-Titel und Autorennamen (Präfix auf Wortanfänge, Top-k nach Zitationen).
+    Beantwortet die Anfrage komplett aus dem In-Memory-Index, ohne Datenbankzugriff.
+    - type: "title", "author" oder leer für beides
+    """
+    if type not in (None, "title", "author"):
+        raise HTTPException(status_code=400, detail=f"Invalid type '{type}'. Use 'title' or 'author'.")
+    if suggest_index is None:
+        raise HTTPException(status_code=503, detail="Suggest index is not ready yet.")
+
+    return {
+        "query": q,
+        "suggestions": suggest_index.suggest(q, k=k, kind=type)
+    }
@@ -0,0 +1,294 @@
+import os
+import json
+import time
+import shutil
+import argparse
+from collections import deque
+import numpy as np
+from scipy import sparse
+from bson import ObjectId
+from pymongo import MongoClient, ASCENDING
+from dotenv import load_dotenv
+from ingestEpoch import bump_ingest_epoch
+
+# Ko-Autorenschaftsgraph der Hub-Autoren.
+#
+# Offline (python coauthorGraph.py, nach dem Ingest):
+#   - Knoten sind die Dokumente der authors-Collection, Kantengewicht = Anzahl gemeinsamer Papers
+#   - berechnet als B·Bᵀ über die Inzidenzmatrix Autor x Paper (aus den "papers"-Listen der Autoren)
+#   - gespeichert als CSR in getrennten .npy-Dateien (indptr, indices, weights), die API lädt sie per mmap
+#
+# Inkrementell: processed_papers.json merkt sich, welche Papers schon im Graphen stecken. Ein Lauf ohne --full
+# addiert nur die Kanten der neuen Papers auf den letzten Build. Werden Papers gelöscht oder nachträglich
+# anderen Autoren zugeordnet, sollte mit --full neu gebaut werden.
+#
+# Layout wie beim Embedding-Index: coauthor_graph/<zeitstempel>/ plus Zeiger coauthor_graph/CURRENT.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+AUTHORS_COLLECTION = "authors"
+PAPERS_COLLECTION = "papers"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+GRAPH_DIR = os.path.join(BASE_DIR, "coauthor_graph")
+CURRENT_FILE = "CURRENT"
+KEEP_BUILDS = 2
+IN_CHUNK_SIZE = 5000        # Paper-IDs pro $in-Abfrage im inkrementellen Lauf
+MAX_PATH_DEPTH = 6
+
+
+# ---------------------------------------
+# Build
+# ---------------------------------------
+
+def _write_build(output_root, indptr, indices, weights, paper_counts, author_ids, names, processed_papers):
+    # Zeitstempel + Nanosekunden + PID: eindeutig auch bei mehreren Builds pro Sekunde, sortiert nach Zeit
+    build_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{os.getpid()}"
+    build_dir = os.path.join(output_root, build_name)
+    os.makedirs(build_dir)
+
+    np.save(os.path.join(build_dir, "indptr.npy"), indptr.astype(np.int64))
+    np.save(os.path.join(build_dir, "indices.npy"), indices.astype(np.int32))
+    np.save(os.path.join(build_dir, "weights.npy"), weights.astype(np.int32))
+    np.save(os.path.join(build_dir, "paper_counts.npy"), paper_counts.astype(np.int32))
+    with open(os.path.join(build_dir, "authors.json"), "w", encoding="utf-8") as f:
+        json.dump({"ids": author_ids, "names": names}, f)
+    with open(os.path.join(build_dir, "processed_papers.json"), "w", encoding="utf-8") as f:
+        json.dump(sorted(processed_papers), f)
+    with open(os.path.join(build_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "authors": len(author_ids),
+            "edges": int(len(indices) // 2),
+            "papers": len(processed_papers),
+            "built_at": time.time()
+        }, f, indent=2)
+
+    current_tmp = os.path.join(output_root, CURRENT_FILE + ".tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(build_dir))
+    os.replace(current_tmp, os.path.join(output_root, CURRENT_FILE))
+
+    builds = sorted(d for d in os.listdir(output_root) if os.path.isdir(os.path.join(output_root, d)))
+    for old in builds[:-KEEP_BUILDS]:
+        shutil.rmtree(os.path.join(output_root, old), ignore_errors=True)
+    return build_dir
+
+
+def _author_docs(authors_col, new_paper_ids, full):
+    """Alle Autoren (voll) bzw. nur die Autoren, die eines der neuen Papers in ihrer Liste haben."""
+    if full:
+        yield from authors_col.find({}, {"name": 1, "papers": 1})
+        return
+
+    seen = set()
+    oids = [ObjectId(p) for p in new_paper_ids]
+    for i in range(0, len(oids), IN_CHUNK_SIZE):
+        for doc in authors_col.find({"papers": {"$in": oids[i:i + IN_CHUNK_SIZE]}}, {"name": 1, "papers": 1}):
+            if doc["_id"] not in seen:
+                seen.add(doc["_id"])
+                yield doc
+
+
+def build_coauthor_graph(db, full: bool = False, output_root: str = GRAPH_DIR):
+    """Baut den Graphen neu (full) oder addiert die Kanten aller noch nicht verarbeiteten Papers."""
+    authors_col = db[AUTHORS_COLLECTION]
+    authors_col.create_index([("papers", ASCENDING)])
+
+    previous = None if full else CoauthorGraph.load_current(output_root)
+    processed = set(previous.processed_papers()) if previous else set()
+    new_papers = {str(doc["_id"]) for doc in db[PAPERS_COLLECTION].find({}, {"_id": 1})} - processed
+    if previous is not None and not new_papers:
+        print("[CoauthorGraph] Keine neuen Papers, Graph ist aktuell.")
+        return None
+
+    author_ids = list(previous.author_ids) if previous else []
+    names = list(previous.names) if previous else []
+    position = {author_id: i for i, author_id in enumerate(author_ids)}
+
+    rows, cols = [], []
+    paper_position = {}
+    for doc in _author_docs(authors_col, new_papers, previous is None):
+        author_id = str(doc["_id"])
+        if author_id not in position:
+            position[author_id] = len(author_ids)
+            author_ids.append(author_id)
+            names.append(doc.get("name", ""))
+        else:
+            names[position[author_id]] = doc.get("name", "")
+        for paper_id in doc.get("papers") or []:
+            paper_id = str(paper_id)
+            if paper_id in new_papers:
+                rows.append(position[author_id])
+                cols.append(paper_position.setdefault(paper_id, len(paper_position)))
+
+    n = len(author_ids)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(n, max(1, len(paper_position)))
+    )
+    # Inzidenz ist binär, aber dieselbe Kombination kann doppelt in einer Autorenliste stehen
+    incidence.data[:] = 1
+    weights = (incidence @ incidence.T).tocsr()
+    paper_counts = np.asarray(incidence.sum(axis=1)).ravel()
+
+    if previous is not None:
+        old = previous.matrix().copy()
+        old.resize((n, n))
+        weights = (weights + old).tocsr()
+        paper_counts[:len(previous.paper_counts)] += previous.paper_counts
+
+    weights = (weights - sparse.diags(weights.diagonal())).tocsr()
+    weights.eliminate_zeros()
+    weights.sort_indices()
+
+    build_dir = _write_build(
+        output_root, weights.indptr, weights.indices, weights.data, paper_counts,
+        author_ids, names, processed | new_papers
+    )
+    print(f"[CoauthorGraph] {n} Autoren, {weights.nnz // 2} Kanten, {len(new_papers)} neue Papers -> {build_dir}")
+    return build_dir
+
+
+# ---------------------------------------
+# Laden & Abfragen (in der API)
+# ---------------------------------------
+
+class CoauthorGraph:
+    def __init__(self, build_dir: str):
+        with open(os.path.join(build_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(build_dir, "authors.json"), "r", encoding="utf-8") as f:
+            authors = json.load(f)
+        self.build_dir = build_dir
+        self.author_ids = authors["ids"]
+        self.names = authors["names"]
+        self.position = {author_id: i for i, author_id in enumerate(self.author_ids)}
+        self.indptr = np.load(os.path.join(build_dir, "indptr.npy"), mmap_mode="r")
+        self.indices = np.load(os.path.join(build_dir, "indices.npy"), mmap_mode="r")
+        self.weights = np.load(os.path.join(build_dir, "weights.npy"), mmap_mode="r")
+        self.paper_counts = np.load(os.path.join(build_dir, "paper_counts.npy"))
+
+    @classmethod
+    def load_current(cls, root: str = GRAPH_DIR):
+        """Lädt den Build, auf den coauthor_graph/CURRENT zeigt (None, wenn noch keiner existiert)."""
+        current_path = os.path.join(root, CURRENT_FILE)
+        if not os.path.exists(current_path):
+            return None
+        with open(current_path, "r", encoding="utf-8") as f:
+            build_dir = os.path.join(root, f.read().strip())
+        return cls(build_dir)
+
+    def processed_papers(self) -> list:
+        # Nur für den inkrementellen Build nötig, daher nicht im Konstruktor geladen
+        with open(os.path.join(self.build_dir, "processed_papers.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def matrix(self) -> sparse.csr_matrix:
+        n = len(self.author_ids)
+        return sparse.csr_matrix((self.weights, self.indices, self.indptr), shape=(n, n))
+
+    def _neighbours(self, i: int):
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.weights[start:end]
+
+    def _node(self, i: int) -> dict:
+        return {"id": self.author_ids[i], "name": self.names[i], "paper_count": int(self.paper_counts[i])}
+
+    def collaborators(self, author_id: str, limit: int = 20):
+        """Ko-Autoren absteigend nach Anzahl gemeinsamer Papers (None, wenn der Autor unbekannt ist)."""
+        i = self.position.get(author_id)
+        if i is None:
+            return None
+        neighbours, weights = self._neighbours(i)
+        order = np.argsort(-np.asarray(weights), kind="stable")[:limit]
+        return [dict(self._node(int(neighbours[j])), shared_papers=int(weights[j])) for j in order]
+
+    def collaboration_strength(self, author_a: str, author_b: str):
+        """Gemeinsame Papers und Jaccard-Koeffizient der Paper-Mengen beider Autoren."""
+        a, b = self.position.get(author_a), self.position.get(author_b)
+        if a is None or b is None:
+            return None
+        neighbours, weights = self._neighbours(a)
+        j = np.searchsorted(neighbours, b)
+        shared = int(weights[j]) if j < len(neighbours) and neighbours[j] == b else 0
+        union = int(self.paper_counts[a]) + int(self.paper_counts[b]) - shared
+        return {
+            "author_a": self._node(a),
+            "author_b": self._node(b),
+            "shared_papers": shared,
+            "jaccard": round(shared / union, 4) if union else 0.0
+        }
+
+    def shortest_path(self, source: str, target: str, max_depth: int = MAX_PATH_DEPTH):
+        """
+        Kürzeste Kette von Ko-Autorenschaften (Breitensuche, Anzahl Schritte).
+        Gibt die Autoren entlang des Pfades zurück, [] wenn keiner innerhalb max_depth existiert,
+        None wenn einer der Autoren unbekannt ist.
+        """
+        s, t = self.position.get(source), self.position.get(target)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return [self._node(s)]
+
+        parent = np.full(len(self.author_ids), -1, dtype=np.int64)
+        parent[s] = s
+        queue = deque([(s, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            neighbours, _ = self._neighbours(node)
+            for nxt in neighbours:
+                nxt = int(nxt)
+                if parent[nxt] != -1:
+                    continue
+                parent[nxt] = node
+                if nxt == t:
+                    path = [t]
+                    while path[-1] != s:
+                        path.append(int(parent[path[-1]]))
+                    return [self._node(i) for i in reversed(path)]
+                queue.append((nxt, depth + 1))
+        return []
+
+    def ego_network(self, author_id: str, limit: int = 50):
+        """
+        Ego-Netzwerk für die Visualisierung: der Autor, seine stärksten Ko-Autoren und
+        alle Kanten zwischen diesen Knoten.
+        """
+        i = self.position.get(author_id)
+        if i is None:
+            return None
+        neighbours, weights = self._neighbours(i)
+        top = np.argsort(-np.asarray(weights), kind="stable")[:limit]
+        members = [i] + [int(neighbours[j]) for j in top]
+        member_set = set(members)
+
+        edges = []
+        for u in members:
+            neighbours_u, weights_u = self._neighbours(u)
+            for v, w in zip(neighbours_u, weights_u):
+                v = int(v)
+                if u < v and v in member_set:
+                    edges.append({"source": self.author_ids[u], "target": self.author_ids[v], "weight": int(w)})
+
+        return {"nodes": [self._node(u) for u in members], "edges": edges}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baut den Ko-Autorenschaftsgraphen (CSR) aus authors/papers.")
+    parser.add_argument("--full", action="store_true", help="Komplett neu bauen statt nur neue Papers hinzuzufügen")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    if build_coauthor_graph(db, full=args.full):
+        bump_ingest_epoch(db, source="coauthorGraph")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,3 @@
-import json
 from pymongo import MongoClient
 import gridfs
 import requests
@@ -6,17 +5,15 @@ from requests.exceptions import RequestException
 from dotenv import load_dotenv
 import os
 import fitz  # PyMuPDF
+from streamingParsers import iter_json_array
 
 load_dotenv()
 
 uri = os.getenv("MongoDB-uri")
 
 def extract_metadata_from_json(json_file):
-    with open(json_file, 'r') as f:
-        papers_data = json.load(f)
-    
-    papers = []
-    for entry in papers_data:
+    """Generator: liest das JSON-Array inkrementell und liefert die Papers einzeln."""
+    for entry in iter_json_array(json_file):
         # Autoreninformationen sammeln
         authors = []
         if 'authors' in entry:
@@ -44,9 +41,7 @@ def extract_metadata_from_json(json_file):
         if 'files' in entry and len(entry['files']) > 0:
             paper["pdf"] = entry['files'][0]['links']['self']
 
-        papers.append(paper)
-
-    return papers
+        yield paper
 
 def save_pdf_to_gridfs(pdf_url, fs):
     if not pdf_url.startswith(('http://', 'https://')):
@@ -98,7 +93,6 @@ def save_to_mongodb(papers):
 
 if __name__ == "__main__":
     papers = extract_metadata_from_json("combined_results.json")
-    print("Extracted Metadata:", papers)
     save_to_mongodb(papers)
 
 
@@ -0,0 +1,312 @@
+import os
+import json
+import time
+import shutil
+import pickle
+import argparse
+import numpy as np
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from ingestEpoch import bump_ingest_epoch
+
+# Semantische Suche über Titel + Abstract.
+#
+# Offline (python embeddingIndex.py):
+#   - Vektorisierung mit einem lokalen sentence-transformers-Modell (falls installiert, --encoder sentence-transformers)
+#     oder TF-IDF + TruncatedSVD (läuft überall auf der CPU, Default)
+#   - L2-normierte float32-Matrix als .npy (wird von der API per mmap geladen)
+#   - IVF-Index (k-Means-Grobquantisierer, invertierte Listen), damit eine Anfrage nur
+#     nprobe Listen statt der ganzen Matrix durchsucht
+#
+# Jeder Build landet in embeddings/<zeitstempel>/, die Datei embeddings/CURRENT zeigt auf den aktuellen.
+# So kann ein neuer Index geschrieben werden, während die API noch den alten per mmap offen hat.
+# Ältere Builds (über KEEP_BUILDS hinaus) werden gelöscht; die API lädt deshalb beim Öffnen eines Builds
+# alles, was nicht per mmap offen bleibt (Encoder), sofort.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+PAPERS_COLLECTION = "papers"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EMBEDDING_DIR = os.path.join(BASE_DIR, "embeddings")
+CURRENT_FILE = "CURRENT"
+KEEP_BUILDS = 2
+
+SVD_DIMENSIONS = 256
+ST_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+IVF_MIN_VECTORS = 2000     # darunter ist eine exakte Suche schneller als IVF
+KMEANS_ITERATIONS = 20
+DEFAULT_NPROBE = 8
+MAX_NPROBE = 256
+
+
+def paper_text(doc: dict) -> str:
+    title = doc.get("title") or ""
+    abstract = doc.get("abstract") or ""
+    if abstract == "unknown":
+        abstract = ""
+    return f"{title}. {abstract}".strip()
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (matrix / norms).astype(np.float32)
+
+
+# ---------------------------------------
+# Encoder
+# ---------------------------------------
+
+class TfidfSvdEncoder:
+    """TF-IDF + TruncatedSVD (LSA): CPU-freundlicher Fallback ohne Modell-Download."""
+    name = "tfidf-svd"
+
+    def __init__(self, vectorizer=None, svd=None):
+        self.vectorizer = vectorizer
+        self.svd = svd
+
+    def fit_transform(self, texts):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.decomposition import TruncatedSVD
+
+        self.vectorizer = TfidfVectorizer(sublinear_tf=True, min_df=1, max_df=0.9, stop_words="english")
+        tfidf = self.vectorizer.fit_transform(texts)
+        dimensions = max(1, min(SVD_DIMENSIONS, tfidf.shape[0] - 1, tfidf.shape[1] - 1))
+        self.svd = TruncatedSVD(n_components=dimensions, random_state=0)
+        return _normalize_rows(self.svd.fit_transform(tfidf))
+
+    def encode(self, texts):
+        return _normalize_rows(self.svd.transform(self.vectorizer.transform(texts)))
+
+    def save(self, directory):
+        with open(os.path.join(directory, "encoder.pkl"), "wb") as f:
+            pickle.dump((self.vectorizer, self.svd), f)
+
+    @classmethod
+    def load(cls, directory, meta):
+        with open(os.path.join(directory, "encoder.pkl"), "rb") as f:
+            vectorizer, svd = pickle.load(f)
+        return cls(vectorizer, svd)
+
+
+class SentenceTransformerEncoder:
+    """Lokales sentence-transformers-Modell (optional, nur wenn das Paket installiert ist)."""
+    name = "sentence-transformers"
+
+    def __init__(self, model_name=ST_MODEL):
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def fit_transform(self, texts):
+        return self.encode(texts)
+
+    def encode(self, texts):
+        vectors = self.model.encode(list(texts), batch_size=64, show_progress_bar=False, normalize_embeddings=True)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def save(self, directory):
+        pass  # das Modell liegt im HuggingFace-Cache, meta.json enthält den Namen
+
+    @classmethod
+    def load(cls, directory, meta):
+        return cls(meta["model"])
+
+
+ENCODERS = {TfidfSvdEncoder.name: TfidfSvdEncoder, SentenceTransformerEncoder.name: SentenceTransformerEncoder}
+
+
+# ---------------------------------------
+# IVF (invertierte Listen über k-Means-Zentroiden)
+# ---------------------------------------
+
+def build_ivf(vectors: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0):
+    """
+    Sphärisches k-Means (Kosinus) in numpy. Gibt (centroids, list_offsets, list_members) zurück:
+    die Mitglieder von Liste i sind list_members[list_offsets[i]:list_offsets[i + 1]].
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        counts = np.bincount(assignment, minlength=nlist)
+        empty = counts == 0
+        # Leere Listen mit zufälligen Vektoren neu besetzen
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()), replace=False)]
+        centroids = _normalize_rows(sums)
+
+    assignment = np.argmax(vectors @ centroids.T, axis=1)
+    list_members = np.argsort(assignment, kind="stable").astype(np.int32)
+    counts = np.bincount(assignment, minlength=nlist)
+    list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return centroids.astype(np.float32), list_offsets, list_members
+
+
+# ---------------------------------------
+# Build
+# ---------------------------------------
+
+def build_embedding_index(papers_col, encoder_name: str = TfidfSvdEncoder.name, output_root: str = EMBEDDING_DIR) -> str:
+    ids = []
+    texts = []
+    for doc in papers_col.find({}, {"title": 1, "abstract": 1}):
+        text = paper_text(doc)
+        if text and text != ".":
+            ids.append(str(doc["_id"]))
+            texts.append(text)
+
+    if len(texts) < 2:
+        print("[Embeddings] Zu wenige Papers für einen Index.")
+        return None
+
+    encoder = ENCODERS[encoder_name]()
+    vectors = encoder.fit_transform(texts)
+
+    # Zeitstempel + Nanosekunden + PID: eindeutig auch bei mehreren Builds pro Sekunde, sortiert nach Zeit
+    build_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{os.getpid()}"
+    build_dir = os.path.join(output_root, build_name)
+    os.makedirs(build_dir)
+
+    np.save(os.path.join(build_dir, "vectors.npy"), vectors)
+    with open(os.path.join(build_dir, "ids.json"), "w", encoding="utf-8") as f:
+        json.dump(ids, f)
+    encoder.save(build_dir)
+
+    nlist = 0
+    if len(vectors) >= IVF_MIN_VECTORS:
+        nlist = int(np.sqrt(len(vectors)))
+        centroids, list_offsets, list_members = build_ivf(vectors, nlist)
+        np.save(os.path.join(build_dir, "centroids.npy"), centroids)
+        np.save(os.path.join(build_dir, "list_offsets.npy"), list_offsets)
+        np.save(os.path.join(build_dir, "list_members.npy"), list_members)
+
+    meta = {
+        "encoder": encoder.name,
+        "model": getattr(encoder, "model_name", None),
+        "count": len(ids),
+        "dimensions": int(vectors.shape[1]),
+        "nlist": nlist,
+        "built_at": time.time()
+    }
+    with open(os.path.join(build_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    # Zeiger atomar umstellen, dann alte Builds aufräumen
+    current_tmp = os.path.join(output_root, CURRENT_FILE + ".tmp")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(build_dir))
+    os.replace(current_tmp, os.path.join(output_root, CURRENT_FILE))
+
+    builds = sorted(d for d in os.listdir(output_root) if os.path.isdir(os.path.join(output_root, d)))
+    for old in builds[:-KEEP_BUILDS]:
+        shutil.rmtree(os.path.join(output_root, old), ignore_errors=True)
+
+    print(f"[Embeddings] {len(ids)} Papers, {vectors.shape[1]} Dimensionen, nlist={nlist} -> {build_dir}")
+    return build_dir
+
+
+# ---------------------------------------
+# Laden & Suchen (in der API)
+# ---------------------------------------
+
+class EmbeddingIndex:
+    def __init__(self, build_dir: str):
+        with open(os.path.join(build_dir, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(os.path.join(build_dir, "ids.json"), "r", encoding="utf-8") as f:
+            self.ids = json.load(f)
+        self.build_dir = build_dir
+        self.position = {paper_id: i for i, paper_id in enumerate(self.ids)}
+        # mmap: die Matrix wird nicht in den Prozess kopiert, mehrere Worker teilen sich den Page-Cache
+        self.vectors = np.load(os.path.join(build_dir, "vectors.npy"), mmap_mode="r")
+        self.encoder = None  # load_current() lädt ihn sofort, sonst bei der ersten Textanfrage
+
+        self.centroids = None
+        if self.meta.get("nlist"):
+            self.centroids = np.load(os.path.join(build_dir, "centroids.npy"))
+            self.list_offsets = np.load(os.path.join(build_dir, "list_offsets.npy"))
+            self.list_members = np.load(os.path.join(build_dir, "list_members.npy"), mmap_mode="r")
+
+    @classmethod
+    def load_current(cls, root: str = EMBEDDING_DIR):
+        """Lädt den Build, auf den embeddings/CURRENT zeigt (None, wenn noch keiner existiert)."""
+        current_path = os.path.join(root, CURRENT_FILE)
+        if not os.path.exists(current_path):
+            return None
+        with open(current_path, "r", encoding="utf-8") as f:
+            build_dir = os.path.join(root, f.read().strip())
+        index = cls(build_dir)
+        # encoder.pkl jetzt lesen: der Build-Ordner kann gelöscht werden, während die API ihn noch nutzt
+        index.encoder = ENCODERS[index.meta["encoder"]].load(build_dir, index.meta)
+        return index
+
+    def encode(self, text: str) -> np.ndarray:
+        if self.encoder is None:
+            self.encoder = ENCODERS[self.meta["encoder"]].load(self.build_dir, self.meta)
+        return self.encoder.encode([text])[0]
+
+    def _candidates(self, vector: np.ndarray, nprobe: int):
+        if self.centroids is None:
+            return None
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        lists = np.argpartition(-(self.centroids @ vector), nprobe - 1)[:nprobe]
+        return np.concatenate([self.list_members[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists])
+
+    def search(self, vector: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE, exclude: str = None):
+        """Gibt [(paper_id, score), ...] absteigend nach Kosinus-Ähnlichkeit zurück."""
+        candidates = self._candidates(vector, nprobe)
+        if candidates is not None and len(candidates) == 0:
+            # alle untersuchten IVF-Listen sind leer
+            return []
+        if candidates is None:
+            scores = self.vectors @ vector
+            candidates = np.arange(len(scores))
+        else:
+            scores = self.vectors[candidates] @ vector
+
+        wanted = min(k + 1, len(scores))
+        top = np.argpartition(-scores, wanted - 1)[:wanted]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            paper_id = self.ids[int(candidates[i])]
+            if paper_id == exclude:
+                continue
+            results.append((paper_id, float(scores[i])))
+        return results[:k]
+
+    def similar_to(self, paper_id: str, k: int = 10, nprobe: int = DEFAULT_NPROBE):
+        position = self.position.get(paper_id)
+        if position is None:
+            return None
+        return self.search(np.asarray(self.vectors[position]), k, nprobe, exclude=paper_id)
+
+    def search_text(self, text: str, k: int = 10, nprobe: int = DEFAULT_NPROBE):
+        vector = self.encode(text)
+        if not np.any(vector):
+            # kein bekannter Begriff in der Anfrage: jede Ähnlichkeit wäre 0, die Treffer beliebig
+            return []
+        return self.search(vector, k, nprobe)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Baut den Embedding-Index (Titel + Abstract) für die semantische Suche.")
+    parser.add_argument("--encoder", choices=list(ENCODERS.keys()), default=TfidfSvdEncoder.name)
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    if build_embedding_index(db[PAPERS_COLLECTION], encoder_name=args.encoder):
+        bump_ingest_epoch(db, source="embeddingIndex")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import os
+import io
+import math
+import argparse
+from datetime import datetime
+from bson import ObjectId
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from queryFilters import build_filter_query
+from fastSerialization import to_json_bytes, PAPER_PROJECTION_WITHOUT_CONTENT, AUTHOR_PROJECTION
+
+# Optional: pyarrow wird nur für Parquet/Arrow benötigt. Ohne pyarrow steht nur NDJSON zur Verfügung.
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Bulk-Export von Papers und Autoren für Analysen.
+# Ein Export ist ein einziger sequentieller Durchlauf über einen MongoDB-Cursor mit großen Batches
+# (statt tausender Requests mit skip-Paginierung über /papers/all).
+#   - ndjson:  eine JSON-Zeile pro Dokument, wird gestreamt
+#   - parquet: spaltenorientiert, batchweise geschrieben und gestreamt (pyarrow, eine Row-Group pro Batch)
+#   - arrow:   Arrow-IPC-Stream, batchweise geschrieben und gestreamt (pyarrow)
+#
+# Parquet/Arrow brauchen das Schema vor dem ersten Batch. Es wird daher fest aus EXPORT_COLUMN_TYPES gebaut
+# (nicht aus den Daten abgeleitet, sonst wird ein Feld, das in den ersten Zeilen fehlt, zum Typ "null").
+# Unbekannte Felder werden als String exportiert (Nicht-Strings als JSON).
+#
+# CLI: python exporter.py papers --format parquet --output papers.parquet --fields title,authors,citations --year 2024
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+PAPERS_COLLECTION = "papers"
+AUTHORS_COLLECTION = "authors"
+
+BATCH_SIZE = 2000
+EXPORT_FORMATS = ["ndjson", "parquet", "arrow"]
+# Default-Felder: alles aus den Listen-Antworten, aber ohne Volltext ("content" kann explizit gewählt werden)
+DEFAULT_FIELDS = {
+    "papers": list(PAPER_PROJECTION_WITHOUT_CONTENT),
+    "authors": list(AUTHOR_PROJECTION),
+}
+# Spaltentyp je Feld für Parquet/Arrow: "string", "int", "float", "string_list" oder "json" (String mit JSON)
+EXPORT_COLUMN_TYPES = {
+    "_id": "string",
+    # papers
+    "title": "string",
+    "published": "string",
+    "authors": "string_list",
+    "author_keys": "string_list",
+    "relevance": "int",
+    "abstract": "string",
+    "citations": "int",
+    "views": "int",
+    "content": "string",
+    "journal": "string",
+    "doi": "string",
+    "tag": "string",
+    "platforms": "string_list",
+    "path": "string",
+    "path_image": "string",
+    "thumbnails": "json",
+    "is_hess_paper": "string",
+    "citationCount": "int",
+    "highlyInfluentialCitations": "int",
+    "trending_score": "float",
+    # authors
+    "name": "string",
+    "h_index": "int",
+    "highly_influential_citations": "int",
+    "image_path": "string",
+    "hub_paper_count": "int",
+    "hub_citations": "int",
+    "hub_recent_papers": "int",
+    "hub_h_index": "int",
+}
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def parse_fields(fields, kind: str) -> list:
+    """'title, authors, title' -> ["title", "authors"] (ohne Duplikate, Reihenfolge bleibt); leer -> Default-Felder."""
+    if not fields:
+        return DEFAULT_FIELDS[kind]
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    # Doppelte Spalten würden das Arrow-Schema erst mitten im Stream scheitern lassen
+    return list(dict.fromkeys(f.strip() for f in fields if f.strip() and f.strip() != "_id"))
+
+
+def _plain(value):
+    """ObjectIds/Datumswerte (auch verschachtelt) in Strings umwandeln."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def iter_export_docs(collection, query: dict, fields: list, batch_size: int = BATCH_SIZE):
+    """Ein sequentieller Cursor über alle passenden Dokumente, nur mit den gewählten Feldern."""
+    projection = {field: 1 for field in fields}
+    cursor = collection.find(query, projection).batch_size(batch_size)
+    for doc in cursor:
+        row = {"_id": str(doc["_id"])}
+        for field in fields:
+            row[field] = _plain(doc.get(field))
+        yield row
+
+
+def iter_ndjson(docs):
+    """Erzeugt NDJSON-Zeilen (bytes) für StreamingResponse oder eine Datei."""
+    for doc in docs:
+        yield to_json_bytes(doc) + b"\n"
+
+
+def _batches(docs, batch_size: int):
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _arrow_type(kind: str):
+    return {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "string_list": pa.list_(pa.string()),
+        "json": pa.string(),
+    }[kind]
+
+
+def export_schema(fields: list):
+    """Festes Arrow-Schema für _id + fields (siehe EXPORT_COLUMN_TYPES)."""
+    return pa.schema([
+        (field, _arrow_type(EXPORT_COLUMN_TYPES.get(field, "json")))
+        for field in ["_id"] + [f for f in fields if f != "_id"]
+    ])
+
+
+def _coerce(value, kind: str):
+    """Bringt einen Wert auf den Spaltentyp; was sich nicht umwandeln lässt, wird None (statt den Export abzubrechen)."""
+    if value is None:
+        return None
+    if kind in ("string", "json"):
+        if isinstance(value, str):
+            return value
+        return to_json_bytes(value).decode("utf-8") if isinstance(value, (dict, list)) or kind == "json" else str(value)
+    if kind in ("int", "float"):
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                return None
+        if not isinstance(value, (int, float)) or (isinstance(value, float) and not math.isfinite(value)):
+            return None
+        return int(value) if kind == "int" else float(value)
+    if kind == "string_list":
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, list):
+            return [v if isinstance(v, str) else str(v) for v in value if v is not None]
+        return None
+    return value
+
+
+def _to_table(batch: list, schema):
+    kinds = [(field.name, EXPORT_COLUMN_TYPES.get(field.name, "json")) for field in schema]
+    columns = {name: [_coerce(row.get(name), kind) for row in batch] for name, kind in kinds}
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Datei-Ersatz für die pyarrow-Writer: sammelt geschriebene Bytes, bis iter_columnar sie abholt."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_columnar(docs, export_format: str, fields: list, batch_size: int = BATCH_SIZE):
+    """
+    Erzeugt eine Parquet- oder Arrow-Datei als Folge von bytes (für StreamingResponse oder eine Datei).
+    Nach jedem Batch wird ausgegeben, was der Writer bis dahin geschrieben hat; der Speicherbedarf
+    bleibt damit bei etwa einem Batch.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed, columnar export is not available.")
+
+    schema = export_schema(fields)
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    closed = False
+    try:
+        for batch in _batches(docs, batch_size):
+            writer.write_table(_to_table(batch, schema))
+            data = sink.take()
+            if data:
+                yield data
+        # Ohne Treffer entsteht so eine leere, aber gültige Datei mit vollständigem Schema
+        writer.close()
+        closed = True
+        yield sink.take()
+    finally:
+        if not closed:
+            # Abbruch (z.B. Client hat die Verbindung getrennt)
+            writer.close()
+
+
+def write_columnar(docs, path: str, export_format: str = "parquet", fields: list = None, batch_size: int = BATCH_SIZE) -> int:
+    """Schreibt die Dokumente batchweise als Parquet- oder Arrow-Datei; gibt die Anzahl geschriebener Zeilen zurück."""
+    rows = 0
+
+    def counted(docs):
+        nonlocal rows
+        for doc in docs:
+            rows += 1
+            yield doc
+
+    with open(path, "wb") as f:
+        for chunk in iter_columnar(counted(docs), export_format, fields or [], batch_size):
+            f.write(chunk)
+    return rows
+
+
+def paper_export_query(year=None, min_views: int = 0, max_views=None, min_citations: int = 0, max_citations=None) -> dict:
+    return build_filter_query({}, year, min_views, max_views, min_citations, max_citations)
+
+
+def export_to_file(db, kind: str, path: str, export_format: str = "ndjson", fields=None, query: dict = None, batch_size: int = BATCH_SIZE) -> int:
+    collection = db[PAPERS_COLLECTION if kind == "papers" else AUTHORS_COLLECTION]
+    fields = parse_fields(fields, kind)
+    docs = iter_export_docs(collection, query or {}, fields, batch_size)
+
+    if export_format == "ndjson":
+        rows = 0
+        with open(path, "wb") as f:
+            for line in iter_ndjson(docs):
+                f.write(line)
+                rows += 1
+        return rows
+    return write_columnar(docs, path, export_format, fields, batch_size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportiert Papers oder Autoren als NDJSON, Parquet oder Arrow.")
+    parser.add_argument("kind", choices=["papers", "authors"])
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--output", required=True, help="Zieldatei")
+    parser.add_argument("--fields", default=None, help="Kommagetrennte Feldliste (Default: alle Listenfelder ohne content)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    # Filter wie bei den Paper-Endpunkten (nur für papers)
+    parser.add_argument("--year", type=int, action="append")
+    parser.add_argument("--min-views", type=int, default=0)
+    parser.add_argument("--max-views", type=int, default=None)
+    parser.add_argument("--min-citations", type=int, default=0)
+    parser.add_argument("--max-citations", type=int, default=None)
+    args = parser.parse_args()
+
+    query = {}
+    if args.kind == "papers":
+        query = paper_export_query(args.year, args.min_views, args.max_views, args.min_citations, args.max_citations)
+
+    client = MongoClient(MONGO_URI)
+    rows = export_to_file(client[DB_NAME], args.kind, args.output, args.format, args.fields, query, args.batch_size)
+    client.close()
+    print(f"[Export] {rows} {args.kind} -> {args.output} ({args.format})")
+
+
+if __name__ == "__main__":
+    main()
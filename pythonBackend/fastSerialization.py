@@ -0,0 +1,99 @@
+import json
+from datetime import datetime
+from bson import ObjectId
+from starlette.responses import Response
+
+# Optional: orjson serialisiert deutlich schneller als das json-Modul. Ohne orjson wird auf json zurückgefallen.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Schneller Serialisierungspfad für die Listen-Endpunkte:
+#   - MongoDB liefert per Projektion nur die Felder, die in der Antwort landen
+#   - Defaults werden in einem Durchlauf über eine Feldtabelle gesetzt (statt replaceNoneTypes pro Feld)
+#   - die Endpunkte geben FastJSONResponse zurück; FastAPI überspringt dann Pydantic-Validierung und
+#     jsonable_encoder, die Bytes werden direkt von orjson erzeugt
+# Die Pydantic-Modelle (Paper, AuthorModel) bleiben als Schema für die Dokumentation erhalten.
+
+# Feld -> Default, wenn das Feld fehlt oder None ist (Reihenfolge wie im Paper-Modell)
+PAPER_FIELD_DEFAULTS = {
+    "title": "unknown",
+    "published": "",
+    "authors": [],
+    "relevance": 0,
+    "abstract": "unknown",
+    "citations": 0,
+    "views": 0,
+    "content": "unknown",
+    "journal": "unknown",
+    "path": "no PDF existing",
+    "path_image": "no image found",
+    "thumbnails": {},
+    "is_hess_paper": "",
+    "citationCount": 0,
+    "highlyInfluentialCitations": 0,
+}
+PAPER_PROJECTION = {field: 1 for field in PAPER_FIELD_DEFAULTS}
+PAPER_PROJECTION_WITHOUT_CONTENT = {field: 1 for field in PAPER_FIELD_DEFAULTS if field != "content"}
+
+AUTHOR_FIELD_DEFAULTS = {
+    "name": "",
+    "h_index": 0,
+    "citations": 0,
+    "highly_influential_citations": 0,
+    "image_path": "images/placeholder_author.png",
+    "hub_paper_count": 0,
+    "hub_citations": 0,
+    "hub_recent_papers": 0,
+    "hub_h_index": 0,
+}
+AUTHOR_PROJECTION = {field: 1 for field in AUTHOR_FIELD_DEFAULTS}
+
+
+def paper_to_dict(doc: dict, include_content: bool = True, snippets: dict = None) -> dict:
+    """Paper-Dokument -> JSON-fertiges dict mit denselben Feldern wie das Paper-Modell."""
+    result = {"objectId": str(doc.get("_id", ""))}
+    for field, default in PAPER_FIELD_DEFAULTS.items():
+        value = doc.get(field)
+        result[field] = default if value is None else value
+    if not include_content:
+        result["content"] = None
+    result["snippets"] = snippets
+    return result
+
+
+def author_to_dict(doc: dict) -> dict:
+    """Autor-Dokument -> JSON-fertiges dict mit denselben Feldern wie AuthorModel (ohne papers)."""
+    result = {"objectId": str(doc["_id"])}
+    for field, default in AUTHOR_FIELD_DEFAULTS.items():
+        value = doc.get(field)
+        result[field] = default if value is None else value
+    return result
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "dict"):
+        return value.dict()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def to_json_bytes(content) -> bytes:
+    """Serialisiert content mit orjson (Fallback: json); ObjectIds werden zu Strings."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON-Response, die den Inhalt direkt mit orjson (Fallback: json) in Bytes umwandelt."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return to_json_bytes(content)
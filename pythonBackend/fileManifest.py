@@ -0,0 +1,87 @@
+import os
+import hashlib
+from datetime import datetime, timezone
+
+# Datei-Manifest für den Ingest (Collection "file_manifest"), damit unveränderte PDFs bei einem erneuten
+# Ingest nicht wieder geparst werden (Text, Hash, Bildextraktion in extract_pdf_content).
+#
+# Ein Eintrag pro PDF, Schlüssel ist der "path" des Papers ("pdfs/..."):
+#   {_id: path, size, mtime_ns, file_md5, paper_md5_hash, paper_id, source, updated_at}
+#
+# source ist die Quelle, aus der der Inhalt tatsächlich gelesen wurde, falls das nicht die Datei selbst ist
+# (XML-Ingest: PDF-URL; die lokale Datei wird dort nur per Titel zugeordnet). Mehrere Einträge, die auf
+# dieselbe Datei fallen, gelten so nicht gegenseitig als unverändert.
+#
+# check(path, source) entscheidet (bei gleicher source) in zwei Stufen:
+#   1. Größe + mtime unverändert                 -> unverändert (nur ein stat, kein Lesen)
+#   2. sonst MD5 der Datei gleich dem Manifest   -> unverändert (z.B. nach Kopieren/touch), stat wird aktualisiert
+# Erst wenn beides nicht zutrifft, wird die PDF wie bisher verarbeitet.
+
+MANIFEST_COLLECTION = "file_manifest"
+HASH_CHUNK_SIZE = 1024 * 1024
+PDF_URL_PREFIX = "pdfs"
+
+
+def file_md5(path: str) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class FileManifest:
+    def __init__(self, manifest_col, pdf_directory: str):
+        self.manifest_col = manifest_col
+        self.pdf_directory = pdf_directory
+        self.unchanged = 0
+        self.rehashed = 0
+        self.changed = 0
+
+    def local_path(self, path: str) -> str:
+        """'pdfs/arxiv/x.pdf' -> '<pdf_directory>/arxiv/x.pdf'"""
+        return os.path.join(self.pdf_directory, os.path.relpath(path, PDF_URL_PREFIX))
+
+    def check(self, path: str, source: str = None):
+        """Gibt den Manifest-Eintrag zurück, wenn die Datei seit dem letzten Ingest unverändert ist, sonst None."""
+        try:
+            stat = os.stat(self.local_path(path))
+        except OSError:
+            return None
+        entry = self.manifest_col.find_one({"_id": path})
+        if entry is None or entry.get("source") != source:
+            self.changed += 1
+            return None
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            self.unchanged += 1
+            return entry
+        if entry.get("size") == stat.st_size and entry.get("file_md5") == file_md5(self.local_path(path)):
+            self.manifest_col.update_one({"_id": path}, {"$set": {"mtime_ns": stat.st_mtime_ns}})
+            self.rehashed += 1
+            return entry
+        self.changed += 1
+        return None
+
+    def record(self, path: str, paper_md5_hash: str, paper_id, source: str = None):
+        """Nach erfolgreicher Verarbeitung aufrufen."""
+        local = self.local_path(path)
+        try:
+            stat = os.stat(local)
+        except OSError:
+            return
+        self.manifest_col.update_one(
+            {"_id": path},
+            {"$set": {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "file_md5": file_md5(local),
+                "paper_md5_hash": paper_md5_hash,
+                "paper_id": paper_id,
+                "source": source,
+                "updated_at": datetime.now(timezone.utc),
+            }},
+            upsert=True
+        )
+
+    def summary(self) -> str:
+        return f"{self.unchanged + self.rehashed} unverändert ({self.rehashed} per Hash geprüft), {self.changed} neu/geändert"
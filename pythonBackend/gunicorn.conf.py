@@ -0,0 +1,48 @@
+import gc
+import multiprocessing
+import os
+
+# Produktionsbetrieb mit mehreren Worker-Prozessen (pip install gunicorn uvicorn):
+#   gunicorn backendAPI:app -c gunicorn.conf.py
+#
+# Ablauf:
+#   1. preload_app: der Master importiert backendAPI einmal. Der MongoClient ist lazy (connect=False),
+#      es entstehen noch keine Verbindungen oder Threads.
+#   2. when_ready: der Master baut Suggest-Index, Embedding-Index und Graph (preload_shared_state) und
+#      friert den Heap ein (gc.freeze), damit die Garbage-Collection-Läufe der Worker die geerbten Objekte
+#      nicht durchlaufen.
+#   3. fork: die Embedding-/Graph-Arrays sind per mmap geladen und liegen nur einmal im Page-Cache. Die großen
+#      Teile des Suggest-Index sind numpy-Arrays ohne Python-Objekte je Eintrag und bleiben copy-on-write
+#      geteilt. Alle übrigen Python-Objekte werden beim ersten Zugriff eines Workers trotzdem kopiert, weil
+#      schon das Lesen ihren Referenzzähler schreibt; gc.freeze ändert daran nichts.
+#   4. startup im Worker: MongoDB-Verbindung, Epoch-Watcher und View-Counter pro Worker; warm_up() lädt nur
+#      nach, was sich seit dem Preload geändert hat. /ready antwortet bis dahin mit 503.
+#
+# Nach einem Ingest baut jeder Worker seine Strukturen selbst neu (Epoch-Watcher); geteilt ist nur der
+# Stand vom Start des Masters bzw. der bei jedem Neustart eines Workers erneut geforkte Stand.
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Worker nach N Anfragen neu starten (0 = nie); neue Worker werden wieder vom vorgeladenen Master geforkt
+max_requests = int(os.getenv("MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # Läuft im Master nach dem Laden der App und vor dem Start der Worker
+    import backendAPI
+    try:
+        backendAPI.preload_shared_state()
+    except Exception as e:
+        # Ohne Preload baut jeder Worker seine Strukturen im warm_up() selbst
+        server.log.warning(f"[Preload] Fehlgeschlagen, Worker laden selbst: {e}")
+    gc.freeze()
+    if os.getenv("VIEW_LOG_PATH") and workers > 1:
+        server.log.warning("[Views] VIEW_LOG_PATH wird von allen Workern geteilt; nur mit einem Worker verwenden.")
@@ -0,0 +1,410 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import pstats
+import cProfile
+import argparse
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+from functools import partial
+from urllib.parse import quote
+from contextlib import redirect_stdout
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from xml.sax.saxutils import escape
+from dotenv import load_dotenv
+from mergePdfs import merge_pdfs, sanitize_filename
+from ingestOrchestrator import load_metadata_extraction
+from fileManifest import MANIFEST_COLLECTION
+from syntheticCorpus import _text, _words
+
+try:
+    import resource   # nur Unix, für die maximale RSS des Prozesses
+except ImportError:
+    resource = None
+
+# Benchmark für den Ingest (getrennt von apiBenchmark.py).
+#
+# Erzeugt in einem Arbeitsverzeichnis einen synthetischen Harvest-Baum:
+#   raw_pdfs/<Autor>/<Titel>.pdf   (inkl. Duplikate, damit merge_pdfs deduplizieren muss)
+#   xmls/*.xml                     (ArXiv Atom-XML, PDF-Links zeigen auf einen lokalen HTTP-Server)
+#   jsons/*.json                   (PubMed-JSON wie combined_results.json)
+#   semanticAPI/_raw/...           (Semantic-Scholar-Fixture mit leicht veränderten Titeln + Rauschen)
+# und misst die Stufen
+#   merge     mergePdfs.merge_pdfs
+#   extract   metadata-extraction.process_all_files (Parsen, PDF-Text/-Bilder, MongoDB-Writes)
+#   reextract derselbe Aufruf erneut; unveränderte PDFs überspringt das Datei-Manifest (fileManifest.py)
+#   snapshot / match / apply   semanticScholarPipeline gegen die Fixture (kein API-Zugriff)
+# mit Dateien/s, MB/s, Python-Heap-Peak (tracemalloc) und maximaler Prozess-RSS.
+#
+# Optional: --profile DIR schreibt pro Stufe ein cProfile (.prof, z.B. für snakeviz) und zeigt die teuersten
+# Funktionen; --py-spy FILE startet den ganzen Lauf unter py-spy und schreibt einen Flamegraph (SVG).
+#
+# python ingestBenchmark.py --papers 500 --pages 4 --json results.json
+# python ingestBenchmark.py --mongomock --papers 100 --profile profiles/
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+INGEST_BENCHMARK_DB = os.getenv("INGEST_BENCHMARK_DB", "hub_ingest_benchmark")
+CHILD_ENV = "INGEST_BENCHMARK_CHILD"
+
+# reextract: zweiter Durchlauf über dieselben Dateien (unveränderte PDFs werden per Manifest übersprungen)
+STAGES = ["merge", "extract", "reextract", "snapshot", "match", "apply"]
+PROFILE_TOP = 15
+
+
+# ---------------------------------------
+# Fixture
+# ---------------------------------------
+
+def _png_bytes(fitz) -> bytes:
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), 0)
+    pixmap.clear_with(180)
+    return pixmap.tobytes("png")
+
+
+def write_pdf(fitz, path: str, title: str, pages: int, rng: random.Random, image: bytes = None):
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page()
+        text = title + "\n\n" if number == 0 else ""
+        if rng.random() < 0.3 and number == 0:
+            text += "Supported by hessian.AI, TU Darmstadt.\n"
+        text += _text(rng, 2500)
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=9)
+        if image and number == 0:
+            page.insert_image(fitz.Rect(400, 700, 464, 764), stream=image)
+    doc.save(path)
+    doc.close()
+
+
+def build_fixture(workdir: str, papers: int, pages: int, duplicates: float, relevant_authors: list, seed: int) -> dict:
+    """Schreibt die PDFs (raw_pdfs/); gibt die Paper-Liste (Titel, Autoren, Quelle, Dateiname) für die Harvest-Dateien zurück."""
+    import fitz  # PyMuPDF, wie in metadata-extraction.py
+
+    rng = random.Random(seed)
+    raw_dir = os.path.join(workdir, "raw_pdfs")
+    xml_dir = os.path.join(workdir, "xmls")
+    json_dir = os.path.join(workdir, "jsons")
+    for directory in (raw_dir, xml_dir, json_dir):
+        os.makedirs(directory, exist_ok=True)
+    image = _png_bytes(fitz)
+
+    entries = []
+    for index in range(papers):
+        title = f"{_words(rng, rng.randint(4, 9)).capitalize()} {index}"
+        authors = rng.sample(relevant_authors, rng.randint(1, 3)) + [f"Extern Author{rng.randint(0, 500)}"]
+        folder = os.path.join(raw_dir, authors[0])
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{title}.pdf")
+        write_pdf(fitz, path, title, pages, rng, image if rng.random() < 0.5 else None)
+        if rng.random() < duplicates:
+            # identische Kopie bei einem Koautor, wie sie beim Harvest pro Autor entsteht
+            copy_dir = os.path.join(raw_dir, authors[1] if len(authors) > 1 else "duplicates")
+            os.makedirs(copy_dir, exist_ok=True)
+            shutil.copyfile(path, os.path.join(copy_dir, f"{title}.pdf"))
+        entries.append({
+            "title": title,
+            "authors": authors,
+            "year": rng.randint(2020, 2025),
+            "source": "xml" if index % 2 == 0 else "json",
+            "filename": sanitize_filename(title) + ".pdf",
+        })
+    return {"entries": entries, "xml_dir": xml_dir, "json_dir": json_dir, "raw_dir": raw_dir}
+
+
+def write_harvest_files(entries: list, xml_dir: str, json_dir: str, xml_files: int, json_files: int,
+                        pdf_base_url: str, to_json_name, rng: random.Random):
+    xml_entries = [e for e in entries if e["source"] == "xml"]
+    json_entries = [e for e in entries if e["source"] == "json"]
+
+    for number in range(xml_files):
+        chunk = xml_entries[number::xml_files]
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<feed xmlns="http://www.w3.org/2005/Atom">']
+        for e in chunk:
+            lines.append("<entry>")
+            lines.append(f"<title>{escape(e['title'])}</title>")
+            lines.append(f"<published>{e['year']}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T00:00:00Z</published>")
+            lines.append(f"<summary>{escape(_text(rng, 800))}</summary>")
+            lines.extend(f"<author><name>{escape(name)}</name></author>" for name in e["authors"])
+            lines.append(f'<link title="pdf" href="{pdf_base_url}/{quote(e["filename"])}" rel="related"/>')
+            lines.append("</entry>")
+        lines.append("</feed>")
+        with open(os.path.join(xml_dir, f"arxiv_{number}.xml"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+    for number in range(json_files):
+        chunk = json_entries[number::json_files]
+        records = [{
+            "uid": str(10_000_000 + i),
+            "pubdate": f"{e['year']} Jan {rng.randint(1, 28)}",
+            "title": e["title"],
+            "authors": [{"name": to_json_name(name), "authtype": "Author"} for name in e["authors"]],
+            "articleids": [{"idtype": "doi", "value": f"10.0000/bench.{i}"}],
+            "fulljournalname": "Synthetic Journal",
+        } for i, e in enumerate(chunk)]
+        with open(os.path.join(json_dir, f"pubmed_{number}.json"), "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, indent=1)
+
+
+def write_semantic_fixture(db, rng: random.Random, noise_per_author: int, raw_snapshot: str) -> int:
+    """Vergibt Semantic-Scholar-IDs und schreibt authors_by_id.json mit leicht veränderten DB-Titeln + Rauschen."""
+    data_by_id = {}
+    for number, author in enumerate(db["authors"].find({}, {"papers": 1})):
+        sem_id = f"bench{number}"
+        db["authors"].update_one({"_id": author["_id"]}, {"$set": {"semantic_scholar_id": [sem_id]}})
+        papers = []
+        for paper in db["papers"].find({"_id": {"$in": author.get("papers", [])}}, {"title": 1}):
+            title = paper.get("title") or ""
+            papers.append({
+                "paperId": f"s2-{paper['_id']}",
+                # Semantic Scholar schreibt Titel oft anders (Groß-/Kleinschreibung, Satzzeichen)
+                "title": title.title().replace(" ", ", ", 1) if rng.random() < 0.5 else title,
+                "year": 2022,
+                "citationCount": rng.randint(0, 300),
+                "influentialCitationCount": rng.randint(0, 20),
+            })
+        for i in range(noise_per_author):
+            papers.append({"paperId": f"noise-{number}-{i}", "title": _words(rng, 7), "year": rng.randint(2015, 2025),
+                           "citationCount": rng.randint(0, 50), "influentialCitationCount": 0})
+        data_by_id[sem_id] = {"hIndex": rng.randint(1, 60), "citationCount": rng.randint(100, 30000), "papers": papers}
+
+    os.makedirs(os.path.dirname(raw_snapshot), exist_ok=True)
+    with open(raw_snapshot, "w", encoding="utf-8") as f:
+        json.dump(data_by_id, f)
+    return len(data_by_id)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory: str):
+    """Lokaler HTTP-Server für die PDF-Links der XML-Einträge (extract_pdf_content lädt sie per requests)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ---------------------------------------
+# Messung
+# ---------------------------------------
+
+def _tree_stats(*paths) -> tuple:
+    files, size = 0, 0
+    for path in paths:
+        for root, _, names in os.walk(path):
+            for name in names:
+                files += 1
+                size += os.path.getsize(os.path.join(root, name))
+    return files, size
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # Linux: KiB, macOS: Bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def run_stage(name: str, fn, items: int, size: int, trace_memory: bool, profile_dir: str, verbose: bool) -> dict:
+    profiler = cProfile.Profile() if profile_dir else None
+    if trace_memory:
+        tracemalloc.start()
+    output = sys.stdout if verbose else io.StringIO()
+
+    start = time.perf_counter()
+    with redirect_stdout(output):
+        if profiler:
+            profiler.enable()
+        try:
+            fn()
+        finally:
+            if profiler:
+                profiler.disable()
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    if profiler:
+        os.makedirs(profile_dir, exist_ok=True)
+        profile_path = os.path.join(profile_dir, f"{name}.prof")
+        profiler.dump_stats(profile_path)
+        print(f"[Ingest] Profil {name} -> {profile_path}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+    result = {
+        "stage": name,
+        "items": items,
+        "mb": round(size / 1e6, 2),
+        "seconds": round(seconds, 3),
+        "items_per_s": round(items / seconds, 1) if seconds else 0.0,
+        "mb_per_s": round(size / 1e6 / seconds, 2) if seconds else 0.0,
+        "heap_peak_mb": round(peak / 1e6, 1) if peak is not None else None,
+        "max_rss_mb": _max_rss_mb(),
+    }
+    print(f"[Ingest] {name}: {result['seconds']} s")
+    return result
+
+
+def print_table(results: list):
+    header = f"{'stage':<10}{'items':>8}{'MB':>9}{'s':>9}{'items/s':>10}{'MB/s':>9}{'heap MB':>9}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['stage']:<10}{r['items']:>8}{r['mb']:>9}{r['seconds']:>9}{r['items_per_s']:>10}{r['mb_per_s']:>9}"
+              f"{str(r['heap_peak_mb']):>9}{str(r['max_rss_mb']):>9}")
+
+
+# ---------------------------------------
+# Ablauf
+# ---------------------------------------
+
+def connect(args):
+    if args.mongomock:
+        try:
+            import mongomock
+        except ImportError:
+            raise SystemExit("--mongomock benötigt das Paket 'mongomock'.")
+        import pymongo
+        shared = mongomock.MongoClient()
+        # Module, die selbst einen Client erzeugen, sollen denselben Stand-in sehen
+        pymongo.MongoClient = lambda *a, **k: shared
+    from pymongo import MongoClient
+    return MongoClient(MONGO_URI)[args.db]
+
+
+def run(args) -> list:
+    db = connect(args)
+    db["papers"].drop()
+    db["authors"].drop()
+    db[MANIFEST_COLLECTION].drop()
+
+    # Die Semantic-Scholar-Pipeline arbeitet mit relativen Pfaden (semanticAPI/...); metadata-extraction
+    # schreibt Bilder nach images/ im aktuellen Verzeichnis
+    import semanticScholarPipeline as pipeline
+    metadata = load_metadata_extraction()
+    metadata.connect(db)
+
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="ingest_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+    rng = random.Random(args.seed)
+    server = None
+    try:
+        start = time.perf_counter()
+        fixture = build_fixture(workdir, args.papers, args.pages, args.duplicates, metadata.author_names, args.seed)
+        pdf_dir = os.path.join(workdir, "pdfs")
+        os.makedirs(pdf_dir, exist_ok=True)
+        server, base_url = serve_directory(pdf_dir)
+        write_harvest_files(fixture["entries"], fixture["xml_dir"], fixture["json_dir"], args.xml_files, args.json_files,
+                            base_url, metadata.convert_to_json_format, rng)
+        print(f"[Ingest] Fixture mit {args.papers} Papers in {time.perf_counter() - start:.1f} s erzeugt ({workdir}).")
+
+        results = []
+        stages = args.stages
+        measure = partial(run_stage, trace_memory=not args.no_tracemalloc, profile_dir=args.profile, verbose=args.verbose)
+
+        if "merge" in stages:
+            files, size = _tree_stats(fixture["raw_dir"])
+            results.append(measure("merge", lambda: merge_pdfs(fixture["raw_dir"], pdf_dir), files, size))
+
+        files, size = _tree_stats(fixture["xml_dir"], fixture["json_dir"])
+        pdf_files, pdf_size = _tree_stats(pdf_dir)
+        if "extract" in stages:
+            results.append(measure(
+                "extract",
+                lambda: metadata.process_all_files(fixture["xml_dir"], fixture["json_dir"], pdf_dir),
+                files + pdf_files, size + pdf_size
+            ))
+
+        if "reextract" in stages:
+            results.append(measure(
+                "reextract",
+                lambda: metadata.process_all_files(fixture["xml_dir"], fixture["json_dir"], pdf_dir),
+                files + pdf_files, size + pdf_size
+            ))
+
+        if any(stage in stages for stage in ("snapshot", "match", "apply")):
+            write_semantic_fixture(db, rng, args.noise, os.path.join(workdir, pipeline.RAW_SNAPSHOT))
+            authors = list(db["authors"].find({}, {"name": 1, "semantic_scholar_id": 1, "papers": 1}))
+            raw_size = os.path.getsize(pipeline.RAW_SNAPSHOT)
+            if "snapshot" in stages:
+                results.append(measure("snapshot", lambda: pipeline.stage_snapshot(authors), len(authors), raw_size))
+            if "match" in stages:
+                results.append(measure("match", lambda: pipeline.stage_match(authors, db["papers"]), len(authors), raw_size))
+            if "apply" in stages:
+                results.append(measure("apply", lambda: pipeline.stage_apply(authors, db["authors"], db["papers"]), len(authors), 0))
+
+        print(f"[Ingest] {db['papers'].count_documents({})} Papers ({db['papers'].count_documents({'citationCount': {'$exists': True}})} "
+              f"mit Semantic-Scholar-Match), {db['authors'].count_documents({})} Autoren in der DB.")
+        return results
+    finally:
+        if server is not None:
+            server.shutdown()
+        os.chdir(previous_cwd)
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_under_py_spy(output: str):
+    """Startet denselben Aufruf erneut unter py-spy (Sampling-Profiler, zeigt auch Zeit in C-Erweiterungen)."""
+    if shutil.which("py-spy") is None:
+        raise SystemExit("py-spy ist nicht installiert (pip install py-spy).")
+    command = ["py-spy", "record", "-o", output, "--", sys.executable, os.path.abspath(__file__)] + sys.argv[1:]
+    sys.exit(subprocess.call(command, env={**os.environ, CHILD_ENV: "1"}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark für merge_pdfs, metadata-extraction und die Semantic-Scholar-Pipeline.")
+    parser.add_argument("--papers", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=3, help="Seiten pro PDF")
+    parser.add_argument("--xml-files", type=int, default=4)
+    parser.add_argument("--json-files", type=int, default=4)
+    parser.add_argument("--duplicates", type=float, default=0.2, help="Anteil der PDFs mit identischer Kopie")
+    parser.add_argument("--noise", type=int, default=50, help="Nicht passende Semantic-Scholar-Papers pro Autor")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Kommagetrennt (Default: {','.join(STAGES)})")
+    parser.add_argument("--db", default=INGEST_BENCHMARK_DB, help="Wird vor dem Lauf geleert!")
+    parser.add_argument("--mongomock", action="store_true", help="In-Memory-Stand-in statt MongoDB")
+    parser.add_argument("--workdir", default=None, help="Arbeitsverzeichnis (Default: temporär, wird gelöscht)")
+    parser.add_argument("--keep", action="store_true", help="Temporäres Arbeitsverzeichnis behalten")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Ohne Heap-Messung (tracemalloc verlangsamt stark)")
+    parser.add_argument("--profile", default=None, metavar="DIR", help="cProfile pro Stufe nach DIR schreiben")
+    parser.add_argument("--py-spy", default=None, metavar="SVG", help="Gesamten Lauf unter py-spy aufzeichnen")
+    parser.add_argument("--verbose", action="store_true", help="Ausgaben der Stufen nicht unterdrücken")
+    parser.add_argument("--json", default=None, help="Ergebnisse als JSON speichern")
+    args = parser.parse_args()
+
+    args.stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in args.stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unbekannte Stufe(n): {', '.join(unknown)}")
+
+    if args.profile:
+        # die Stufen laufen im Arbeitsverzeichnis
+        args.profile = os.path.abspath(args.profile)
+    if args.py_spy and not os.getenv(CHILD_ENV):
+        run_under_py_spy(args.py_spy)
+
+    results = run(args)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"papers": args.papers, "pages": args.pages, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
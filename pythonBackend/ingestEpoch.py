@@ -0,0 +1,86 @@
+import threading
+from datetime import datetime, timezone
+from pymongo import ReturnDocument
+
+# "Ingest-Epoche": ein Zähler in der Collection "meta", den jede Ingest-Stufe nach dem Schreiben erhöht.
+# Die API beobachtet den Zähler (EpochWatcher) und baut ihre In-Memory-Strukturen
+# (Suggest-Index usw.) nur dann neu auf, wenn sich die Daten tatsächlich geändert haben.
+# Die erste Epoche liest das Warm-up der API (read()), nicht start(): so bootet ein Worker auch,
+# wenn MongoDB gerade nicht erreichbar ist.
+
+META_COLLECTION = "meta"
+EPOCH_DOC_ID = "ingest_epoch"
+POLL_INTERVAL_SECONDS = 30
+
+
+def get_ingest_epoch(db) -> int:
+    doc = db[META_COLLECTION].find_one({"_id": EPOCH_DOC_ID})
+    return doc.get("epoch", 0) if doc else 0
+
+
+def bump_ingest_epoch(db, source: str = "") -> int:
+    """Erhöht die Epoche nach einem Ingest-Lauf und gibt den neuen Wert zurück."""
+    doc = db[META_COLLECTION].find_one_and_update(
+        {"_id": EPOCH_DOC_ID},
+        {"$inc": {"epoch": 1}, "$set": {"updated_at": datetime.now(timezone.utc), "source": source}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    print(f"[IngestEpoch] Neue Epoche {doc['epoch']} ({source})")
+    return doc["epoch"]
+
+
+class EpochWatcher:
+    """
+    Hintergrund-Thread, der die Ingest-Epoche abfragt und bei einer Änderung
+    alle registrierten Callbacks (mit der neuen Epoche) aufruft.
+    """
+
+    def __init__(self, db, interval: float = POLL_INTERVAL_SECONDS):
+        self.db = db
+        self.interval = interval
+        self.epoch = None
+        self._callbacks = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, callback):
+        self._callbacks.append(callback)
+
+    def read(self) -> int:
+        """Liest die aktuelle Epoche und merkt sie sich (ohne Callbacks); für das erste Laden der Daten."""
+        self.epoch = get_ingest_epoch(self.db)
+        return self.epoch
+
+    def start(self):
+        """Startet nur den Thread, ohne Datenbankzugriff."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="epoch-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                epoch = get_ingest_epoch(self.db)
+            except Exception as e:
+                print(f"[IngestEpoch] Fehler beim Abfragen der Epoche: {e}")
+                continue
+            if self.epoch is None:
+                # Erstes Laden noch nicht erfolgt (read() im Warm-up); Callbacks würden es nur doppeln
+                self.epoch = epoch
+                continue
+            if epoch == self.epoch:
+                continue
+            self.epoch = epoch
+            for callback in self._callbacks:
+                try:
+                    callback(epoch)
+                except Exception as e:
+                    print(f"[IngestEpoch] Fehler in Callback {getattr(callback, '__name__', callback)}: {e}")
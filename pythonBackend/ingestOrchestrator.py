@@ -0,0 +1,468 @@
+import os
+import json
+import shutil
+import argparse
+import threading
+import importlib.util
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from ingestEpoch import bump_ingest_epoch
+from fileManifest import FileManifest, MANIFEST_COLLECTION
+
+# Gesamter Ingest als DAG von Stufen mit Checkpoints und Wiederaufnahme nach Abbrüchen.
+#
+#   scrape_authors -> harvest -> merge_pdfs -> extract -> thumbnails
+#                                                      -> semantic_fetch -> semantic_snapshot -> semantic_match -> semantic_apply
+#                                                      -> embeddings, coauthor_graph, author_images
+#   semantic_apply -> author_metrics, trending;   embeddings + semantic_apply -> related_papers
+#
+# Jede Stufe ruft die vorhandenen Funktionen der Einzelskripte auf (authorScraper, combinedApiCalls, mergePdfs,
+# metadata-extraction, semanticScholarPipeline, pushImagePathInDbFromAuthorsJson, thumbnailGenerator, ...).
+#
+# Checkpoints (STATE_DIR, append-only JSONL, nach jedem Eintrag fsync):
+#   stages.jsonl          {"stage", "status": started|done|failed|invalidated, "ts", ...}
+#   items/<stage>.jsonl   {"item", "status": done|failed, "ts"} für Stufen, die pro Element arbeiten
+#                         (harvest: pro Autor, extract: pro XML/JSON-Datei, semantic_match: pro Autor)
+#
+# Beim erneuten Start werden fertige Stufen übersprungen; eine abgebrochene Stufe macht bei den noch nicht
+# erledigten Elementen weiter. Läuft eine Stufe neu, werden alle abhängigen Stufen ebenfalls neu ausgeführt.
+# Stufen, deren Abhängigkeiten erfüllt sind, laufen parallel (--parallel).
+# Die Ingest-Epoche wird nur einmal am Ende erhöht (bump_epoch=False in den Stufen), damit die API ihre
+# In-Memory-Strukturen nicht mitten im Ingest mehrfach neu aufbaut.
+#
+# python ingestOrchestrator.py                          # alles, mit Wiederaufnahme
+# python ingestOrchestrator.py --skip scrape_authors,harvest --parallel 3
+# python ingestOrchestrator.py --stages embeddings --force extract
+# python ingestOrchestrator.py --fresh                  # alte Checkpoints archivieren, von vorne beginnen
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+AUTHORS_COLLECTION = "authors"
+PAPERS_COLLECTION = "papers"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = "ingest_state"
+AUTHORS_FILE = "authors.json"          # Namensliste für den Harvest (combinedApiCalls)
+SCRAPED_AUTHORS_FILE = "Authors.json"  # Bild-/Profil-URLs (pushImagePathInDbFromAuthorsJson)
+XML_DIR = "xmls"
+RAW_PDF_DIR = "pdfs"
+JSON_DIR = os.path.join("pdfs", "pubmed_unpaywall")
+MERGED_PDF_DIR = "alle_pdfs"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def load_metadata_extraction():
+    """metadata-extraction.py hat einen Bindestrich im Namen und kann nicht normal importiert werden."""
+    spec = importlib.util.spec_from_file_location("metadata_extraction", os.path.join(BASE_DIR, "metadata-extraction.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---------------------------------------
+# Checkpoints
+# ---------------------------------------
+
+class CheckpointStore:
+    def __init__(self, state_dir: str = STATE_DIR):
+        self.state_dir = state_dir
+        self.items_dir = os.path.join(state_dir, "items")
+        self._lock = threading.Lock()
+        os.makedirs(self.items_dir, exist_ok=True)
+
+    def _append(self, path: str, record: dict):
+        with self._lock:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    @staticmethod
+    def _read(path: str) -> list:
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # halb geschriebene letzte Zeile nach einem Absturz
+                    continue
+        return records
+
+    def _items_path(self, stage: str) -> str:
+        return os.path.join(self.items_dir, f"{stage}.jsonl")
+
+    def stage_status(self) -> dict:
+        """Letzter Status pro Stufe."""
+        status = {}
+        for record in self._read(os.path.join(self.state_dir, "stages.jsonl")):
+            status[record["stage"]] = record["status"]
+        return status
+
+    def record_stage(self, stage: str, status: str, **extra):
+        self._append(os.path.join(self.state_dir, "stages.jsonl"), {"stage": stage, "status": status, "ts": _now(), **extra})
+
+    def done_items(self, stage: str) -> set:
+        status = {}
+        for record in self._read(self._items_path(stage)):
+            status[record["item"]] = record["status"]
+        return {item for item, s in status.items() if s == "done"}
+
+    def record_item(self, stage: str, item: str, status: str, error: str = None):
+        record = {"item": item, "status": status, "ts": _now()}
+        if error:
+            record["error"] = error
+        self._append(self._items_path(stage), record)
+
+    def invalidate(self, stage: str):
+        """Stufe muss komplett neu laufen (z.B. weil eine Abhängigkeit neu gelaufen ist)."""
+        with self._lock:
+            if os.path.exists(self._items_path(stage)):
+                os.remove(self._items_path(stage))
+        self.record_stage(stage, "invalidated")
+
+    def archive(self):
+        """--fresh: vorhandene Checkpoints nach STATE_DIR/archive/<Zeitstempel>/ verschieben."""
+        entries = [e for e in os.listdir(self.state_dir) if e != "archive"]
+        if not entries:
+            return
+        target = os.path.join(self.state_dir, "archive", datetime.now().strftime("%Y%m%d-%H%M%S"))
+        os.makedirs(target)
+        for entry in entries:
+            shutil.move(os.path.join(self.state_dir, entry), os.path.join(target, entry))
+        os.makedirs(self.items_dir, exist_ok=True)
+
+
+# ---------------------------------------
+# Stufen
+# ---------------------------------------
+
+class Stage:
+    """
+    run():            Stufe ohne Elemente
+    items() + run(i): Stufe pro Element; erledigte Elemente werden bei der Wiederaufnahme übersprungen
+    """
+
+    def __init__(self, name: str, deps: list, run, items=None, description: str = ""):
+        self.name = name
+        self.deps = deps
+        self.run = run
+        self.items = items
+        self.description = description
+
+
+def _harvest_author_names() -> list:
+    """Autorennamen aus authors.json (Namensliste) bzw. aus der Ausgabe des Scrapers ({name: {...}} pro Eintrag)."""
+    path = AUTHORS_FILE if os.path.exists(AUTHORS_FILE) else SCRAPED_AUTHORS_FILE
+    with open(path, "r", encoding="utf-8") as f:
+        groups = json.load(f)
+    names = []
+    for entries in groups.values():
+        for entry in entries:
+            for name in (entry.keys() if isinstance(entry, dict) else [entry]):
+                if name not in names:
+                    names.append(name)
+    return names
+
+
+def _harvest_files() -> list:
+    files = []
+    for directory, extension in ((XML_DIR, ".xml"), (JSON_DIR, ".json")):
+        for root_dir, _, names in os.walk(directory):
+            files.extend(os.path.join(root_dir, n) for n in names if n.endswith(extension))
+    return sorted(files)
+
+
+def build_stages(db, args) -> dict:
+    authors_col = db[AUTHORS_COLLECTION]
+    papers_col = db[PAPERS_COLLECTION]
+    modules = {}
+
+    def metadata():
+        # Die Stufe schreibt in dieselbe Datenbank wie alle anderen Stufen (DB_NAME)
+        if "metadata" not in modules:
+            module = load_metadata_extraction()
+            module.connect(db)
+            modules["metadata"] = module
+        return modules["metadata"]
+
+    def semantic_authors():
+        return list(authors_col.find({}, {"name": 1, "semantic_scholar_id": 1, "papers": 1}))
+
+    def scrape_authors():
+        import authorScraper
+        authorScraper.save_authors(authorScraper.scrape_authors(), SCRAPED_AUTHORS_FILE)
+
+    def harvest(author):
+        import combinedApiCalls
+        combinedApiCalls.fetch_papers_arxiv(author, max_results=200)
+        combinedApiCalls.search_and_download_pubmed_unpaywall(author)
+
+    def merge():
+        from mergePdfs import merge_pdfs
+        merge_pdfs(RAW_PDF_DIR, MERGED_PDF_DIR)
+
+    def extract(path):
+        module = metadata()
+        # unveränderte PDFs werden nicht erneut geparst (fileManifest.py)
+        manifest = FileManifest(db[MANIFEST_COLLECTION], MERGED_PDF_DIR)
+        if path.endswith(".xml"):
+            module.save_to_mongodb(module.extract_metadata_from_xml(path, MERGED_PDF_DIR), is_json=False, manifest=manifest)
+        else:
+            module.save_to_mongodb(module.extract_metadata_from_json(path, MERGED_PDF_DIR), is_json=True, manifest=manifest)
+        print(f"[Ingest] {path}: {manifest.summary()}")
+
+    def author_images():
+        from pushImagePathInDbFromAuthorsJson import load_author_image_mapping, update_authors_image_path
+        update_authors_image_path(load_author_image_mapping(SCRAPED_AUTHORS_FILE))
+
+    def thumbnails():
+        from thumbnailGenerator import run_thumbnail_stage
+        run_thumbnail_stage(papers_col, workers=args.workers, bump_epoch=False)
+
+    def semantic_fetch():
+        import semanticScholarPipeline
+        semanticScholarPipeline.stage_fetch(semantic_authors(), refresh=True)
+
+    def semantic_snapshot():
+        import semanticScholarPipeline
+        semanticScholarPipeline.stage_snapshot(semantic_authors())
+
+    def semantic_match_items():
+        return [str(a["_id"]) for a in authors_col.find({"semantic_scholar_id.0": {"$exists": True}}, {"_id": 1})]
+
+    def semantic_match(author_id):
+        import semanticScholarPipeline
+        from bson import ObjectId
+        authors = list(authors_col.find({"_id": ObjectId(author_id)}, {"name": 1, "semantic_scholar_id": 1, "papers": 1}))
+        semanticScholarPipeline.stage_match(authors, papers_col)
+
+    def semantic_apply():
+        import semanticScholarPipeline
+        semanticScholarPipeline.stage_apply(semantic_authors(), authors_col, papers_col, bump_epoch=False)
+
+    def author_metrics():
+        from authorMetrics import materialize_author_metrics
+        materialize_author_metrics(db, bump_epoch=False)
+
+    def trending():
+        from trendingScores import recompute_trending_scores
+        recompute_trending_scores(papers_col)
+
+    def embeddings():
+        from embeddingIndex import build_embedding_index
+        build_embedding_index(papers_col)
+
+    def related_papers():
+        from relatedPapers import compute_related_papers
+        compute_related_papers(papers_col)
+
+    def coauthor_graph():
+        from coauthorGraph import build_coauthor_graph
+        build_coauthor_graph(db)
+
+    stages = [
+        Stage("scrape_authors", [], scrape_authors, description="Forschende von hessian.ai -> Authors.json"),
+        Stage("harvest", ["scrape_authors"], harvest, items=_harvest_author_names, description="ArXiv/PubMed/Unpaywall pro Autor"),
+        Stage("merge_pdfs", ["harvest"], merge, description="PDFs deduplizieren -> alle_pdfs/"),
+        Stage("extract", ["merge_pdfs"], extract, items=_harvest_files, description="Metadaten + PDF-Inhalt pro XML/JSON-Datei"),
+        Stage("author_images", ["scrape_authors", "extract"], author_images, description="Bild-/Profil-URLs der Autoren"),
+        Stage("thumbnails", ["extract"], thumbnails, description="Thumbnails für neue PDFs"),
+        Stage("semantic_fetch", ["extract"], semantic_fetch, description="Semantic Scholar API (Batch)"),
+        Stage("semantic_snapshot", ["semantic_fetch"], semantic_snapshot, description="Snapshots pro Autor"),
+        Stage("semantic_match", ["semantic_snapshot"], semantic_match, items=semantic_match_items, description="Fuzzy-Matching pro Autor"),
+        Stage("semantic_apply", ["semantic_match"], semantic_apply, description="Zitationen in die DB schreiben"),
+        Stage("author_metrics", ["semantic_apply"], author_metrics, description="Autorenkennzahlen (inkrementell)"),
+        Stage("trending", ["semantic_apply"], trending, description="trending_score neu berechnen"),
+        Stage("embeddings", ["extract"], embeddings, description="Embedding-Index"),
+        Stage("related_papers", ["embeddings", "semantic_apply"], related_papers, description="Verwandte Papers"),
+        Stage("coauthor_graph", ["extract"], coauthor_graph, description="Koautoren-Graph (inkrementell)"),
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+# ---------------------------------------
+# Ablauf
+# ---------------------------------------
+
+def _descendants(stages: dict, names) -> set:
+    result = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage in stages.values():
+            if stage.name not in result and any(dep in result for dep in stage.deps):
+                result.add(stage.name)
+                changed = True
+    return result
+
+
+def _ancestors(stages: dict, names) -> set:
+    result = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in result:
+            result.add(name)
+            pending.extend(stages[name].deps)
+    return result
+
+
+class Orchestrator:
+    def __init__(self, stages: dict, store: CheckpointStore, parallel: int = 2):
+        self.stages = stages
+        self.store = store
+        self.parallel = parallel
+        self.completed = set()
+
+    def _run_stage(self, stage: Stage) -> bool:
+        self.store.record_stage(stage.name, "started")
+        print(f"[Ingest] Stufe '{stage.name}' gestartet.")
+        try:
+            if stage.items is None:
+                stage.run()
+                processed, failed = 1, 0
+            else:
+                done = self.store.done_items(stage.name)
+                items = [i for i in stage.items() if i not in done]
+                processed, failed = 0, 0
+                print(f"[Ingest] '{stage.name}': {len(items)} offene Elemente ({len(done)} bereits erledigt).")
+                for item in items:
+                    try:
+                        stage.run(item)
+                    except Exception as e:
+                        failed += 1
+                        self.store.record_item(stage.name, item, "failed", error=str(e))
+                        print(f"[Ingest] '{stage.name}': Element '{item}' fehlgeschlagen: {e}")
+                        continue
+                    processed += 1
+                    self.store.record_item(stage.name, item, "done")
+            if failed:
+                raise RuntimeError(f"{failed} Elemente fehlgeschlagen")
+        except Exception as e:
+            self.store.record_stage(stage.name, "failed", error=str(e))
+            print(f"[Ingest] Stufe '{stage.name}' fehlgeschlagen: {e}")
+            return False
+        self.store.record_stage(stage.name, "done", processed=processed)
+        print(f"[Ingest] Stufe '{stage.name}' fertig.")
+        return True
+
+    def plan(self, targets=None, skip=(), force=()) -> tuple:
+        """
+        Gibt (auszuführende Stufen, übersprungene Stufen) zurück.
+        force: Stufen (samt Nachfolgern), die trotz Checkpoint neu laufen sollen.
+        """
+        selected = _ancestors(self.stages, targets) if targets else set(self.stages)
+        status = self.store.stage_status()
+        rerun = _descendants(self.stages, force) & selected
+        for name in rerun:
+            self.store.invalidate(name)
+        pending = {n for n in selected if n not in skip and (n in rerun or status.get(n) != "done")}
+        # Läuft eine Stufe neu, sind die Ergebnisse der Nachfolger veraltet; auch nicht ausgewählte Nachfolger
+        # verlieren ihren Checkpoint und laufen beim nächsten vollständigen Durchlauf neu
+        stale = _descendants(self.stages, pending) - pending - set(skip)
+        for name in stale:
+            if status.get(name) != "invalidated":
+                self.store.invalidate(name)
+        pending |= stale & selected
+        return pending, selected - pending
+
+    def run(self, targets=None, skip=(), force=()) -> bool:
+        pending, satisfied = self.plan(targets, skip, force)
+        if not pending:
+            print("[Ingest] Alle Stufen sind bereits erledigt.")
+            return True
+        print(f"[Ingest] Auszuführen: {', '.join(n for n in self.stages if n in pending)}")
+
+        finished = set(satisfied)
+        failed = set()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.parallel) as pool:
+            while pending or running:
+                blocked = {n for n in pending if any(dep in failed for dep in self.stages[n].deps)}
+                for name in blocked:
+                    print(f"[Ingest] Stufe '{name}' übersprungen, weil eine Abhängigkeit fehlgeschlagen ist.")
+                    failed.add(name)
+                pending -= blocked
+
+                # in Definitionsreihenfolge starten, damit der Ablauf reproduzierbar ist
+                for name in [n for n in self.stages if n in pending]:
+                    if len(running) >= self.parallel:
+                        break
+                    if all(dep in finished for dep in self.stages[name].deps):
+                        pending.discard(name)
+                        running[pool.submit(self._run_stage, self.stages[name])] = name
+
+                if not running:
+                    break
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    name = running.pop(future)
+                    if future.result():
+                        finished.add(name)
+                        self.completed.add(name)
+                    else:
+                        failed.add(name)
+
+        if failed:
+            print(f"[Ingest] Fehlgeschlagen/übersprungen: {', '.join(sorted(failed))}. Erneuter Start setzt dort fort.")
+        return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Führt den gesamten Ingest als DAG mit Checkpoints aus.")
+    parser.add_argument("--stages", default=None, help="Nur diese Stufen (und ihre Abhängigkeiten)")
+    parser.add_argument("--skip", default="", help="Stufen, die als erledigt gelten (z.B. scrape_authors,harvest)")
+    parser.add_argument("--force", default="", help="Stufen (und Nachfolger) trotz Checkpoint neu ausführen")
+    parser.add_argument("--fresh", action="store_true", help="Checkpoints archivieren und komplett neu beginnen")
+    parser.add_argument("--parallel", type=int, default=2, help="Maximal gleichzeitig laufende Stufen")
+    parser.add_argument("--workers", type=int, default=None, help="Worker-Prozesse für die Thumbnail-Stufe")
+    parser.add_argument("--workdir", default=BASE_DIR, help="Verzeichnis mit xmls/, pdfs/, semanticAPI/ (Default: pythonBackend)")
+    parser.add_argument("--list", action="store_true", help="Stufen und Checkpoint-Status anzeigen")
+    args = parser.parse_args()
+
+    # Die Einzelskripte arbeiten mit relativen Pfaden
+    os.chdir(args.workdir)
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    stages = build_stages(db, args)
+    store = CheckpointStore(STATE_DIR)
+
+    def names(value):
+        result = [n.strip() for n in value.split(",") if n.strip()] if value else []
+        unknown = [n for n in result if n not in stages]
+        if unknown:
+            parser.error(f"Unbekannte Stufe(n): {', '.join(unknown)}")
+        return result
+
+    if args.list:
+        status = store.stage_status()
+        for stage in stages.values():
+            deps = ", ".join(stage.deps) or "-"
+            print(f"{stage.name:<18} {status.get(stage.name, 'offen'):<12} <- {deps:<30} {stage.description}")
+        client.close()
+        return
+
+    if args.fresh:
+        store.archive()
+
+    orchestrator = Orchestrator(stages, store, args.parallel)
+    ok = orchestrator.run(names(args.stages), names(args.skip), names(args.force))
+    if orchestrator.completed:
+        # API-Prozesse laden Suggest-Index, Embeddings und Graph neu
+        bump_ingest_epoch(db, source="ingestOrchestrator")
+    client.close()
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
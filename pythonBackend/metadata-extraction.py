@@ -1,5 +1,4 @@
 import xml.etree.ElementTree as ET
-import json
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 import requests
@@ -8,18 +7,36 @@ import os
 import fitz  # PyMuPDF
 import re
 import hashlib  # Für MD5-Hash
+from streamingParsers import iter_xml_entries, iter_json_array
+from authorKeys import author_key, author_keys
+from ingestEpoch import bump_ingest_epoch
+from fileManifest import FileManifest, MANIFEST_COLLECTION
 
 load_dotenv()
 
 uri = os.getenv("MongoDB-uri")
 
-# Verbindung zur MongoDB herstellen
-client = MongoClient(uri)
-db = client["researchhub"]
-
-# Collections
-papers_collection = db["papers"]
-authors_collection = db["authors"]
+# Verbindung und Collections setzt connect(); der Import öffnet noch keine Verbindung
+# (der Orchestrator und der Ingest-Benchmark übergeben ihre eigene Datenbank)
+client = None
+db = None
+papers_collection = None
+authors_collection = None
+manifest_collection = None
+
+
+def connect(database=None):
+    """Setzt die Collections auf database; ohne Angabe Verbindung zur Datenbank "researchhub" herstellen."""
+    global client, db, papers_collection, authors_collection, manifest_collection
+    if database is None:
+        client = MongoClient(uri)
+        database = client["researchhub"]
+    else:
+        client = database.client
+    db = database
+    papers_collection = db["papers"]
+    authors_collection = db["authors"]
+    manifest_collection = db[MANIFEST_COLLECTION]
 
 # Platzhalterbild
 PLACEHOLDER_IMAGE_PATH = "images/placeholder_author.png"
@@ -114,18 +131,18 @@ def extract_year(pubdate: str) -> int:
         return 0  # Rückgabe 0, wenn das Jahr nicht extrahiert werden kann
 
 # Funktion zur Extraktion der Metadaten aus XML-Dateien
+# Generator: liest die Datei in einem einzigen Streaming-Durchlauf und liefert die Papers einzeln.
 def extract_metadata_from_xml(xml_file, pdf_directory):
-    try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-    except ET.ParseError as e:
-        print(f"Fehler beim Parsen der XML-Datei {xml_file}: {e}")
-        return []
-
-    namespaces = {prefix: uri for event, (prefix, uri) in ET.iterparse(xml_file, events=['start-ns'])}
+    entries = iter_xml_entries(xml_file)
+    while True:
+        try:
+            entry, namespaces = next(entries)
+        except StopIteration:
+            return
+        except ET.ParseError as e:
+            print(f"Fehler beim Parsen der XML-Datei {xml_file}: {e}")
+            return
 
-    papers = []
-    for entry in root.findall(".//entry", namespaces=namespaces):
         try:
             published_date = entry.find("published", namespaces=namespaces).text if entry.find("published", namespaces=namespaces) is not None else None
 
@@ -180,23 +197,23 @@ def extract_metadata_from_xml(xml_file, pdf_directory):
                     if not found_file:
                         print(f"[DEBUG] Keine passende PDF-Datei gefunden für '{title_raw}' in {pdf_directory}")
                 
-                papers.append(paper)
+                yield paper
 
         except Exception as e:
             print(f"Fehler beim Verarbeiten eines Eintrags in {xml_file}: {e}")
 
-    return papers
-
+# Generator: liest das JSON-Array inkrementell und liefert die Papers einzeln.
 def extract_metadata_from_json(json_file, pdf_directory):
-    try:
-        with open(json_file, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-    except json.JSONDecodeError as e:
-        print(f"Fehler beim Parsen der JSON-Datei {json_file}: {e}")
-        return []
-
-    papers = []
-    for entry in data:
+    entries = iter_json_array(json_file)
+    while True:
+        try:
+            entry = next(entries)
+        except StopIteration:
+            return
+        except ValueError as e:  # json.JSONDecodeError bzw. ijson.JSONError
+            print(f"Fehler beim Parsen der JSON-Datei {json_file}: {e}")
+            return
+
         try:
             pubdate = entry.get("pubdate", "")
             year = extract_year(pubdate)  # Jahr extrahieren
@@ -240,13 +257,11 @@ def extract_metadata_from_json(json_file, pdf_directory):
                 if not found_file:
                     print(f"[DEBUG] Keine passende PDF-Datei gefunden für '{title_raw}' in {pdf_directory}")
                 else:
-                    papers.append(paper)  # Nur Papers mit gültigem Pfad hinzufügen
+                    yield paper  # Nur Papers mit gültigem Pfad weitergeben
 
         except Exception as e:
             print(f"Fehler beim Verarbeiten eines Eintrags in {json_file}: {e}")
 
-    return papers
-
 # Funktion zur Extraktion des PDF-Inhalts (für XML-Papers über URL, für JSON-Papers lokal)
 def extract_pdf_content(pdf_source, paper, is_json=False):
     try:
@@ -277,7 +292,8 @@ def extract_pdf_content(pdf_source, paper, is_json=False):
                     base_image = doc.extract_image(xref)
                     image_bytes = base_image["image"]
                     img_extension = base_image["ext"]
-                    image_filename = f"{paper['title'][:20]}_{img_index}.{img_extension}"
+                    # Dateiname über den PDF-Hash, damit sich Papers mit ähnlichem Titel nicht überschreiben
+                    image_filename = f"{md5_hash}_{img_index}.{img_extension}"
                     image_path = os.path.join("images", image_filename)
                     with open(image_path, "wb") as img_file:
                         img_file.write(image_bytes)
@@ -305,11 +321,106 @@ def classify_paper(content):
     else:
         return "maybe_not_a_hess_paper"
 
-def save_to_mongodb(papers, is_json=False):
+# Felder aus den Harvest-Metadaten; bei unveränderter PDF werden nur diese abgeglichen
+# (Inhalt, Bild, Klassifizierung und Zähler wie views bleiben unangetastet)
+METADATA_FIELDS = ["title", "authors", "author_keys", "published", "abstract", "citations", "doi", "journal", "platforms", "path"]
+
+def save_authors(paper, paper_id, is_json=False):
+    """Schreibt die relevanten Autoren des Papers in die authors-Collection."""
+    for author_name in paper["authors"]:
+        if is_json:
+            # Bei JSON-Dateien: Namen aus der Liste in JSON-Format umwandeln und vergleichen
+            original_name = is_relevant_author(author_name, author_names)
+            if original_name:
+                author = authors_collection.find_one({"name": original_name})
+                if author:
+                    # Autor existiert bereits: Paper-ID zur Liste der Papers hinzufügen
+                    authors_collection.update_one(
+                        {"_id": author["_id"]},
+                        {"$addToSet": {"papers": paper_id}, "$set": {"metrics_dirty": True}}  # Verhindert Duplikate; Kennzahlen neu berechnen (authorMetrics.py)
+                    )
+                else:
+                    # Neuen Autor erstellen
+                    author_data = {
+                        "name": original_name,
+                        "name_key": author_key(original_name),
+                        "papers": [paper_id],  # Verweis auf das aktuelle Paper
+                        "semantic_scholar_id": None,
+                        "h_index": 0,
+                        "citations": 0,
+                        "highly_influential_citations": 0,
+                        "image_path": PLACEHOLDER_IMAGE_PATH,
+                        "email": "",
+                        "metrics_dirty": True
+                    }
+                    authors_collection.insert_one(author_data)
+        else:
+            # Bei XML-Dateien: Namen unverändert verwenden
+            if author_name in author_names:
+                author = authors_collection.find_one({"name": author_name})
+                if author:
+                    authors_collection.update_one(
+                        {"_id": author["_id"]},
+                        {"$addToSet": {"papers": paper_id}, "$set": {"metrics_dirty": True}}
+                    )
+                else:
+                    author_data = {
+                        "name": author_name,
+                        "name_key": author_key(author_name),
+                        "papers": [paper_id],
+                        "semantic_scholar_id": None,
+                        "h_index": 0,
+                        "citations": 0,
+                        "highly_influential_citations": 0,
+                        "image_path": PLACEHOLDER_IMAGE_PATH,
+                        "email": "",
+                        "metrics_dirty": True
+                    }
+                    authors_collection.insert_one(author_data)
+
+def update_unchanged_paper(paper, entry):
+    """
+    PDF unverändert seit dem letzten Ingest: keine PDF-Verarbeitung, nur geänderte Metadaten schreiben.
+    Gibt (paper_id, Autoren geändert) zurück oder None, wenn das Paper in der DB nicht (mehr) existiert.
+    """
+    existing_paper = papers_collection.find_one(
+        {"_id": entry["paper_id"], "paper_md5_hash": entry["paper_md5_hash"]},
+        {field: 1 for field in METADATA_FIELDS}
+    )
+    if existing_paper is None:
+        return None
+
+    paper["author_keys"] = author_keys(paper["authors"])
+    changed = {field: paper[field] for field in METADATA_FIELDS if field in paper and existing_paper.get(field) != paper[field]}
+    if changed:
+        papers_collection.update_one({"_id": existing_paper["_id"]}, {"$set": changed})
+        print(f"Paper '{paper['title']}' unverändert, Metadaten aktualisiert: {', '.join(changed)}")
+    return existing_paper["_id"], "authors" in changed
+
+def save_to_mongodb(papers, is_json=False, manifest=None):
+    # papers darf ein Generator sein (Streaming aus extract_metadata_from_xml/json)
+    # manifest: optionales FileManifest; unveränderte PDFs werden dann nicht erneut geparst
     no_pdf_papers = []  # Liste der Papers ohne PDF
 
     for paper in papers:
         if paper["path"]:  # Nur Papers mit gültigem Pfad verarbeiten
+            # XML: der Inhalt kommt von der PDF-URL, nicht aus der per Titel gefundenen Datei
+            source = None if is_json else paper["pdf"]
+            try:
+                entry = manifest.check(paper["path"], source) if manifest else None
+                unchanged = update_unchanged_paper(paper, entry) if entry else None
+            except PyMongoError as e:
+                print(f"Fehler beim Abgleich mit dem Manifest für '{paper['title']}': {e}")
+                unchanged = None
+            if unchanged:
+                paper_id, authors_changed = unchanged
+                if authors_changed:
+                    try:
+                        save_authors(paper, paper_id, is_json=is_json)
+                    except PyMongoError as e:
+                        print(f"Fehler beim Speichern der Autoren für '{paper['title']}': {e}")
+                continue
+
             if paper["pdf"]:
                 content = extract_pdf_content(paper["pdf"], paper, is_json=is_json)
                 if content:
@@ -321,6 +432,9 @@ def save_to_mongodb(papers, is_json=False):
                     paper["content"] = None
                     paper["is_hess_paper"] = "no_verified"
 
+            # Normalisierte Autoren-Schlüssel für den Multikey-Index (siehe authorKeys.py)
+            paper["author_keys"] = author_keys(paper["authors"])
+
             try:
                 existing_paper = papers_collection.find_one({"paper_md5_hash": paper["paper_md5_hash"]})
                 if existing_paper:
@@ -333,53 +447,11 @@ def save_to_mongodb(papers, is_json=False):
                     paper_id = result.inserted_id  # Hole die _id des neu eingefügten Papers
                     print(f"Paper '{paper['title']}' erfolgreich gespeichert (path={paper['path']}, path_image={paper['path_image']}).")
 
+                if manifest and paper["paper_md5_hash"]:
+                    manifest.record(paper["path"], paper["paper_md5_hash"], paper_id, source)
+
                 # Autoren in die authors-Collection schreiben
-                for author_name in paper["authors"]:
-                    if is_json:
-                        # Bei JSON-Dateien: Namen aus der Liste in JSON-Format umwandeln und vergleichen
-                        original_name = is_relevant_author(author_name, author_names)
-                        if original_name:
-                            author = authors_collection.find_one({"name": original_name})
-                            if author:
-                                # Autor existiert bereits: Paper-ID zur Liste der Papers hinzufügen
-                                authors_collection.update_one(
-                                    {"_id": author["_id"]},
-                                    {"$addToSet": {"papers": paper_id}}  # Verhindert Duplikate
-                                )
-                            else:
-                                # Neuen Autor erstellen
-                                author_data = {
-                                    "name": original_name,
-                                    "papers": [paper_id],  # Verweis auf das aktuelle Paper
-                                    "semantic_scholar_id": None,
-                                    "h_index": 0,
-                                    "citations": 0,
-                                    "highly_influential_citations": 0,
-                                    "image_path": PLACEHOLDER_IMAGE_PATH,
-                                    "email": ""
-                                }
-                                authors_collection.insert_one(author_data)
-                    else:
-                        # Bei XML-Dateien: Namen unverändert verwenden
-                        if author_name in author_names:
-                            author = authors_collection.find_one({"name": author_name})
-                            if author:
-                                authors_collection.update_one(
-                                    {"_id": author["_id"]},
-                                    {"$addToSet": {"papers": paper_id}}
-                                )
-                            else:
-                                author_data = {
-                                    "name": author_name,
-                                    "papers": [paper_id],
-                                    "semantic_scholar_id": None,
-                                    "h_index": 0,
-                                    "citations": 0,
-                                    "highly_influential_citations": 0,
-                                    "image_path": PLACEHOLDER_IMAGE_PATH,
-                                    "email": ""
-                                }
-                                authors_collection.insert_one(author_data)
+                save_authors(paper, paper_id, is_json=is_json)
 
             except PyMongoError as e:
                 print(f"Fehler beim Speichern des Papers '{paper['title']}']: {e}")
@@ -391,6 +463,7 @@ def save_to_mongodb(papers, is_json=False):
 # Funktion zur Verarbeitung aller Dateien (XML und JSON)
 def process_all_files(xml_directory, json_directory, pdf_directory):
     no_pdf_papers_all = []  # Gesamtliste der Papers ohne Pfad
+    manifest = FileManifest(manifest_collection, pdf_directory)
 
     # Verarbeite XML-Dateien
     for root_dir, _, files in os.walk(xml_directory):
@@ -398,8 +471,8 @@ def process_all_files(xml_directory, json_directory, pdf_directory):
             if file.endswith(".xml"):
                 xml_path = os.path.join(root_dir, file)
                 papers = extract_metadata_from_xml(xml_path, pdf_directory)
-                print(f"[DEBUG] Extracted {len(papers)} papers from {file}")
-                no_pdf_papers = save_to_mongodb(papers, is_json=False)
+                no_pdf_papers = save_to_mongodb(papers, is_json=False, manifest=manifest)
+                print(f"[DEBUG] {file} verarbeitet")
                 no_pdf_papers_all.extend(no_pdf_papers)
 
     # Verarbeite JSON-Dateien
@@ -408,10 +481,14 @@ def process_all_files(xml_directory, json_directory, pdf_directory):
             if file.endswith(".json"):
                 json_path = os.path.join(root_dir, file)
                 papers = extract_metadata_from_json(json_path, pdf_directory)
-                print(f"[DEBUG] Extracted {len(papers)} papers from {file}")
-                no_pdf_papers = save_to_mongodb(papers, is_json=True)
+                no_pdf_papers = save_to_mongodb(papers, is_json=True, manifest=manifest)
+                print(f"[DEBUG] {file} verarbeitet")
                 no_pdf_papers_all.extend(no_pdf_papers)
 
+    # API-Prozesse bauen ihre In-Memory-Strukturen (Suggest-Index usw.) neu auf
+    bump_ingest_epoch(db, source="metadata-extraction")
+
+    print(f"[INFO] PDFs: {manifest.summary()}")
     print(f"[INFO] Anzahl der Papers ohne Pfad: {len(no_pdf_papers_all)}")
     if no_pdf_papers_all:
         print("[INFO] Papers ohne Pfad:")
@@ -423,4 +500,5 @@ if __name__ == "__main__":
     xml_directory = "/Users/yusuf/VSCodeProjects/hessian.Ai-research_hub_backend/xmls"
     json_directory = "/Users/yusuf/VSCodeProjects/hessian.Ai-research_hub_backend/jsons"
     pdf_directory = "/Users/yusuf/VSCodeProjects/hessian.Ai-research_hub_backend/pdfs"
+    connect()
     process_all_files(xml_directory, json_directory, pdf_directory)
\ No newline at end of file
@@ -0,0 +1,244 @@
+import os
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+from datetime import datetime, timezone, timedelta
+from bson import json_util
+from pymongo import UpdateOne, DESCENDING
+
+# Ergebnis-Cache für apply_sorting_and_pagination (backendAPI.py).
+#
+# - Schlüssel ist die komplette Abfrage (query, page, page_size, sort, descending, hint, projection) als
+#   Extended JSON; Einträge laufen nach QUERY_CACHE_TTL Sekunden ab (Views ändern sich laufend) und werden
+#   nach LRU verdrängt, sobald QUERY_CACHE_SIZE Einträge oder QUERY_CACHE_MAX_MB überschritten sind.
+# - Request-Coalescing: fehlt ein Schlüssel, führt nur der erste Request die Abfrage aus; gleichzeitige
+#   Requests auf denselben Schlüssel warten auf dessen Ergebnis statt MongoDB erneut zu fragen.
+# - Zugriffsstatistik: jeder Zugriff zählt pro Schlüssel, periodisch per $inc in "query_stats" geschrieben
+#   (über alle Worker und Neustarts hinweg), ein Dokument je Schlüssel und Tag:
+#     {_id: "<key>:<YYYY-MM-DD>", key, day, hits, shape, last_seen}
+#   warm() führt die Abfragen mit den meisten Zugriffen in den letzten QUERY_STATS_WINDOW_DAYS Tagen erneut
+#   aus – beim Start und nach jeder neuen Ingest-Epoche (on_epoch). Ältere Tage löscht ein TTL-Index.
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "512"))      # 0 = Cache aus
+QUERY_CACHE_MAX_MB = float(os.getenv("QUERY_CACHE_MAX_MB", "256"))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+QUERY_WARMUP_TOP_N = int(os.getenv("QUERY_WARMUP_TOP_N", "50"))
+QUERY_STATS_FLUSH_SECONDS = float(os.getenv("QUERY_STATS_FLUSH_SECONDS", "60"))
+QUERY_STATS_WINDOW_DAYS = 7
+QUERY_STATS_COLLECTION = "query_stats"
+
+# Grobe Größenschätzung pro Paper zusätzlich zum Volltext
+DOC_OVERHEAD_BYTES = 1024
+
+
+def cache_key(args: dict):
+    """Gibt (Schlüssel, Extended-JSON der Abfrage) zurück; das JSON wird für das Warm-up gespeichert."""
+    shape = json_util.dumps(args, sort_keys=True)
+    return hashlib.md5(shape.encode("utf-8")).hexdigest(), shape
+
+
+def _day(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d")
+
+
+def estimate_size(value) -> int:
+    results, _ = value
+    return sum(len(doc.get("content") or "") + DOC_OVERHEAD_BYTES for doc in results)
+
+
+class _Flight:
+    """Eine laufende Abfrage, auf die gleichzeitige Requests warten."""
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class QueryCache:
+    def __init__(self, loader, stats_col, maxsize: int = QUERY_CACHE_SIZE, max_mb: float = QUERY_CACHE_MAX_MB,
+                 ttl: float = QUERY_CACHE_TTL, flush_interval: float = QUERY_STATS_FLUSH_SECONDS):
+        """loader: Funktion, die für die Schlüsselwörter einer Abfrage (results, total_count) liefert."""
+        self.loader = loader
+        self.stats_col = stats_col
+        self.maxsize = maxsize
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires, value, size)
+        self._bytes = 0
+        self._inflight = {}             # key -> _Flight
+        self._generation = 0
+        self._stats_lock = threading.Lock()
+        self._pending = Counter()
+        self._shapes = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    # -----------------------------------
+    # Lesen (im Request)
+    # -----------------------------------
+
+    def get(self, **args):
+        if self.maxsize <= 0:
+            return self.loader(**args)
+        key, shape = cache_key(args)
+        with self._stats_lock:
+            self._pending[key] += 1
+            self._shapes[key] = shape
+        return self._get(key, args)
+
+    def _get(self, key: str, args: dict):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self.loader(**args)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+                # Ergebnis einer Abfrage, die vor invalidate() begonnen hat, nicht mehr speichern
+                if flight.error is None and generation == self._generation:
+                    self._store(key, flight.value)
+            flight.event.set()
+        return flight.value
+
+    def _store(self, key: str, value):
+        size = estimate_size(value)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (time.monotonic() + self.ttl, value, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.maxsize or self._bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def invalidate(self):
+        """Verwirft alle Einträge; laufende Abfragen speichern ihr Ergebnis danach nicht mehr."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._inflight.clear()
+            self._generation += 1
+
+    # -----------------------------------
+    # Warm-up
+    # -----------------------------------
+
+    def top_shapes(self, n: int) -> list:
+        """(Schlüssel, Abfrage) der n häufigsten Abfragen im Zeitfenster (Summe der Tageszähler)."""
+        since = _day(datetime.now(timezone.utc) - timedelta(days=QUERY_STATS_WINDOW_DAYS - 1))
+        cursor = self.stats_col.aggregate([
+            {"$match": {"day": {"$gte": since}}},
+            {"$group": {"_id": "$key", "hits": {"$sum": "$hits"}, "shape": {"$last": "$shape"}}},
+            {"$sort": {"hits": DESCENDING}},
+            {"$limit": n},
+        ])
+        return [(doc["_id"], json_util.loads(doc["shape"])) for doc in cursor]
+
+    def warm(self, n: int = QUERY_WARMUP_TOP_N) -> int:
+        """Führt die n häufigsten Abfragen aus und legt sie im Cache ab (zählt nicht in die Statistik)."""
+        if self.maxsize <= 0 or n <= 0:
+            return 0
+        start = time.perf_counter()
+        warmed = 0
+        # Gespeicherten Schlüssel verwenden: json_util.loads macht z.B. aus {"$regex": ...} ein Regex-Objekt,
+        # die Abfrage ist gleichwertig, ihr Schlüssel aber ein anderer
+        for key, args in self.top_shapes(n):
+            try:
+                self._get(key, args)
+                warmed += 1
+            except Exception as e:
+                print(f"[QueryCache] Warm-up-Abfrage fehlgeschlagen: {e}")
+        print(f"[QueryCache] {warmed} Abfragen vorgewärmt ({(time.perf_counter() - start) * 1000:.0f} ms).")
+        return warmed
+
+    def on_epoch(self, epoch=None):
+        """Callback für den EpochWatcher: neue Daten -> Cache leeren und die häufigsten Abfragen neu laden."""
+        self.invalidate()
+        self.warm()
+
+    # -----------------------------------
+    # Zugriffsstatistik
+    # -----------------------------------
+
+    def flush_stats(self) -> int:
+        with self._stats_lock:
+            pending, self._pending = self._pending, Counter()
+            shapes, self._shapes = self._shapes, {}
+        if not pending:
+            return 0
+        now = datetime.now(timezone.utc)
+        day = _day(now)
+        ops = [
+            UpdateOne(
+                {"_id": f"{key}:{day}"},
+                {"$inc": {"hits": count}, "$set": {"key": key, "day": day, "shape": shapes[key], "last_seen": now}},
+                upsert=True
+            )
+            for key, count in pending.items()
+        ]
+        try:
+            self.stats_col.bulk_write(ops, ordered=False)
+        except Exception as e:
+            # Statistik ist nur für das Warm-up da; bei Fehlern wird sie verworfen statt erneut versucht
+            print(f"[QueryCache] Fehler beim Schreiben der Zugriffsstatistik: {e}")
+            return 0
+        return len(ops)
+
+    def _run(self):
+        # Im Thread, damit startup() nicht auf MongoDB wartet
+        self._ensure_indexes()
+        while not self._stop.wait(self.flush_interval):
+            self.flush_stats()
+
+    def _ensure_indexes(self):
+        try:
+            self.stats_col.create_index([("day", DESCENDING)])
+            # Tagesdokumente laufen nach dem Zeitfenster ab (last_seen = letzter Flush des Tages)
+            self.stats_col.create_index("last_seen", expireAfterSeconds=(QUERY_STATS_WINDOW_DAYS + 1) * 86400)
+        except Exception as e:
+            print(f"[QueryCache] Index auf {QUERY_STATS_COLLECTION} konnte nicht angelegt werden: {e}")
+
+    def start(self):
+        if self._thread is not None or self.maxsize <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="query-stats", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval)
+            self._thread = None
+        self.flush_stats()
@@ -0,0 +1,30 @@
+from typing import List, Optional
+from fastapi import Query
+
+# Gemeinsame Filter für Paper-Abfragen (Jahr, Views, Zitationen).
+# Wird von den Endpunkten in backendAPI.py und vom Export (exporter.py) genutzt.
+
+
+def build_filter_query(
+    query, 
+    year: Optional[List[int]] = Query(None),
+    min_views: int = 0,  
+    max_views: Optional[int] = None,
+    min_citations: int = 0,  
+    max_citations: Optional[int] = None,
+    # min_hi_citations: int = 0,  
+    # max_hi_citations: Optional[int] = None
+    ):
+
+    query.update({"published": { "$ne" : "null" }})
+    
+    if year:
+        query.update({"$or": [{"published": {"$regex": f"{y}" }}for y in year]})
+    if max_views:
+        query.update({"views": {"$gte": min_views, "$lte": max_views}})
+    if max_citations:
+        query.update({"citations": {"$gte": min_citations, "$lte": max_citations}})
+    # if max_hi_citations:
+    #     query.update({"highlyInfluentialCitations": {"$gte": min_hi_citations, "$lte": max_hi_citations}})
+
+    return query
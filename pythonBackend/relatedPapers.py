@@ -0,0 +1,199 @@
+import os
+import argparse
+import numpy as np
+from scipy import sparse
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+from embeddingIndex import EmbeddingIndex
+from semanticScholarClient import SemanticScholarClient
+from ingestEpoch import bump_ingest_epoch
+
+# Batch-Job nach dem Ingest: berechnet für jedes Paper die Top-k verwandten Papers und speichert
+# deren IDs im Feld "related_papers". Der Detail-Endpunkt holt sie dann mit einer einzigen $in-Abfrage.
+#
+# Signale (alle als dünnbesetzte Matrizen, Paper x Paper):
+#   - gemeinsame Autoren:        A·Aᵀ über die Inzidenzmatrix Paper x author_keys (Kosinus-normiert)
+#   - gemeinsame Referenzen und
+#     Ko-Zitation:               über die Semantic-Scholar-Referenzlisten ("s2_references", optional
+#                                mit --fetch-references über /paper/batch nachladen)
+#   - Textähnlichkeit:           Top-m Nachbarn aus dem Embedding-Index (embeddingIndex.py), blockweise berechnet
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+PAPERS_COLLECTION = "papers"
+
+TOP_K = 10
+TEXT_NEIGHBOURS = 50        # pro Paper berücksichtigte Text-Nachbarn
+TEXT_BLOCK_SIZE = 1024
+WEIGHTS = {"authors": 0.3, "references": 0.3, "text": 0.4}
+
+
+def _cosine_normalize(counts: sparse.csr_matrix, degrees: np.ndarray) -> sparse.csr_matrix:
+    """counts[i, j] / sqrt(deg_i * deg_j)"""
+    inv = np.zeros_like(degrees, dtype=np.float64)
+    nonzero = degrees > 0
+    inv[nonzero] = 1.0 / np.sqrt(degrees[nonzero])
+    scale = sparse.diags(inv)
+    return (scale @ counts @ scale).tocsr()
+
+
+def _incidence(rows_items, n_rows):
+    """Baut eine binäre CSR-Inzidenzmatrix aus einer Liste von Item-Listen pro Zeile."""
+    columns = {}
+    indptr = [0]
+    indices = []
+    for items in rows_items:
+        for item in set(items):
+            indices.append(columns.setdefault(item, len(columns)))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(n_rows, max(1, len(columns)))), columns
+
+
+def author_similarity(papers) -> sparse.csr_matrix:
+    incidence, _ = _incidence([p.get("author_keys") or [] for p in papers], len(papers))
+    degrees = np.asarray(incidence.sum(axis=1)).ravel()
+    return _cosine_normalize((incidence @ incidence.T).tocsr(), degrees)
+
+
+def reference_similarity(papers) -> sparse.csr_matrix:
+    """Gemeinsame Referenzen (bibliographische Kopplung) plus Ko-Zitation innerhalb des Hubs."""
+    n = len(papers)
+    refs, columns = _incidence([p.get("s2_references") or [] for p in papers], n)
+
+    coupling = (refs @ refs.T).tocsr()
+    degrees = np.asarray(refs.sum(axis=1)).ravel()
+    coupling = _cosine_normalize(coupling, degrees)
+
+    # Ko-Zitation: zwei Hub-Papers werden gemeinsam von einem (Hub-)Paper zitiert
+    hub_columns = [(i, columns[p["semantic_scholar_paper_id"]]) for i, p in enumerate(papers)
+                   if p.get("semantic_scholar_paper_id") in columns]
+    if not hub_columns:
+        return coupling
+
+    rows, cols = zip(*hub_columns)
+    # Auswahl-Matrix: Referenzspalte -> Hub-Paper-Zeile
+    selector = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (cols, rows)), shape=(refs.shape[1], n))
+    cited = (refs @ selector).tocsr()                  # Paper x Hub-Paper: "Paper zitiert Hub-Paper"
+    cocitation = (cited.T @ cited).tocsr()
+    cocitation = _cosine_normalize(cocitation, np.asarray(cited.sum(axis=0)).ravel())
+    return (coupling + cocitation).tocsr() / 2
+
+
+def text_similarity(papers, embedding_index, neighbours: int = TEXT_NEIGHBOURS) -> sparse.csr_matrix:
+    """Top-m Kosinus-Nachbarn pro Paper aus der Embedding-Matrix, blockweise (V_block · Vᵀ)."""
+    n = len(papers)
+    if embedding_index is None:
+        return sparse.csr_matrix((n, n), dtype=np.float32)
+
+    rows_in_index = np.array([embedding_index.position.get(str(p["_id"]), -1) for p in papers])
+    present = np.where(rows_in_index >= 0)[0]
+    if len(present) < 2:
+        return sparse.csr_matrix((n, n), dtype=np.float32)
+
+    vectors = np.asarray(embedding_index.vectors)[rows_in_index[present]]
+    m = min(neighbours, len(present) - 1)
+
+    out_rows, out_cols, out_data = [], [], []
+    for start in range(0, len(present), TEXT_BLOCK_SIZE):
+        block = vectors[start:start + TEXT_BLOCK_SIZE] @ vectors.T
+        for offset in range(block.shape[0]):
+            block[offset, start + offset] = -np.inf  # sich selbst ausschließen
+        top = np.argpartition(-block, m - 1, axis=1)[:, :m]
+        for offset in range(block.shape[0]):
+            scores = block[offset, top[offset]]
+            keep = scores > 0
+            out_rows.extend([present[start + offset]] * int(keep.sum()))
+            out_cols.extend(present[top[offset][keep]])
+            out_data.extend(scores[keep])
+
+    return sparse.csr_matrix((out_data, (out_rows, out_cols)), shape=(n, n), dtype=np.float32)
+
+
+def top_k_per_row(scores: sparse.csr_matrix, k: int):
+    """Gibt pro Zeile die Spaltenindizes der k höchsten Werte zurück (absteigend)."""
+    result = []
+    for i in range(scores.shape[0]):
+        start, end = scores.indptr[i], scores.indptr[i + 1]
+        cols = scores.indices[start:end]
+        data = scores.data[start:end]
+        mask = (cols != i) & (data > 0)
+        cols, data = cols[mask], data[mask]
+        if len(cols) > k:
+            top = np.argpartition(-data, k - 1)[:k]
+            cols, data = cols[top], data[top]
+        result.append(cols[np.argsort(-data)].tolist())
+    return result
+
+
+def fetch_references(papers_col, papers, client=None):
+    """Lädt die Referenzlisten (paperIds) über /paper/batch und speichert sie als "s2_references"."""
+    s2_ids = [p["semantic_scholar_paper_id"] for p in papers if p.get("semantic_scholar_paper_id")]
+    if not s2_ids:
+        return
+    client = client or SemanticScholarClient()
+    fetched = client.get_papers_batch(s2_ids, fields="references.paperId")
+
+    updates = []
+    for p in papers:
+        data = fetched.get(p.get("semantic_scholar_paper_id"))
+        if data is None:
+            continue
+        references = [r["paperId"] for r in data.get("references") or [] if r.get("paperId")]
+        p["s2_references"] = references
+        updates.append(UpdateOne({"_id": p["_id"]}, {"$set": {"s2_references": references}}))
+    if updates:
+        papers_col.bulk_write(updates, ordered=False)
+    print(f"[Related] Referenzen für {len(updates)} Papers geladen.")
+
+
+def compute_related_papers(papers_col, k: int = TOP_K, fetch_refs: bool = False, batch_size: int = 1000):
+    papers = list(papers_col.find({}, {"author_keys": 1, "s2_references": 1, "semantic_scholar_paper_id": 1}))
+    if len(papers) < 2:
+        print("[Related] Zu wenige Papers.")
+        return 0
+
+    if fetch_refs:
+        fetch_references(papers_col, papers)
+
+    scores = (
+        WEIGHTS["authors"] * author_similarity(papers)
+        + WEIGHTS["references"] * reference_similarity(papers)
+        + WEIGHTS["text"] * text_similarity(papers, EmbeddingIndex.load_current())
+    ).tocsr()
+
+    related = top_k_per_row(scores, k)
+
+    updates = []
+    for paper, neighbours in zip(papers, related):
+        updates.append(UpdateOne(
+            {"_id": paper["_id"]},
+            {"$set": {"related_papers": [papers[j]["_id"] for j in neighbours]}}
+        ))
+        if len(updates) >= batch_size:
+            papers_col.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        papers_col.bulk_write(updates, ordered=False)
+
+    print(f"[Related] Verwandte Papers für {len(papers)} Papers gespeichert.")
+    return len(papers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Berechnet die Top-k verwandten Papers pro Paper.")
+    parser.add_argument("--k", type=int, default=TOP_K)
+    parser.add_argument("--fetch-references", action="store_true", help="Referenzlisten über Semantic Scholar nachladen")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    if compute_related_papers(db[PAPERS_COLLECTION], k=args.k, fetch_refs=args.fetch_references):
+        bump_ingest_epoch(db, source="relatedPapers")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import os
+import re
+from pymongo import MongoClient, ASCENDING
+from dotenv import load_dotenv
+from authorKeys import author_key_query
+
+# Kleiner Query-Planer für /papers/search.
+#
+# Jedes Suchkriterium wird zu einem Prädikat auf der papers-Collection. Kriterien mit Gleichheit auf einem
+# indizierten Feld (author_keys, tag, _id) sind Kandidaten für den Einstiegsindex: der Planer schätzt
+# ihre Trefferzahl über einen Count auf dem Index (mit Obergrenze) und nimmt das selektivste.
+# Alle übrigen Kriterien (Regex auf Titel/Inhalt, Filter) werden in dieselbe Abfrage geschoben und
+# beim Durchlaufen des Index geprüft. So ersetzt eine indizierte Abfrage mehrere Requests plus
+# Schnittmengenbildung im Client.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+PAPERS_COLLECTION = "papers"
+
+# Gleichheitsfelder, für die ensure_search_indexes einen Index anlegt
+INDEXED_FIELDS = ["author_keys", "tag"]
+# Über dieser geschätzten Trefferzahl lohnt sich ein erzwungener Index nicht mehr,
+# dann entscheidet der MongoDB-Planer selbst (z.B. zugunsten eines Sortierindex)
+HINT_MAX_ESTIMATE = 5000
+
+
+def ensure_search_indexes(papers_col):
+    for field in INDEXED_FIELDS:
+        papers_col.create_index([(field, ASCENDING)])
+
+
+def contains_regex(text: str) -> dict:
+    """Case-insensitive Teilstring-Suche; Sonderzeichen der Eingabe werden escaped."""
+    return {"$regex": re.escape(text), "$options": "i"}
+
+
+class SearchPlanner:
+    def __init__(self, papers_col, load_indexes: bool = True):
+        self.papers_col = papers_col
+        self.index_fields = {}
+        # load_indexes=False: erst später per refresh_indexes() laden (z.B. im Worker nach dem fork)
+        if load_indexes:
+            self.refresh_indexes()
+
+    def refresh_indexes(self, epoch=None):
+        """Merkt sich, welche Einzelfeld-Indizes existieren (Feld -> Indexname)."""
+        self.index_fields = {}
+        for name, info in self.papers_col.index_information().items():
+            keys = info.get("key", [])
+            if keys:
+                field = keys[0][0]
+                # Ein zusammengesetzter Index taugt ebenfalls als Einstieg über sein erstes Feld
+                if field not in self.index_fields or len(keys) == 1:
+                    self.index_fields[field] = name
+
+    def _estimate(self, predicate: dict) -> int:
+        return self.papers_col.count_documents(predicate, limit=HINT_MAX_ESTIMATE + 1)
+
+    def plan(self, title=None, author=None, author_papers=None, tag=None, content=None):
+        """
+        Baut die Abfrage für die gesetzten Kriterien und wählt den Einstiegsindex.
+        - author_papers: ObjectId-Liste aus der "papers"-Liste eines Autors (Suche per author_id)
+
+        Gibt (query, hint, plan) zurück; hint ist None, wenn MongoDB selbst wählen soll.
+        """
+        candidates = []   # (geschätzte Treffer, Feld, Prädikat)
+        residual = {}
+
+        if author_papers is not None:
+            candidates.append((len(author_papers), "_id", {"_id": {"$in": author_papers}}))
+        if author:
+            key_predicate = author_key_query(author)
+            # Teilnamen ohne Initial liefern eine Regex auf 'authors', die kein Einstiegsindex sein kann
+            if "author_keys" in key_predicate and "author_keys" in self.index_fields:
+                candidates.append((None, "author_keys", key_predicate))
+            else:
+                residual.update(key_predicate)
+        if tag:
+            if "tag" in self.index_fields:
+                candidates.append((None, "tag", {"tag": tag}))
+            else:
+                residual["tag"] = tag
+        if title:
+            residual["title"] = contains_regex(title)
+        if content:
+            residual["content"] = contains_regex(content)
+
+        # Trefferzahl nur schätzen, wenn es überhaupt etwas zu wählen gibt
+        if len(candidates) > 1:
+            candidates = [
+                (estimate if estimate is not None else self._estimate(predicate), field, predicate)
+                for estimate, field, predicate in candidates
+            ]
+            candidates.sort(key=lambda c: c[0])
+
+        query = {}
+        for _, _, predicate in candidates:
+            query.update(predicate)
+        query.update(residual)
+
+        hint = None
+        plan = {"index": None, "estimated": None, "residual": sorted(residual.keys())}
+        if candidates:
+            estimate, field, _ = candidates[0]
+            plan["index"] = self.index_fields.get(field, "_id_" if field == "_id" else None)
+            plan["estimated"] = estimate
+            if plan["index"] and estimate is not None and estimate <= HINT_MAX_ESTIMATE:
+                hint = plan["index"]
+            plan["residual"] = sorted([c[1] for c in candidates[1:]] + list(residual.keys()))
+        return query, hint, plan
+
+
+if __name__ == "__main__":
+    client = MongoClient(MONGO_URI)
+    ensure_search_indexes(client[DB_NAME][PAPERS_COLLECTION])
+    client.close()
@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from dotenv import load_dotenv
+
+# Gemeinsamer Client für die Semantic Scholar Graph API (genutzt von der fetch-Stufe in
+# semanticScholarPipeline.py, die semanticScholarCall.py und fillDbWithSemanticScholarData.py ausführen).
+#
+# - Batch-Endpunkte /author/batch und /paper/batch statt eines GET pro ID
+# - Paper-Listen direkt in /author/batch (papers.<feld>); /author/{id}/papers nur für Autoren,
+#   deren paperCount über der eingebetteten Liste liegt (paginiert, auch über 1000 Papers hinaus)
+# - API-Key aus der .env (SEMANTIC_SCHOLAR_API_KEY)
+# - Retries mit Backoff bei 429/5xx (Retry-After wird beachtet)
+# - Token-Bucket-Ratenbegrenzung, auch bei parallelen Requests
+# - Rohantworten werden mit TTL auf der Platte gecacht
+
+load_dotenv()
+
+API_ROOT = "https://api.semanticscholar.org/graph/v1"
+API_KEY = os.getenv("SEMANTIC_SCHOLAR_API_KEY")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("SEMANTIC_SCHOLAR_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "semantic_scholar"))
+CACHE_TTL = int(os.getenv("SEMANTIC_SCHOLAR_CACHE_TTL", str(7 * 24 * 3600)))  # Sekunden
+REQUESTS_PER_SECOND = float(os.getenv("SEMANTIC_SCHOLAR_RPS", "1"))
+
+AUTHOR_FIELDS = "hIndex,citationCount,paperCount"
+PAPER_FIELDS = "title,paperId,year,publicationDate,isOpenAccess,citationCount,influentialCitationCount"
+
+AUTHOR_BATCH_SIZE = 1000
+# Mit eingebetteten Paper-Listen werden die Antworten groß, daher kleinere Blöcke
+AUTHOR_PAPERS_BATCH_SIZE = 100
+PAPER_BATCH_SIZE = 500
+PAGE_LIMIT = 1000
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Einfacher, thread-sicherer Token-Bucket: rate Tokens pro Sekunde, maximal capacity auf Vorrat."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def normalize_paper(paper: dict) -> dict:
+    """Bringt ein Paper aus der API in das Format der semanticAPI/<Autor>/<Autor>.json-Dateien."""
+    return {
+        "title": paper.get("title", "") or "",
+        "paperId": paper.get("paperId", "") or "",
+        "year": paper.get("year", None),
+        "publicationDate": paper.get("publicationDate", "") or "",
+        "isOpenAccess": paper.get("isOpenAccess", False),
+        "citationCount": paper.get("citationCount", 0) or 0,
+        "influentialCitationCount": paper.get("influentialCitationCount", 0) or 0
+    }
+
+
+class SemanticScholarClient:
+    def __init__(
+        self,
+        api_key: str = API_KEY,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        max_workers: int = 4,
+        cache_dir: str = CACHE_DIR,
+        cache_ttl: int = CACHE_TTL,
+        max_retries: int = 5,
+        timeout: int = 30
+    ):
+        self.session = requests.Session()
+        if api_key:
+            self.session.headers["x-api-key"] = api_key
+        self.bucket = TokenBucket(requests_per_second, capacity=max(1, requests_per_second))
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.max_retries = max_retries
+        self.timeout = timeout
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------------------------------------
+    # Disk-Cache
+    # ---------------------------------------
+
+    def _cache_path(self, method: str, path: str, params: dict, body) -> str:
+        key = json.dumps([method, path, sorted((params or {}).items()), body], sort_keys=True)
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _cache_get(self, cache_path: str):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - cached.get("fetched_at", 0) > self.cache_ttl:
+            return None
+        return cached
+
+    def _cache_put(self, cache_path: str, data):
+        tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": time.time(), "data": data}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+
+    # ---------------------------------------
+    # HTTP mit Retry/Backoff
+    # ---------------------------------------
+
+    def _request(self, method: str, path: str, params: dict = None, body=None, use_cache: bool = True):
+        """
+        Führt einen Request gegen die Graph API aus und gibt das JSON zurück (None bei 404/Fehler).
+        """
+        cache_path = self._cache_path(method, path, params, body) if self.cache_dir and use_cache else None
+        if cache_path:
+            cached = self._cache_get(cache_path)
+            if cached is not None:
+                return cached["data"]
+
+        url = f"{API_ROOT}{path}"
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.request(method, url, params=params, json=body, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                print(f"[SemanticScholar] Verbindungsfehler bei {path}: {e}")
+                time.sleep(2 ** attempt)
+                continue
+
+            if response.status_code == 200:
+                data = response.json()
+                if cache_path:
+                    self._cache_put(cache_path, data)
+                return data
+
+            if response.status_code == 404:
+                return None
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After")
+                wait = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                print(f"[SemanticScholar] Status {response.status_code} für {path}, neuer Versuch in {wait}s")
+                time.sleep(wait)
+                continue
+
+            print(f"[SemanticScholar] Fehler beim Abruf von {path}. Status Code: {response.status_code}")
+            return None
+
+        return None
+
+    # ---------------------------------------
+    # Endpunkte
+    # ---------------------------------------
+
+    def get_authors_batch(self, author_ids: list, fields: str = AUTHOR_FIELDS, batch_size: int = AUTHOR_BATCH_SIZE) -> dict:
+        """POST /author/batch in Blöcken zu batch_size IDs. Gibt {author_id: daten} zurück (unbekannte IDs fehlen)."""
+        author_ids = sorted({a.strip() for a in author_ids if a and a.strip()})
+        result = {}
+        for i in range(0, len(author_ids), batch_size):
+            chunk = author_ids[i:i + batch_size]
+            data = self._request("POST", "/author/batch", params={"fields": fields}, body={"ids": chunk})
+            for author_id, author in zip(chunk, data or []):
+                if author:
+                    result[author_id] = author
+        return result
+
+    def get_papers_batch(self, paper_ids: list, fields: str = PAPER_FIELDS) -> dict:
+        """POST /paper/batch in Blöcken zu 500 IDs. Gibt {paper_id: daten} zurück (unbekannte IDs fehlen)."""
+        paper_ids = sorted({p for p in paper_ids if p})
+        chunks = [paper_ids[i:i + PAPER_BATCH_SIZE] for i in range(0, len(paper_ids), PAPER_BATCH_SIZE)]
+
+        def fetch_chunk(chunk):
+            data = self._request("POST", "/paper/batch", params={"fields": fields}, body={"ids": chunk})
+            return {paper_id: paper for paper_id, paper in zip(chunk, data or []) if paper}
+
+        result = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for chunk_result in pool.map(fetch_chunk, chunks):
+                result.update(chunk_result)
+        return result
+
+    def get_author_papers(self, author_id: str, fields: str = PAPER_FIELDS) -> list:
+        """GET /author/{id}/papers, paginiert (auch für Autoren mit mehr als 1000 Papers)."""
+        papers = []
+        offset = 0
+        while offset is not None:
+            data = self._request(
+                "GET",
+                f"/author/{author_id}/papers",
+                params={"fields": fields, "limit": PAGE_LIMIT, "offset": offset}
+            )
+            if not data:
+                break
+            papers.extend(data.get("data", []))
+            offset = data.get("next")
+        return papers
+
+    def fetch_authors(self, author_ids: list, paper_fields: str = PAPER_FIELDS) -> dict:
+        """
+        Holt für alle IDs hIndex, citationCount und die komplette Paper-Liste:
+          - Kennzahlen und Paper-Listen über wenige /author/batch-Requests
+          - nur wenn die eingebettete Liste kürzer als paperCount ist, parallel (unter dem Rate-Limit)
+            über /author/{id}/papers nachladen
+        Gibt {author_id: {"hIndex", "citationCount", "papers": [...]}} zurück.
+        """
+        fields = AUTHOR_FIELDS + "," + ",".join(f"papers.{field}" for field in paper_fields.split(","))
+        authors = self.get_authors_batch(author_ids, fields=fields, batch_size=AUTHOR_PAPERS_BATCH_SIZE)
+        paper_lists = {author_id: author.get("papers") or [] for author_id, author in authors.items()}
+
+        incomplete = [
+            author_id for author_id, author in authors.items()
+            if len(paper_lists[author_id]) < (author.get("paperCount") or 0)
+        ]
+        if incomplete:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for author_id, papers in zip(incomplete, pool.map(lambda a: self.get_author_papers(a, paper_fields), incomplete)):
+                    # Bei einem Fehler im Nachladen die eingebettete (gekürzte) Liste behalten
+                    if papers:
+                        paper_lists[author_id] = papers
+
+        result = {}
+        for author_id, author in authors.items():
+            papers = paper_lists[author_id]
+            result[author_id] = {
+                "hIndex": author.get("hIndex", 0) or 0,
+                "citationCount": author.get("citationCount", 0) or 0,
+                "papers": [normalize_paper(p) for p in papers]
+            }
+        return result
@@ -0,0 +1,310 @@
+import os
+import re
+import json
+import argparse
+from datetime import datetime, timezone
+from bson import ObjectId
+from rapidfuzz import fuzz, process
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+from semanticScholarClient import SemanticScholarClient
+from ingestEpoch import bump_ingest_epoch
+from trendingScores import citation_snapshot_update
+
+# Gestufte Semantic-Scholar-Pipeline (ersetzt die doppelte Logik aus semanticScholarCall.py
+# und fillDbWithSemanticScholarData.py):
+#
+#   fetch    -> semanticAPI/_raw/authors_by_id.json     (Rohdaten pro Semantic Scholar ID, einziger Netzwerkzugriff)
+#   snapshot -> semanticAPI/<Autor>/<Autor>.json         (zusammengeführte Daten pro Autor, bisheriges Format)
+#   match    -> semanticAPI/<Autor>/matches.json         (Fuzzy-Titelabgleich gegen die Papers in der DB)
+#   apply    -> MongoDB                                  (Papers und Autoren aktualisieren)
+#
+# Jede Stufe liest nur den Snapshot der vorherigen Stufe von der Platte. Existiert der Fetch-Snapshot
+# bereits, werden nur IDs abgefragt, die darin noch fehlen (z.B. neu hinzugekommene Autoren); mit --refresh
+# wird alles neu geladen. match/apply lassen sich beliebig oft offline wiederholen.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+AUTHORS_COLLECTION = "authors"
+PAPERS_COLLECTION = "papers"
+SEMANTIC_API_ROOT = "semanticAPI"
+RAW_SNAPSHOT = os.path.join(SEMANTIC_API_ROOT, "_raw", "authors_by_id.json")
+MATCHES_FILENAME = "matches.json"
+MATCH_THRESHOLD = 90
+MIN_YEAR = 2020  # In der DB existieren nur Papers ab 2020
+
+STAGES = ["fetch", "snapshot", "match", "apply"]
+
+
+def clean_title(original_title):
+    cleaned = re.sub(r'[^a-zA-Z0-9 ]', '_', original_title)
+    cleaned = cleaned.replace(' ', '_')
+    return cleaned[:50]
+
+
+def _load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_json(data, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _semantic_ids(author):
+    semantic_ids = author.get("semantic_scholar_id", [])
+    if not semantic_ids or not isinstance(semantic_ids, list):
+        return []
+    return [sem_id.strip() for sem_id in semantic_ids if sem_id and sem_id.strip()]
+
+
+def author_snapshot_path(author_name):
+    return os.path.join(SEMANTIC_API_ROOT, author_name, f"{author_name}.json")
+
+
+def author_matches_path(author_name):
+    return os.path.join(SEMANTIC_API_ROOT, author_name, MATCHES_FILENAME)
+
+
+# ---------------------------------------
+# Stufe 1: fetch
+# ---------------------------------------
+
+def stage_fetch(authors, refresh=False, client=None):
+    """
+    Holt die Semantic Scholar IDs in Batches und speichert die Rohdaten pro ID.
+    Ohne refresh werden nur IDs abgefragt, die im vorhandenen Snapshot noch fehlen.
+    """
+    all_ids = {sem_id for author in authors for sem_id in _semantic_ids(author)}
+    data_by_id = {}
+    if os.path.exists(RAW_SNAPSHOT) and not refresh:
+        data_by_id = _load_json(RAW_SNAPSHOT)
+    missing = sorted(all_ids - data_by_id.keys())
+    if not missing:
+        print(f"[fetch] Alle {len(all_ids)} IDs sind in {RAW_SNAPSHOT} vorhanden, API-Abruf übersprungen (--refresh zum Neuladen).")
+        return
+
+    client = client or SemanticScholarClient()
+    fetched = client.fetch_authors(missing)
+    data_by_id.update(fetched)
+    _save_json(data_by_id, RAW_SNAPSHOT)
+    print(f"[fetch] {len(fetched)} von {len(missing)} fehlenden IDs abgerufen ({len(data_by_id)} gesamt) -> {RAW_SNAPSHOT}")
+
+
+# ---------------------------------------
+# Stufe 2: snapshot
+# ---------------------------------------
+
+def combine_author_data(semantic_ids, data_by_id):
+    """Führt die Daten mehrerer IDs eines Autors zusammen (max. hIndex/citationCount, Papers ohne Duplikate)."""
+    combined_hIndex = 0
+    combined_citationCount = 0
+    papers_dict = {}  # Verhindert Duplikate basierend auf paperId
+
+    for sem_id in semantic_ids:
+        author_data = data_by_id.get(sem_id)
+        if not author_data:
+            continue
+        combined_hIndex = max(combined_hIndex, author_data.get("hIndex", 0))
+        combined_citationCount = max(combined_citationCount, author_data.get("citationCount", 0))
+        for paper in author_data.get("papers", []):
+            paper_id = paper.get("paperId")
+            if paper_id and paper_id not in papers_dict:
+                papers_dict[paper_id] = paper
+
+    return {
+        "hIndex": combined_hIndex,
+        "citationCount": combined_citationCount,
+        "papers": list(papers_dict.values())
+    }
+
+
+def stage_snapshot(authors):
+    """Schreibt semanticAPI/<Autor>/<Autor>.json aus dem Fetch-Snapshot."""
+    data_by_id = _load_json(RAW_SNAPSHOT)
+    written = 0
+    for author in authors:
+        author_name = author.get("name", "unbekannt")
+        semantic_ids = _semantic_ids(author)
+        if not semantic_ids:
+            print(f"[snapshot] Für Autor/in '{author_name}' wurden keine Semantic Scholar IDs gefunden. Überspringe...")
+            continue
+
+        combined = combine_author_data(semantic_ids, data_by_id)
+        if not combined["papers"]:
+            print(f"[snapshot] Keine Paper-Daten für Autor/in '{author_name}' gefunden. Überspringe...")
+            continue
+
+        _save_json(combined, author_snapshot_path(author_name))
+        written += 1
+    print(f"[snapshot] {written} Autor-Snapshots geschrieben.")
+
+
+# ---------------------------------------
+# Stufe 3: match
+# ---------------------------------------
+
+def match_author_papers(snapshot, db_papers, threshold=MATCH_THRESHOLD):
+    """
+    Ordnet die Semantic-Scholar-Papers (ab MIN_YEAR) per Fuzzy-Titelabgleich den Papers in der DB zu.
+    Die DB-Titel werden nur einmal pro Autor bereinigt (statt einmal pro Semantic-Scholar-Paper).
+    """
+    choices = {str(p["_id"]): clean_title(p.get("title") or "").lower() for p in db_papers}
+    matches = []
+    if not choices:
+        return matches
+
+    for paper in snapshot.get("papers", []):
+        year = paper.get("year") or 0
+        if year < MIN_YEAR:
+            continue
+        best = process.extractOne(
+            clean_title(paper.get("title", "")).lower(),
+            choices,
+            scorer=fuzz.ratio,
+            score_cutoff=threshold
+        )
+        if best is None:
+            continue
+        _, score, db_paper_id = best
+        matches.append({
+            "paper_id": db_paper_id,
+            "semantic_scholar_paper_id": paper.get("paperId", ""),
+            "score": score,
+            "citationCount": paper.get("citationCount", 0),
+            "influentialCitationCount": paper.get("influentialCitationCount", 0)
+        })
+    return matches
+
+
+def stage_match(authors, papers_col):
+    """Liest die Autor-Snapshots und schreibt semanticAPI/<Autor>/matches.json."""
+    for author in authors:
+        author_name = author.get("name", "unbekannt")
+        snapshot_file = author_snapshot_path(author_name)
+        if not os.path.exists(snapshot_file):
+            continue
+
+        snapshot = _load_json(snapshot_file)
+        db_papers = list(papers_col.find({"_id": {"$in": author.get("papers", [])}}, {"title": 1}))
+        matches = match_author_papers(snapshot, db_papers)
+
+        _save_json({
+            "author_id": str(author["_id"]),
+            "h_index": snapshot.get("hIndex", 0),
+            "citations": snapshot.get("citationCount", 0),
+            # Summe der hochinfluenten Zitationen über ALLE Paper des Autors
+            "highly_influential_citations": sum(p.get("influentialCitationCount", 0) for p in snapshot.get("papers", [])),
+            "matches": matches
+        }, author_matches_path(author_name))
+        print(f"[match] Autor: {author_name}, {len(matches)} Paper-Matches")
+
+
+# ---------------------------------------
+# Stufe 4: apply
+# ---------------------------------------
+
+def build_paper_updates(paper_matches: dict, papers_col) -> list:
+    """
+    Zitationsdaten setzen und den Snapshot an citation_history anhängen. Der Zuwachs seit dem letzten
+    Snapshot fließt in trending_score ein (siehe trendingScores.py).
+    """
+    oids = [ObjectId(paper_id) for paper_id in paper_matches]
+    last_counts = {}
+    for doc in papers_col.find({"_id": {"$in": oids}}, {"citation_history": {"$slice": -1}}):
+        history = doc.get("citation_history") or []
+        last_counts[str(doc["_id"])] = history[-1].get("count", 0) if history else None
+
+    now = datetime.now(timezone.utc)
+    updates = []
+    for paper_id, match in paper_matches.items():
+        update = citation_snapshot_update(last_counts.get(paper_id), match["citationCount"], now)
+        update["$set"] = {
+            "citationCount": match["citationCount"],
+            "highlyInfluentialCitations": match["influentialCitationCount"],
+            "semantic_scholar_paper_id": match["semantic_scholar_paper_id"]
+        }
+        updates.append(UpdateOne({"_id": ObjectId(paper_id)}, update))
+    return updates
+
+
+def stage_apply(authors, authors_col, papers_col, bump_epoch: bool = True):
+    """
+    Schreibt die Match-Ergebnisse gesammelt (bulk_write) in die DB.
+    bump_epoch=False: keine neue Ingest-Epoche (der Orchestrator erhöht sie einmal am Ende).
+    """
+    paper_matches = {}
+    author_updates = []
+    for author in authors:
+        author_name = author.get("name", "unbekannt")
+        matches_file = author_matches_path(author_name)
+        if not os.path.exists(matches_file):
+            continue
+
+        result = _load_json(matches_file)
+        # Ein Paper kann bei mehreren Autoren gematcht werden, pro Lauf zählt es nur einmal
+        for match in result["matches"]:
+            paper_matches[match["paper_id"]] = match
+        author_updates.append(UpdateOne(
+            {"_id": ObjectId(result["author_id"])},
+            {"$set": {
+                "h_index": result["h_index"],
+                "citations": result["citations"],
+                "highly_influential_citations": result["highly_influential_citations"],
+                # citationCount der Papers hat sich geändert -> authorMetrics.py neu berechnen lassen
+                "metrics_dirty": True
+            }}
+        ))
+        print(f"[apply] Autor '{author_name}' aktualisiert. (hIndex={result['h_index']}, citations={result['citations']}, HPC={result['highly_influential_citations']})")
+
+    paper_updates = build_paper_updates(paper_matches, papers_col)
+    if paper_updates:
+        papers_col.bulk_write(paper_updates, ordered=False)
+    if author_updates:
+        authors_col.bulk_write(author_updates, ordered=False)
+    print(f"[apply] {len(paper_updates)} Paper- und {len(author_updates)} Autor-Updates geschrieben.")
+    if (paper_updates or author_updates) and bump_epoch:
+        bump_ingest_epoch(authors_col.database, source="semanticScholarPipeline")
+
+
+def run_pipeline(stages=STAGES, refresh=False):
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    authors_col = db[AUTHORS_COLLECTION]
+    papers_col = db[PAPERS_COLLECTION]
+
+    authors = list(authors_col.find({}, {"name": 1, "semantic_scholar_id": 1, "papers": 1}))
+
+    if "fetch" in stages:
+        stage_fetch(authors, refresh=refresh)
+    if "snapshot" in stages:
+        stage_snapshot(authors)
+    if "match" in stages:
+        stage_match(authors, papers_col)
+    if "apply" in stages:
+        stage_apply(authors, authors_col, papers_col)
+
+    client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic-Scholar-Pipeline: fetch -> snapshot -> match -> apply")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Kommagetrennte Stufen (Default: {','.join(STAGES)})")
+    parser.add_argument("--refresh", action="store_true", help="Fetch-Snapshot ignorieren und die API erneut abfragen")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unbekannte Stufe(n): {', '.join(unknown)}")
+    run_pipeline(stages, refresh=args.refresh)
+
+
+if __name__ == "__main__":
+    main()
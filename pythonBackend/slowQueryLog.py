@@ -0,0 +1,184 @@
+import os
+import json
+import queue
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+
+# Opt-in Slow-Query-Log für die Paper-Abfragen aus apply_sorting_and_pagination.
+#
+# Überschreitet eine Abfrage SLOW_QUERY_MS, wird eine JSON-Zeile geloggt mit:
+#   - normalisierter Query-Form (Werte durch "?" ersetzt, damit gleiche Abfragen gruppiert werden können)
+#   - Sortierung, skip/limit, Hint und Dauer (count und find getrennt)
+#   - bei einer Stichprobe (SLOW_QUERY_EXPLAIN_SAMPLE) zusätzlich eine Zusammenfassung von
+#     explain("executionStats"): untersuchte Dokumente/Schlüssel vs. zurückgegebene, benutzter Index, COLLSCAN.
+#     Erklärt wird die find-Abfrage; überwiegt count_ms, zusätzlich die count-Pipeline ($match + $count).
+# Das explain läuft in einem einzigen Hintergrund-Thread, der Request wartet nicht darauf. Ist dessen
+# Warteschlange voll (SLOW_QUERY_EXPLAIN_QUEUE), wird der Eintrag ohne explain geloggt.
+#
+# Konfiguration über .env:
+#   SLOW_QUERY_MS=200                  (leer oder 0 = aus)
+#   SLOW_QUERY_EXPLAIN_SAMPLE=0.1      (Anteil der langsamen Abfragen mit explain)
+#   SLOW_QUERY_EXPLAIN_QUEUE=100       (max. wartende explains)
+#   SLOW_QUERY_LOG_FILE=slow_queries.log (leer = stderr)
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "0") or 0)
+SLOW_QUERY_EXPLAIN_SAMPLE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE", "0.1") or 0)
+SLOW_QUERY_EXPLAIN_QUEUE = int(os.getenv("SLOW_QUERY_EXPLAIN_QUEUE", "100") or 100)
+SLOW_QUERY_LOG_FILE = os.getenv("SLOW_QUERY_LOG_FILE", "")
+
+logger = logging.getLogger("hub.slow_queries")
+
+
+def _configure_logger():
+    if logger.handlers:
+        return
+    handler = logging.FileHandler(SLOW_QUERY_LOG_FILE, encoding="utf-8") if SLOW_QUERY_LOG_FILE else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def normalize_query_shape(query):
+    """
+    {"title": {"$regex": "llm", "$options": "i"}, "$or": [{"published": {"$regex": "2024"}}, ...]}
+    -> {"title": {"$regex": "?", "$options": "?"}, "$or": [{"published": {"$regex": "?"}}]}
+    """
+    if isinstance(query, dict):
+        return {key: normalize_query_shape(value) for key, value in sorted(query.items())}
+    if isinstance(query, (list, tuple)):
+        shapes = []
+        for item in query:
+            shape = normalize_query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return "?"
+
+
+def _find_stages(plan: dict, stages: list, indexes: list):
+    if not isinstance(plan, dict):
+        return
+    stage = plan.get("stage")
+    if stage:
+        stages.append(stage)
+    if plan.get("indexName"):
+        indexes.append(plan["indexName"])
+    for key in ("inputStage", "queryPlan"):
+        _find_stages(plan.get(key), stages, indexes)
+    for child in plan.get("inputStages", []):
+        _find_stages(child, stages, indexes)
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Die wesentlichen Zahlen aus explain("executionStats")."""
+    if "queryPlanner" not in explain and explain.get("stages"):
+        # Aggregate-explain älterer Server: Plan und Statistik stecken in der $cursor-Stage
+        explain = explain["stages"][0].get("$cursor", {})
+    stats = explain.get("executionStats", {})
+    stages, indexes = [], []
+    _find_stages(explain.get("queryPlanner", {}).get("winningPlan", {}), stages, indexes)
+    return {
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+        "stages": stages,
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+    }
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, explain_sample: float = SLOW_QUERY_EXPLAIN_SAMPLE,
+                 explain_queue: int = SLOW_QUERY_EXPLAIN_QUEUE):
+        self.threshold_ms = threshold_ms
+        self.explain_sample = explain_sample
+        self.logged = 0
+        self.explains_dropped = 0
+        self._queue = queue.Queue(maxsize=explain_queue)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        if self.enabled:
+            _configure_logger()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def _explain(self, collection, query, sort_spec, skip, limit, hint) -> dict:
+        command = {"find": collection.name, "filter": query, "skip": skip, "limit": limit}
+        if sort_spec:
+            command["sort"] = dict(sort_spec)
+        if hint:
+            command["hint"] = hint
+        return collection.database.command("explain", command, verbosity="executionStats")
+
+    def _explain_count(self, collection, query, hint) -> dict:
+        # count_documents läuft serverseitig als Aggregation mit $match
+        command = {"aggregate": collection.name, "pipeline": [{"$match": query}, {"$count": "n"}], "cursor": {}}
+        if hint:
+            command["hint"] = hint
+        return collection.database.command("explain", command, verbosity="executionStats")
+
+    def _write(self, entry: dict, collection=None, explain_args=None):
+        if explain_args is not None:
+            query, sort_spec, skip, limit, hint = explain_args
+            if entry["find_ms"] > 0:
+                try:
+                    entry["explain"] = summarize_explain(self._explain(collection, query, sort_spec, skip, limit, hint))
+                except Exception as e:
+                    entry["explain_error"] = str(e)
+            if entry["count_ms"] >= entry["find_ms"]:
+                try:
+                    entry["count_explain"] = summarize_explain(self._explain_count(collection, query, hint))
+                except Exception as e:
+                    entry["count_explain_error"] = str(e)
+        logger.info(json.dumps(entry, default=str, ensure_ascii=False))
+
+    def _run(self):
+        while True:
+            entry, collection, explain_args = self._queue.get()
+            try:
+                self._write(entry, collection, explain_args)
+            except Exception as e:
+                print(f"[SlowQueryLog] Fehler beim Schreiben: {e}")
+
+    def _submit(self, entry: dict, collection, explain_args) -> bool:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="slow-query-explain", daemon=True)
+                self._thread.start()
+        try:
+            self._queue.put_nowait((entry, collection, explain_args))
+            return True
+        except queue.Full:
+            self.explains_dropped += 1
+            return False
+
+    def record(self, collection, query: dict, sort_spec, skip: int, limit: int, hint, count_ms: float, find_ms: float, returned: int):
+        """Wird nach jeder Abfrage aufgerufen; loggt nur, wenn die Schwelle überschritten ist."""
+        duration_ms = count_ms + find_ms
+        if not self.enabled or duration_ms < self.threshold_ms:
+            return
+
+        self.logged += 1
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "collection": collection.name,
+            "shape": normalize_query_shape(query),
+            "sort": [[field, direction] for field, direction in sort_spec] if sort_spec else None,
+            "skip": skip,
+            "limit": limit,
+            "hint": hint,
+            "duration_ms": round(duration_ms, 2),
+            "count_ms": round(count_ms, 2),
+            "find_ms": round(find_ms, 2),
+            "returned": returned,
+        }
+
+        if random.random() < self.explain_sample and self._submit(entry, collection, (query, sort_spec, skip, limit, hint)):
+            return
+        self._write(entry)
@@ -0,0 +1,103 @@
+import re
+import html
+
+# Erzeugt kurze, hervorgehobene Textausschnitte (Snippets) für Suchergebnisse.
+#
+# Die Trefferpositionen werden pro Anfrage mit einem vorkompilierten Regex über Titel, Abstract und Inhalt
+# gesucht (dieselben Suchbegriffe wie in der MongoDB-Abfrage). Um jede Fundstelle wird ein Fenster gelegt,
+# überlappende Fenster werden zusammengefasst und an Wortgrenzen ausgerichtet. Der Text wird HTML-escaped,
+# nur die Treffer selbst stehen in <mark>...</mark>.
+#
+# Damit kann der Client auf den vollständigen "content" in Ergebnislisten verzichten (include_content=false).
+
+FRAGMENT_SIZE = 160          # Zeichen pro Ausschnitt (ungefähr)
+MAX_FRAGMENTS = 3            # Ausschnitte pro Feld
+MAX_MATCHES_SCANNED = 50     # danach wird ein langes Feld nicht weiter durchsucht
+SNIPPET_FIELDS = ("title", "abstract", "content")
+ELLIPSIS = "…"
+
+
+def compile_terms(terms):
+    """Ein Regex für alle Suchbegriffe (längste zuerst, damit "deep learning" vor "deep" greift)."""
+    terms = sorted({t.strip() for t in terms if t and t.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+
+
+def highlight(text: str, pattern) -> str:
+    """HTML-escaped Text mit allen Treffern in <mark>."""
+    parts = []
+    last = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        last = match.end()
+    parts.append(html.escape(text[last:]))
+    return "".join(parts)
+
+
+def _snap_window(text: str, start: int, end: int):
+    """Verschiebt die Fenstergrenzen auf das nächste Leerzeichen, damit keine Wörter abgeschnitten werden."""
+    if start > 0:
+        space = text.find(" ", start, start + 20)
+        start = space + 1 if space != -1 else start
+    if end < len(text):
+        space = text.rfind(" ", end - 20, end)
+        end = space if space != -1 else end
+    return start, end
+
+
+def fragments(text: str, pattern, fragment_size: int = FRAGMENT_SIZE, max_fragments: int = MAX_FRAGMENTS) -> list:
+    """Bis zu max_fragments hervorgehobene Ausschnitte rund um die Treffer in text."""
+    if not text or pattern is None:
+        return []
+
+    windows = []
+    for i, match in enumerate(pattern.finditer(text)):
+        if i >= MAX_MATCHES_SCANNED:
+            break
+        padding = max(0, (fragment_size - (match.end() - match.start())) // 2)
+        start = max(0, match.start() - padding)
+        end = min(len(text), match.end() + padding)
+        if windows and start <= windows[-1][1] and end - windows[-1][0] <= fragment_size * 3 // 2:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        elif windows and start <= windows[-1][1]:
+            # dicht beieinanderliegende Treffer: Fenster nicht beliebig wachsen lassen
+            continue
+        else:
+            if len(windows) == max_fragments:
+                break
+            windows.append((start, end))
+
+    result = []
+    for start, end in windows:
+        start, end = _snap_window(text, start, end)
+        fragment = " ".join(text[start:end].split())
+        result.append(
+            (ELLIPSIS if start > 0 else "")
+            + highlight(fragment, pattern)
+            + (ELLIPSIS if end < len(text) else "")
+        )
+    return result
+
+
+def build_snippets(doc: dict, pattern, fields=SNIPPET_FIELDS) -> dict:
+    """
+    {"title": [...], "abstract": [...], "content": [...]} mit den hervorgehobenen Ausschnitten.
+    Der Titel wird komplett (hervorgehoben) zurückgegeben, wenn er einen Treffer enthält.
+    """
+    snippets = {}
+    if pattern is None:
+        return snippets
+    for field in fields:
+        text = doc.get(field)
+        if not isinstance(text, str):
+            continue
+        if field == "title":
+            found = [highlight(text, pattern)] if pattern.search(text) else []
+        else:
+            found = fragments(text, pattern)
+        if found:
+            snippets[field] = found
+    return snippets
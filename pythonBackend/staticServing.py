@@ -0,0 +1,287 @@
+import os
+import re
+import stat
+import hashlib
+import mimetypes
+import threading
+import anyio
+from starlette.staticfiles import StaticFiles
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.datastructures import Headers, QueryParams
+
+# Auslieferung von /pdfs und /images mit Cache-Headern.
+#
+# - Starke ETags (MD5 des Dateiinhalts, gecacht über Pfad/Größe/mtime)
+# - "immutable" Cache-Control für inhaltsadressierte Pfade (Dateiname enthält einen MD5-Hash,
+#   z.B. die Thumbnails aus thumbnailGenerator.py, oder ?v=<md5> in der URL)
+# - Range-Requests (einzelner Bereich) für große PDFs
+# - vorkomprimierte Varianten (<datei>.br / <datei>.gz), falls vorhanden
+# - optional X-Accel-Redirect (nginx) oder X-Sendfile (Apache/lighttpd), damit der Proxy
+#   die Bytes ausliefert und die API-Worker frei bleiben
+#
+# Konfiguration über .env:
+#   STATIC_OFFLOAD=x-accel-redirect | x-sendfile   (leer = Dateien selbst ausliefern)
+#   STATIC_ACCEL_PREFIX=/_protected                 (interne nginx-Location für X-Accel-Redirect)
+#   STATIC_MAX_AGE=3600                             (max-age für nicht inhaltsadressierte Dateien)
+
+STATIC_OFFLOAD = os.getenv("STATIC_OFFLOAD", "").lower()
+STATIC_ACCEL_PREFIX = os.getenv("STATIC_ACCEL_PREFIX", "/_protected").rstrip("/")
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_HASH_PATTERN = re.compile(r"(?<![0-9a-f])[0-9a-f]{32}(?![0-9a-f])")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+# Vorkomprimierte Varianten in Präferenz-Reihenfolge: (Accept-Encoding-Token, Dateiendung)
+PRECOMPRESSED_VARIANTS = [("br", ".br"), ("gzip", ".gz")]
+
+
+class _ETagCache:
+    """Thread-sicherer Cache: (Pfad, Größe, mtime) -> MD5 des Inhalts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, full_path: str, stat_result: os.stat_result) -> str:
+        key = (full_path, stat_result.st_size, stat_result.st_mtime_ns)
+        with self._lock:
+            cached = self._hashes.get(full_path)
+            if cached and cached[0] == key:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        md5 = hashlib.md5()
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                md5.update(chunk)
+        digest = md5.hexdigest()
+
+        with self._lock:
+            self._hashes[full_path] = (key, digest)
+        return digest
+
+
+etag_cache = _ETagCache()
+
+
+def _iter_file_range(full_path: str, start: int, end: int):
+    """Liest die Bytes [start, end] blockweise aus einer Datei."""
+    with open(full_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+class _FullFileResponse(FileResponse):
+    """
+    FileResponse, die immer die ganze Datei sendet. Ranges beantwortet file_response selbst; was dort
+    ignoriert wird (ungültig, Multi-Range), darf Starlette nicht erneut auswerten (400 bzw. multipart).
+    """
+
+    async def __call__(self, scope, receive, send):
+        headers = [(key, value) for key, value in scope["headers"] if key not in (b"range", b"if-range")]
+        await super().__call__({**scope, "headers": headers}, receive, send)
+
+
+def parse_range_header(range_header: str, file_size: int):
+    """
+    Wertet einen Range-Header mit genau einem Bereich aus.
+    Gibt (start, end) zurück, None wenn der Header ignoriert werden soll (z.B. Multi-Range oder
+    Ende vor Anfang, RFC 7233: ungültige byte-range-spec -> ganze Datei mit 200),
+    oder (-1, -1) wenn der Bereich nicht erfüllbar ist (416).
+    """
+    match = RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+
+    if not start_str:
+        # Suffix-Range: die letzten N Bytes
+        length = int(end_str)
+        if length == 0:
+            return (-1, -1)
+        start = max(0, file_size - length)
+        end = file_size - 1
+    else:
+        start = int(start_str)
+        end = int(end_str) if end_str else file_size - 1
+        if end_str and end < start:
+            return None
+        end = min(end, file_size - 1)
+
+    if start >= file_size:
+        return (-1, -1)
+    return (start, end)
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles mit starken ETags, langen Cache-Headern, Range-Support,
+    vorkomprimierten Varianten und optionalem Offloading an einen Reverse-Proxy.
+    """
+
+    def __init__(self, *args, url_prefix: str = "", offload: str = STATIC_OFFLOAD, on_access=None, **kwargs):
+        """
+        on_access: optionaler Callback(relativer Pfad, z.B. "pdfs/x.pdf"), der bei jedem Abruf einer Datei
+        aufgerufen wird (GET ohne Range bzw. Range ab Byte 0, nicht bei 304), z.B. zum Zählen von Views.
+        """
+        super().__init__(*args, **kwargs)
+        self.url_prefix = url_prefix.strip("/")
+        self.offload = offload
+        self.on_access = on_access
+
+    async def get_response(self, path: str, scope):
+        # Den MD5-Hash vorab im Threadpool berechnen, damit große PDFs den Event-Loop nicht blockieren
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result and stat.S_ISREG(stat_result.st_mode):
+            await anyio.to_thread.run_sync(etag_cache.get, full_path, stat_result)
+        return await super().get_response(path, scope)
+
+    def _cache_control(self, full_path: str, content_hash: str, scope) -> str:
+        if CONTENT_HASH_PATTERN.search(os.path.basename(full_path)):
+            return IMMUTABLE_CACHE_CONTROL
+        version = QueryParams(scope.get("query_string", b"")).get("v")
+        if version and version == content_hash:
+            return IMMUTABLE_CACHE_CONTROL
+        return f"public, max-age={STATIC_MAX_AGE}"
+
+    def _offload_response(self, full_path: str, headers: dict, media_type: str) -> Response:
+        if self.offload == "x-accel-redirect":
+            relative_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+            headers["X-Accel-Redirect"] = f"{STATIC_ACCEL_PREFIX}/{self.url_prefix}/{relative_path}"
+        else:
+            headers["X-Sendfile"] = full_path
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    def _precompressed_variants(self, full_path: str) -> list:
+        """Vorhandene vorkomprimierte Varianten: [(encoding, Pfad), ...] in Präferenz-Reihenfolge."""
+        return [
+            (encoding, full_path + suffix) for encoding, suffix in PRECOMPRESSED_VARIANTS
+            if os.path.isfile(full_path + suffix)
+        ]
+
+    def _precompressed_variant(self, variants: list, request_headers: Headers):
+        accept_encoding = request_headers.get("accept-encoding", "")
+        for encoding, variant_path in variants:
+            if encoding in accept_encoding:
+                return encoding, variant_path
+        return None
+
+    def _record_access(self, full_path: str, scope):
+        if self.on_access is None or scope.get("method") != "GET":
+            return
+        relative_path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        self.on_access(f"{self.url_prefix}/{relative_path}" if self.url_prefix else relative_path)
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        content_hash = etag_cache.get(full_path, stat_result)
+        etag = f'"{content_hash}"'
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+        headers = {
+            "ETag": etag,
+            "Cache-Control": self._cache_control(full_path, content_hash, scope),
+            "Accept-Ranges": "bytes",
+        }
+
+        # Gibt es komprimierte Varianten, hängt die Antwort von Accept-Encoding ab (auch bei 304)
+        variants = [] if self.offload in ("x-accel-redirect", "x-sendfile") else self._precompressed_variants(full_path)
+        if variants:
+            headers["Vary"] = "Accept-Encoding"
+        variant = self._precompressed_variant(variants, request_headers)
+
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            # Alle Varianten haben denselben Inhalt; akzeptiert werden das ETag des Originals und jeder Variante
+            valid_etags = {etag} | {f'"{content_hash}-{encoding}"' for encoding, _ in variants}
+            if if_none_match.strip() == "*" or valid_etags & {t.strip() for t in if_none_match.split(",")}:
+                if variant and not request_headers.get("range"):
+                    headers["ETag"] = f'"{content_hash}-{variant[0]}"'
+                return Response(status_code=304, headers=headers)
+
+        range_header = request_headers.get("range")
+        if_range = request_headers.get("if-range")
+        use_range = bool(range_header) and (not if_range or if_range.strip() == etag)
+        byte_range = parse_range_header(range_header, stat_result.st_size) if use_range else None
+
+        if self.offload in ("x-accel-redirect", "x-sendfile"):
+            # Den Range beantwortet der Proxy; gezählt wird wie unten nur die Anfrage ab Byte 0
+            if byte_range is None or byte_range[0] == 0:
+                self._record_access(full_path, scope)
+            return self._offload_response(full_path, headers, media_type)
+
+        if use_range:
+            file_size = stat_result.st_size
+            if byte_range == (-1, -1):
+                headers["Content-Range"] = f"bytes */{file_size}"
+                return Response(status_code=416, headers=headers)
+            if byte_range is not None:
+                start, end = byte_range
+                # PDF-Viewer laden in vielen Teilanfragen; nur die erste (ab Byte 0) zählt als Abruf
+                if start == 0:
+                    self._record_access(full_path, scope)
+                headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+                headers["Content-Length"] = str(end - start + 1)
+                return StreamingResponse(
+                    _iter_file_range(full_path, start, end),
+                    status_code=206,
+                    headers=headers,
+                    media_type=media_type,
+                )
+
+        self._record_access(full_path, scope)
+        if variant:
+            encoding, variant_path = variant
+            headers["Content-Encoding"] = encoding
+            # Komprimierte Bytes sind nicht Range-fähig bezogen auf das Original
+            headers.pop("Accept-Ranges")
+            headers["ETag"] = f'"{content_hash}-{encoding}"'
+            return _FullFileResponse(variant_path, status_code=status_code, headers=headers, media_type=media_type)
+
+        return _FullFileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            stat_result=stat_result,
+        )
+
+
+def _check_parse_range_header():
+    """Kurzer Selbsttest für parse_range_header: python staticServing.py"""
+    size = 1000
+    cases = {
+        "bytes=0-99": (0, 99),
+        "bytes=500-": (500, 999),           # offenes Ende
+        "bytes=-100": (900, 999),           # Suffix
+        "bytes=-5000": (0, 999),            # Suffix länger als die Datei
+        "bytes=900-5000": (900, 999),       # Ende wird gekappt
+        "bytes=1000-": (-1, -1),            # Start hinter dem Dateiende -> 416
+        "bytes=-0": (-1, -1),               # leerer Suffix -> 416
+        "bytes=50-10": None,                # Start > Ende: ungültig, Header wird ignoriert (200)
+        "bytes=1000-1200": (-1, -1),        # gültig, aber nicht erfüllbar -> 416
+        "bytes=-": None,
+        "bytes=0-1,5-9": None,              # Multi-Range wird ignoriert
+        "items=0-1": None,
+    }
+    for header, expected in cases.items():
+        result = parse_range_header(header, size)
+        assert result == expected, f"{header}: {result} != {expected}"
+    print(f"parse_range_header: {len(cases)} Fälle ok")
+
+
+if __name__ == "__main__":
+    _check_parse_range_header()
@@ -0,0 +1,114 @@
+import json
+import xml.etree.ElementTree as ET
+
+# Optional: ijson (C-Backend) für schnelles inkrementelles JSON-Parsing.
+# Ohne ijson wird ein eigener inkrementeller Decoder auf Basis von json.JSONDecoder.raw_decode verwendet.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Streaming-Parser für Harvest-Dateien (ArXiv Atom-XML, PubMed-JSON wie combined_results.json).
+# Beide Funktionen sind Generatoren: Es liegt immer nur ein Eintrag im Speicher,
+# egal wie groß die Datei ist.
+
+JSON_READ_CHUNK_SIZE = 64 * 1024
+
+
+def _local_name(tag: str) -> str:
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_xml_entries(xml_file, entry_tag: str = "entry"):
+    """
+    Liest eine (Atom-)XML-Datei in einem Durchlauf und liefert (entry, namespaces) für jeden Eintrag.
+
+    - namespaces wird aus den 'start-ns'-Events aufgebaut (kein zweiter Parse-Durchlauf nötig)
+    - bereits verarbeitete Einträge werden geleert und aus dem Wurzelelement entfernt,
+      damit der Speicherverbrauch konstant bleibt
+    """
+    namespaces = {}
+    root = None
+    for event, item in ET.iterparse(xml_file, events=("start-ns", "start", "end")):
+        if event == "start-ns":
+            prefix, uri = item
+            namespaces[prefix] = uri
+        elif event == "start":
+            if root is None:
+                root = item
+        elif _local_name(item.tag) == entry_tag:
+            yield item, namespaces
+            item.clear()
+            if root is not None:
+                root.clear()
+
+
+def _iter_json_array_fallback(file):
+    """Inkrementeller Decoder für ein JSON-Array ohne externe Abhängigkeiten."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buffer, pos, eof
+        chunk = file.read(JSON_READ_CHUNK_SIZE)
+        if not chunk:
+            eof = True
+        # Bereits verarbeiteten Teil verwerfen, damit der Puffer nicht wächst
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    # Bis zur öffnenden Klammer lesen
+    while True:
+        stripped = buffer[pos:].lstrip()
+        if stripped:
+            if stripped[0] != "[":
+                raise json.JSONDecodeError("Erwartet wurde ein JSON-Array", buffer, pos)
+            pos = len(buffer) - len(stripped) + 1
+            break
+        if eof:
+            return
+        read_more()
+
+    while True:
+        # Whitespace und Kommas zwischen den Elementen überspringen
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise json.JSONDecodeError("Unerwartetes Dateiende im JSON-Array", buffer, pos)
+            read_more()
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            read_more()
+            continue
+
+        # Ein Element, das genau am Pufferende aufhört (z.B. eine Zahl), könnte abgeschnitten sein
+        if end >= len(buffer) and not eof:
+            read_more()
+            continue
+
+        yield obj
+        pos = end
+
+
+def iter_json_array(json_file):
+    """
+    Liefert die Elemente eines JSON-Arrays (z.B. combined_results.json) einzeln,
+    ohne die komplette Datei mit json.load in den Speicher zu laden.
+    """
+    if ijson is not None:
+        with open(json_file, "rb") as f:
+            yield from ijson.items(f, "item", use_float=True)
+    else:
+        with open(json_file, "r", encoding="utf-8") as f:
+            yield from _iter_json_array_fallback(f)
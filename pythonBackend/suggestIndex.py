@@ -0,0 +1,144 @@
+import re
+import heapq
+import unicodedata
+import numpy as np
+
+# In-Memory-Präfixindex für Typeahead (/suggest) über Paper-Titel und Autorennamen.
+#
+# Aufbau: sortiertes Array aller Schlüssel + Binärsuche. Jeder Titel/Name wird ab jedem Wortanfang
+# eingetragen ("deep learning for robots" -> "deep learning...", "learning for...", "for robots", "robots"),
+# damit auch Wörter mitten im Titel gefunden werden. Für sehr kurze Präfixe (viele Treffer) sind die
+# Top-k-Ergebnisse vorberechnet, sodass jede Anfrage ohne Datenbank in deutlich unter 1 ms beantwortet wird.
+#
+# Die großen Teile (Schlüssel, Entry-Ids, Typ und Score je Eintrag) liegen als ein bytes-Block plus
+# numpy-Arrays vor, nicht als Listen von Python-Objekten. Eine Anfrage schreibt damit keine Referenzzähler
+# in diese Seiten, sodass sie nach dem fork der gunicorn-Worker geteilt bleiben. Text und Id eines Eintrags
+# sind Python-Objekte und werden nur für die zurückgegebenen Treffer angefasst.
+
+SHORT_PREFIX_LENGTH = 3
+MAX_K = 20
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NO_IDS = np.zeros(0, dtype=np.int32)
+
+
+def normalize_text(text: str) -> str:
+    """'Kühne, Hilde' -> 'kuhne hilde'"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+class SuggestIndex:
+    def __init__(self, entries=()):
+        """
+        entries: Iterable von (kind, text, score, ref), z.B. ("title", "Deep Learning ...", 42, "65a1...").
+        """
+        kind_ids = {}             # kind -> Nummer in self._kind_names
+        kinds, scores = [], []
+        self._kind_names = []
+        self._texts = []
+        self._refs = []
+
+        pairs = []
+        for kind, text, score, ref in entries:
+            if not text:
+                continue
+            entry_id = len(self._texts)
+            if kind not in kind_ids:
+                kind_ids[kind] = len(self._kind_names)
+                self._kind_names.append(kind)
+            kinds.append(kind_ids[kind])
+            scores.append(score or 0)
+            self._texts.append(text)
+            self._refs.append(ref)
+            tokens = normalize_text(text).split()
+            for i in range(len(tokens)):
+                pairs.append((" ".join(tokens[i:]).encode("utf-8"), entry_id))
+
+        pairs.sort()
+        self._kinds = np.array(kinds, dtype=np.uint8)
+        self._scores = np.array(scores, dtype=np.int64)
+        # Schlüssel i = _key_blob[_key_offsets[i]:_key_offsets[i + 1]]
+        self._key_blob = b"".join(key for key, _ in pairs)
+        self._key_offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+        np.cumsum([len(key) for key, _ in pairs], out=self._key_offsets[1:])
+        self._entry_ids = np.array([entry_id for _, entry_id in pairs], dtype=np.int32)
+        self._short_prefix_top = self._precompute_short_prefixes(pairs, kinds)
+
+    def __len__(self):
+        return len(self._texts)
+
+    def _precompute_short_prefixes(self, pairs: list, kinds: list) -> dict:
+        """Top-k je (Präfix, Typ) für alle Präfixe bis SHORT_PREFIX_LENGTH Zeichen."""
+        candidates = {}
+        for key, entry_id in pairs:
+            key = key.decode("utf-8")
+            kind = self._kind_names[kinds[entry_id]]
+            for length in range(1, min(SHORT_PREFIX_LENGTH, len(key)) + 1):
+                prefix = key[:length]
+                candidates.setdefault((prefix, None), set()).add(entry_id)
+                candidates.setdefault((prefix, kind), set()).add(entry_id)
+
+        return {
+            key: np.array(heapq.nlargest(MAX_K, ids, key=lambda i: self._scores[i]), dtype=np.int32)
+            for key, ids in candidates.items()
+        }
+
+    def _key(self, i: int) -> bytes:
+        return self._key_blob[self._key_offsets[i]:self._key_offsets[i + 1]]
+
+    def _bisect_left(self, value: bytes, lo: int = 0) -> int:
+        hi = len(self._entry_ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _range(self, prefix: str):
+        prefix = prefix.encode("utf-8")
+        lo = self._bisect_left(prefix)
+        hi = self._bisect_left(prefix + b"\xff", lo)
+        return lo, hi
+
+    def suggest(self, query: str, k: int = 10, kind: str = None) -> list:
+        """Liefert die Top-k Treffer (nach Score, z.B. Zitationen), deren Wortanfang mit query beginnt."""
+        prefix = normalize_text(query)
+        if not prefix:
+            return []
+        k = max(1, min(k, MAX_K))
+
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            top_ids = self._short_prefix_top.get((prefix, kind), _NO_IDS)[:k]
+        else:
+            lo, hi = self._range(prefix)
+            ids = np.unique(self._entry_ids[lo:hi])
+            if kind is not None:
+                if kind not in self._kind_names:
+                    return []
+                ids = ids[self._kinds[ids] == self._kind_names.index(kind)]
+            top_ids = ids[np.argsort(-self._scores[ids], kind="stable")[:k]]
+
+        return [
+            {
+                "type": self._kind_names[self._kinds[i]],
+                "text": self._texts[i],
+                "score": int(self._scores[i]),
+                "id": self._refs[i],
+            }
+            for i in top_ids.tolist()
+        ]
+
+
+def build_suggest_index(papers_col, authors_col) -> SuggestIndex:
+    """Lädt Titel und Autorennamen (nur die benötigten Felder) aus MongoDB."""
+    def entries():
+        for doc in papers_col.find({}, {"title": 1, "citationCount": 1, "citations": 1}):
+            score = doc.get("citationCount") or doc.get("citations") or 0
+            yield ("title", doc.get("title"), score, str(doc["_id"]))
+        for doc in authors_col.find({}, {"name": 1, "citations": 1}):
+            yield ("author", doc.get("name"), doc.get("citations") or 0, str(doc["_id"]))
+
+    return SuggestIndex(entries())
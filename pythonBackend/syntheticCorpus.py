@@ -0,0 +1,170 @@
+import os
+import random
+import argparse
+from datetime import date, timedelta
+from pymongo import MongoClient
+from dotenv import load_dotenv
+from authorKeys import author_key, author_keys, ensure_author_key_indexes
+from searchPlanner import ensure_search_indexes
+from viewCounter import ensure_view_indexes
+
+# Erzeugt einen synthetischen Korpus (Papers + Autoren) mit denselben Feldern wie die echten Daten,
+# z.B. für apiBenchmark.py oder um Hardware für eine bestimmte Korpusgröße abzuschätzen.
+# Die Daten sind bei gleichem --seed reproduzierbar. Standardmäßig wird in eine eigene Datenbank
+# (BENCHMARK_DB) geschrieben, damit die echten Daten nicht berührt werden.
+#
+# python syntheticCorpus.py --papers 20000 --authors 3000 --content-size 20000 --years 2015-2025 --drop
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+BENCHMARK_DB = os.getenv("BENCHMARK_DB", "hub_benchmark")
+PAPERS_COLLECTION = "papers"
+AUTHORS_COLLECTION = "authors"
+
+INSERT_BATCH = 1000
+
+FIRST_NAMES = [
+    "Kristian", "Jan", "Anna", "Carlo", "Oskar", "Lena", "Mira", "Jonas", "Sophie", "Felix", "Hannah", "Lukas",
+    "Marie", "Paul", "Laura", "David", "Julia", "Simon", "Nina", "Tim", "Eva", "Moritz", "Clara", "Ben",
+]
+LAST_NAMES = [
+    "Kersting", "Peters", "Schmidt", "Müller", "d'Eramo", "von Stryk", "Weber", "Wagner", "Becker", "Hoffmann",
+    "Schäfer", "Koch", "Richter", "Klein", "Wolf", "Neumann", "Schwarz", "Zimmermann", "Braun", "Krüger",
+    "Hartmann", "Lange", "Werner", "Krause", "Meier", "Lehmann", "Kühne", "Fischer", "Vogel", "Frank",
+]
+VOCABULARY = [
+    "learning", "deep", "neural", "network", "robot", "reinforcement", "language", "model", "graph", "causal",
+    "inference", "vision", "transformer", "policy", "probabilistic", "bayesian", "optimization", "agent",
+    "explainable", "fairness", "attention", "generative", "diffusion", "representation", "kernel", "sparse",
+    "federated", "adversarial", "symbolic", "reasoning", "planning", "control", "benchmark", "dataset",
+    "efficient", "scalable", "robust", "multimodal", "embedding", "retrieval", "tabular", "circuit",
+]
+TAGS = ["ml", "robotics", "nlp", "vision", "theory", "ethics", "systems"]
+JOURNALS = ["NeurIPS", "ICML", "ICLR", "AAAI", "IJCAI", "CVPR", "ACL", "IROS", "JMLR", None]
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(count))
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """Fließtext mit ungefähr size Zeichen."""
+    parts = []
+    length = 0
+    while length < size:
+        sentence = _words(rng, rng.randint(6, 18)).capitalize() + ". "
+        parts.append(sentence)
+        length += len(sentence)
+    return "".join(parts)[:size]
+
+
+def make_authors(rng: random.Random, count: int) -> list:
+    names = set()
+    while len(names) < count:
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        if name in names:
+            name = f"{name} {len(names)}"
+        names.add(name)
+    return [{"name": name, "name_key": author_key(name), "papers": []} for name in sorted(names)]
+
+
+def make_paper(rng: random.Random, index: int, author_names: list, content_size: int, years: tuple) -> dict:
+    day = date(rng.randint(*years), 1, 1) + timedelta(days=rng.randint(0, 364))
+    # Zitationen/Views grob potenzgesetzlich verteilt, wie bei echten Papers
+    citations = int(rng.paretovariate(1.2)) - 1
+    title = _words(rng, rng.randint(4, 10)).capitalize()
+    return {
+        "title": f"{title} ({index})",
+        "published": day.isoformat(),
+        "authors": author_names,
+        "author_keys": author_keys(author_names),
+        "relevance": round(rng.random(), 4),
+        "abstract": _text(rng, rng.randint(600, 1500)),
+        "citations": citations,
+        "views": int(rng.paretovariate(1.1)) - 1,
+        "content": _text(rng, content_size),
+        "journal": rng.choice(JOURNALS),
+        "path": f"pdfs/synthetic_{index}.pdf",
+        "path_image": f"images/synthetic_{index}.png",
+        "tag": rng.choice(TAGS),
+        "is_hess_paper": "true" if rng.random() < 0.3 else "",
+        "citationCount": citations,
+        "highlyInfluentialCitations": citations // 10,
+        "synthetic": True,
+    }
+
+
+def generate_corpus(db, papers: int = 10000, authors: int = 2000, content_size: int = 10000,
+                    years: tuple = (2015, 2025), seed: int = 42, drop: bool = False) -> dict:
+    """Schreibt den Korpus nach db und legt dieselben Indizes an wie die Produktion."""
+    rng = random.Random(seed)
+    papers_col = db[PAPERS_COLLECTION]
+    authors_col = db[AUTHORS_COLLECTION]
+    if drop:
+        papers_col.drop()
+        authors_col.drop()
+
+    author_docs = make_authors(rng, authors)
+    # Wenige Autoren schreiben viele Papers
+    author_weights = [1 / (rank + 1) for rank in range(len(author_docs))]
+
+    batch = []
+    paper_authors = []
+    for index in range(papers):
+        chosen = set(rng.choices(range(len(author_docs)), weights=author_weights, k=rng.randint(1, 6)))
+        paper_authors.append(chosen)
+        batch.append(make_paper(rng, index, [author_docs[a]["name"] for a in chosen], content_size, years))
+        if len(batch) >= INSERT_BATCH:
+            ids = papers_col.insert_many(batch).inserted_ids
+            for paper_id, chosen_authors in zip(ids, paper_authors):
+                for a in chosen_authors:
+                    author_docs[a]["papers"].append(paper_id)
+            batch, paper_authors = [], []
+    if batch:
+        ids = papers_col.insert_many(batch).inserted_ids
+        for paper_id, chosen_authors in zip(ids, paper_authors):
+            for a in chosen_authors:
+                author_docs[a]["papers"].append(paper_id)
+
+    for doc in author_docs:
+        doc["hub_paper_count"] = len(doc["papers"])
+        doc["citations"] = rng.randint(0, 50000)
+        doc["h_index"] = rng.randint(0, 80)
+        doc["highly_influential_citations"] = doc["citations"] // 10
+        doc["image_path"] = "images/placeholder_author.png"
+    for start in range(0, len(author_docs), INSERT_BATCH):
+        authors_col.insert_many(author_docs[start:start + INSERT_BATCH])
+
+    ensure_author_key_indexes(db)
+    ensure_search_indexes(papers_col)
+    ensure_view_indexes(papers_col)
+
+    print(f"[Corpus] {papers} Papers, {authors} Autoren, ~{content_size} Zeichen Volltext, Jahre {years[0]}-{years[1]}.")
+    return {"papers": papers, "authors": authors, "content_size": content_size, "years": list(years), "seed": seed}
+
+
+def parse_years(value: str) -> tuple:
+    """'2015-2025' -> (2015, 2025)"""
+    first, _, last = value.partition("-")
+    return (int(first), int(last or first))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Erzeugt einen synthetischen Korpus für Benchmarks.")
+    parser.add_argument("--papers", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=2000)
+    parser.add_argument("--content-size", type=int, default=10000, help="Zeichen Volltext pro Paper")
+    parser.add_argument("--years", type=parse_years, default=(2015, 2025), help="z.B. 2015-2025")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=BENCHMARK_DB, help="Zieldatenbank (Default: BENCHMARK_DB)")
+    parser.add_argument("--drop", action="store_true", help="papers/authors vorher leeren")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    generate_corpus(client[args.db], args.papers, args.authors, args.content_size, args.years, args.seed, args.drop)
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
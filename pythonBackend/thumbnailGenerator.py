@@ -0,0 +1,216 @@
+import os
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pymongo import MongoClient, UpdateOne
+from dotenv import load_dotenv
+import fitz  # PyMuPDF
+from ingestEpoch import bump_ingest_epoch
+
+# Optional: Pillow wird nur für WebP-Varianten benötigt. Ohne Pillow werden nur JPEGs erzeugt.
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Diese Datei erzeugt Vorschaubilder (Thumbnails) für alle Papers mit PDF.
+# Gerendert wird Seite 1 (oder die erste eingebettete Abbildung) in festen Größen als JPEG/WebP.
+# Die Dateinamen basieren auf dem MD5-Hash des PDFs, d.h. gleiche PDFs teilen sich ihre Thumbnails
+# und unterschiedliche Papers mit ähnlichem Titel überschreiben sich nicht mehr gegenseitig.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+PAPERS_COLLECTION = "papers"
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+THUMBNAIL_DIR = os.path.join(BASE_DIR, "images", "thumbs")
+THUMBNAIL_URL_PREFIX = "images/thumbs"
+
+# Varianten: Name -> Breite in Pixeln (Höhe ergibt sich aus dem Seitenverhältnis)
+THUMBNAIL_VARIANTS = {
+    "small": 160,
+    "medium": 320,
+    "large": 640,
+}
+JPEG_QUALITY = 80
+WEBP_QUALITY = 75
+
+
+def file_md5(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Berechnet den MD5-Hash einer Datei blockweise (ohne sie komplett in den Speicher zu laden)."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def thumbnail_paths(content_hash: str) -> dict:
+    """
+    Liefert die (relativen) Pfade aller Varianten für einen Content-Hash:
+      { "small": {"jpeg": "images/thumbs/<hash>_small.jpg", "webp": ...}, ... }
+    """
+    paths = {}
+    for variant in THUMBNAIL_VARIANTS:
+        formats = {"jpeg": f"{THUMBNAIL_URL_PREFIX}/{content_hash}_{variant}.jpg"}
+        if Image is not None:
+            formats["webp"] = f"{THUMBNAIL_URL_PREFIX}/{content_hash}_{variant}.webp"
+        paths[variant] = formats
+    return paths
+
+
+def _render_first_figure(doc, width: int):
+    """Rendert die erste eingebettete Abbildung von Seite 1 auf die Zielbreite (oder None)."""
+    page = doc[0]
+    for img in page.get_images(full=True):
+        xref = img[0]
+        pix = fitz.Pixmap(doc, xref)
+        # Alpha-Kanal entfernen und Graustufen/CMYK in RGB umwandeln, damit JPEG/WebP sie speichern können
+        if pix.alpha:
+            pix = fitz.Pixmap(pix, 0)
+        if pix.n != 3:
+            pix = fitz.Pixmap(fitz.csRGB, pix)
+        if pix.width < 32 or pix.height < 32:
+            # Icons/Logos sind keine sinnvolle Vorschau
+            continue
+        height = max(1, round(pix.height * width / pix.width))
+        return fitz.Pixmap(pix, width, height, None)
+    return None
+
+
+def _render_first_page(doc, width: int):
+    """Rendert Seite 1 direkt in der Zielbreite (kein Umweg über ein Vollbild)."""
+    page = doc[0]
+    zoom = width / page.rect.width
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+
+
+def _write_variant(pix, target_base: str):
+    """Schreibt eine gerenderte Pixmap als JPEG (und WebP, falls Pillow verfügbar ist)."""
+    jpeg_path = f"{target_base}.jpg"
+    with open(jpeg_path, "wb") as f:
+        f.write(pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY))
+
+    if Image is not None:
+        image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        image.save(f"{target_base}.webp", "WEBP", quality=WEBP_QUALITY, method=4)
+
+
+def generate_thumbnails(pdf_path: str, content_hash: str = None, source: str = "page", output_dir: str = THUMBNAIL_DIR) -> dict:
+    """
+    Erzeugt alle Thumbnail-Varianten für ein PDF und gibt die relativen Pfade zurück.
+    Bereits vorhandene Varianten (gleicher Hash) werden nicht erneut gerendert.
+
+    source: "page" rendert Seite 1, "figure" nimmt die erste Abbildung (Fallback: Seite 1).
+    Läuft in einem Worker-Prozess, muss daher eine Top-Level-Funktion bleiben.
+    """
+    if content_hash is None:
+        content_hash = file_md5(pdf_path)
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = thumbnail_paths(content_hash)
+
+    # Die Dateien liegen in output_dir; die relativen URL-Pfade bestimmen nur den Dateinamen
+    missing = {
+        variant: width for variant, width in THUMBNAIL_VARIANTS.items()
+        if not all(os.path.exists(os.path.join(output_dir, os.path.basename(p))) for p in paths[variant].values())
+    }
+    if not missing:
+        return paths
+
+    with fitz.open(pdf_path) as doc:
+        if doc.page_count == 0:
+            return {}
+        for variant, width in missing.items():
+            pix = _render_first_figure(doc, width) if source == "figure" else None
+            if pix is None:
+                pix = _render_first_page(doc, width)
+            _write_variant(pix, os.path.join(output_dir, f"{content_hash}_{variant}"))
+
+    return paths
+
+
+def _thumbnail_job(paper_id, pdf_path, content_hash, source):
+    """Worker-Wrapper: liefert (paper_id, content_hash, paths) oder (paper_id, None, Fehler)."""
+    try:
+        if content_hash is None:
+            content_hash = file_md5(pdf_path)
+        return paper_id, content_hash, generate_thumbnails(pdf_path, content_hash, source)
+    except Exception as e:
+        return paper_id, None, str(e)
+
+
+def run_thumbnail_stage(papers_col, workers: int = None, source: str = "page", force: bool = False, batch_size: int = 200,
+                        bump_epoch: bool = True):
+    """
+    Thumbnail-Stufe der Ingest-Pipeline:
+    Sucht alle Papers mit lokalem PDF, rendert fehlende Thumbnails parallel in einem
+    Prozess-Pool und speichert die Varianten-Pfade im Feld "thumbnails" des Papers.
+    bump_epoch=False: keine neue Ingest-Epoche (der Orchestrator erhöht sie einmal am Ende).
+    """
+    query = {"path": {"$nin": [None, "", "no PDF existing"]}}
+    if not force:
+        query["thumbnails"] = {"$exists": False}
+
+    cursor = papers_col.find(query, {"path": 1, "paper_md5_hash": 1, "title": 1})
+
+    updates = []
+    done = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for doc in cursor:
+            pdf_path = os.path.join(BASE_DIR, doc["path"])
+            if not os.path.exists(pdf_path):
+                print(f"[Thumbnails] PDF nicht gefunden für '{doc.get('title', '')}': {pdf_path}")
+                continue
+            futures.append(pool.submit(_thumbnail_job, doc["_id"], pdf_path, doc.get("paper_md5_hash"), source))
+
+        for future in as_completed(futures):
+            paper_id, content_hash, result = future.result()
+            if content_hash is None:
+                failed += 1
+                print(f"[Thumbnails] Fehler bei Paper {paper_id}: {result}")
+                continue
+            if not result:
+                continue
+
+            updates.append(UpdateOne(
+                {"_id": paper_id},
+                {"$set": {
+                    "thumbnails": result,
+                    "path_image": result["medium"]["jpeg"],
+                    "paper_md5_hash": content_hash
+                }}
+            ))
+            done += 1
+            if len(updates) >= batch_size:
+                papers_col.bulk_write(updates, ordered=False)
+                updates = []
+
+    if updates:
+        papers_col.bulk_write(updates, ordered=False)
+
+    print(f"[Thumbnails] {done} Papers aktualisiert, {failed} Fehler.")
+    if done and bump_epoch:
+        bump_ingest_epoch(papers_col.database, source="thumbnailGenerator")
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Erzeugt Thumbnails für alle Papers mit PDF.")
+    parser.add_argument("--workers", type=int, default=None, help="Anzahl Worker-Prozesse (Default: CPU-Kerne)")
+    parser.add_argument("--source", choices=["page", "figure"], default="page", help="Seite 1 oder erste Abbildung rendern")
+    parser.add_argument("--force", action="store_true", help="Auch Papers mit vorhandenen Thumbnails neu verarbeiten")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    run_thumbnail_stage(db[PAPERS_COLLECTION], workers=args.workers, source=args.source, force=args.force)
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
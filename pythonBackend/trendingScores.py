@@ -0,0 +1,135 @@
+import os
+import math
+import argparse
+from datetime import datetime, timedelta, timezone
+from pymongo import MongoClient, UpdateOne, DESCENDING
+from dotenv import load_dotenv
+from ingestEpoch import bump_ingest_epoch
+
+# Zeitlich abklingende Popularität ("trending_score") für die Sortierung sort=trending.
+#
+# Forward Decay: statt alle Scores laufend abzuwerten, wird jedes Ereignis beim Schreiben mit
+# exp(λ·(t - LANDMARK)) gewichtet. Neuere Ereignisse zählen dadurch exponentiell mehr, und die Reihenfolge
+# entspricht exakt einem Score mit Halbwertszeit TRENDING_HALF_LIFE_DAYS, ohne dass alte Dokumente je
+# neu geschrieben werden müssen. Der Score wird inkrementell gepflegt:
+#   - Views:      viewCounter.py addiert beim Flush views_daily.<Tag> und den gewichteten Beitrag
+#   - Zitationen: semanticScholarPipeline.py (apply) hängt einen Eintrag an citation_history an und addiert
+#                 die neu hinzugekommenen Zitationen seit dem letzten Snapshot (Zitationsgeschwindigkeit)
+#
+# python trendingScores.py baut die Scores aus views_daily/citation_history komplett neu auf (z.B. nach
+# Änderung der Gewichte) und löscht Tages-Buckets außerhalb des Fensters.
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MongoDB-uri", "mongodb://localhost:27017/")
+DB_NAME = os.getenv("db", "testdb")
+PAPERS_COLLECTION = "papers"
+
+TRENDING_HALF_LIFE_DAYS = float(os.getenv("TRENDING_HALF_LIFE_DAYS", "7"))
+# Fester Bezugspunkt; bei 7 Tagen Halbwertszeit bleiben die Gewichte ~20 Jahre im float-Bereich
+LANDMARK = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CITATION_WEIGHT = 5.0          # eine neue Zitation zählt wie 5 Views
+VIEW_WINDOW_DAYS = 30          # so lange bleiben die Tages-Buckets in views_daily erhalten
+CITATION_HISTORY_LENGTH = 24   # Anzahl gespeicherter Snapshots pro Paper
+
+DECAY_RATE = math.log(2) / TRENDING_HALF_LIFE_DAYS
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def decay_weight(when: datetime = None) -> float:
+    """Gewicht eines Ereignisses zum Zeitpunkt when (Forward Decay relativ zu LANDMARK)."""
+    when = when or _now()
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    days = (when - LANDMARK).total_seconds() / 86400
+    return math.exp(DECAY_RATE * days)
+
+
+def day_bucket(when: datetime = None) -> str:
+    return (when or _now()).strftime("%Y%m%d")
+
+
+def view_increment(count: int, when: datetime = None, weight: float = None) -> dict:
+    """$inc-Felder für count Views (Tages-Bucket + gewichteter Trending-Beitrag)."""
+    weight = decay_weight(when) if weight is None else weight
+    return {
+        f"views_daily.{day_bucket(when)}": count,
+        "trending_score": count * weight,
+    }
+
+
+def citation_snapshot_update(previous_count: int, new_count: int, when: datetime = None) -> dict:
+    """
+    Update für einen neuen Semantic-Scholar-Snapshot: Verlauf anhängen, neue Zitationen gewichtet addieren.
+    previous_count=None (erster Snapshot) zählt nichts, sonst wären alte, viel zitierte Papers sofort "trending".
+    """
+    when = when or _now()
+    gained = 0 if previous_count is None else max(0, (new_count or 0) - previous_count)
+    return {
+        "$push": {"citation_history": {
+            "$each": [{"date": when, "count": new_count or 0}],
+            "$slice": -CITATION_HISTORY_LENGTH
+        }},
+        "$inc": {"trending_score": gained * CITATION_WEIGHT * decay_weight(when)},
+    }
+
+
+def ensure_trending_index(papers_col):
+    papers_col.create_index([("trending_score", DESCENDING)])
+
+
+def compute_trending_score(doc: dict, window_start: str) -> float:
+    """Score aus den gespeicherten Rohdaten (Views im Fenster + Zitationszuwachs zwischen den Snapshots)."""
+    score = 0.0
+    for day, count in (doc.get("views_daily") or {}).items():
+        if day >= window_start:
+            score += count * decay_weight(datetime.strptime(day, "%Y%m%d").replace(tzinfo=timezone.utc))
+
+    history = doc.get("citation_history") or []
+    for previous, current in zip(history, history[1:]):
+        gained = max(0, current.get("count", 0) - previous.get("count", 0))
+        score += gained * CITATION_WEIGHT * decay_weight(current.get("date"))
+    return score
+
+
+def recompute_trending_scores(papers_col, batch_size: int = 1000) -> int:
+    """Baut trending_score für alle Papers mit Aktivität neu auf und entfernt alte Tages-Buckets."""
+    ensure_trending_index(papers_col)
+    window_start = day_bucket(_now() - timedelta(days=VIEW_WINDOW_DAYS))
+
+    query = {"$or": [{"views_daily": {"$exists": True}}, {"citation_history.1": {"$exists": True}}]}
+    updates = []
+    count = 0
+    for doc in papers_col.find(query, {"views_daily": 1, "citation_history": 1}):
+        update = {"$set": {"trending_score": compute_trending_score(doc, window_start)}}
+        expired = {f"views_daily.{day}": "" for day in (doc.get("views_daily") or {}) if day < window_start}
+        if expired:
+            update["$unset"] = expired
+        updates.append(UpdateOne({"_id": doc["_id"]}, update))
+        count += 1
+        if len(updates) >= batch_size:
+            papers_col.bulk_write(updates, ordered=False)
+            updates = []
+    if updates:
+        papers_col.bulk_write(updates, ordered=False)
+
+    print(f"[Trending] Scores für {count} Papers neu berechnet.")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Berechnet trending_score aus views_daily und citation_history neu.")
+    parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    if recompute_trending_scores(db[PAPERS_COLLECTION]):
+        bump_ingest_epoch(db, source="trendingScores")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
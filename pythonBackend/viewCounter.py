@@ -0,0 +1,169 @@
+import os
+import threading
+from collections import Counter
+from bson import ObjectId
+from pymongo import UpdateOne, ASCENDING
+from trendingScores import view_increment, decay_weight, ensure_trending_index
+
+# Serverseitiges Zählen von Aufrufen (Feld "views") mit gepuffertem Write-Behind.
+#
+# Die API ruft pro Aufruf nur record_paper(_id) bzw. record_path("pdfs/...") auf; das erhöht einen
+# Zähler im Speicher. Ein Hintergrund-Thread schreibt die gesammelten Zähler alle VIEW_FLUSH_SECONDS
+# als ein einziges bulk_write mit $inc-Operationen. So erzeugen beliebte Papers keine Schreiblast
+# pro Request auf dem Primary.
+#
+# Neben "views" werden auch die Tages-Buckets views_daily.<Tag> und trending_score erhöht (trendingScores.py).
+#
+# Optional (VIEW_LOG_PATH) wird jeder Aufruf zusätzlich an eine lokale Log-Datei angehängt. Beim Flush wird
+# das Log rotiert und nach erfolgreichem Schreiben gelöscht; Reste nach einem Absturz werden beim Start
+# erneut eingelesen, sodass keine Aufrufe verloren gehen.
+
+VIEW_FLUSH_SECONDS = float(os.getenv("VIEW_FLUSH_SECONDS", "10"))
+VIEW_LOG_PATH = os.getenv("VIEW_LOG_PATH", "")
+MAX_PENDING_KEYS = 5000        # ab so vielen verschiedenen Schlüsseln wird sofort geflusht
+
+ID_PREFIX = "id:"
+PATH_PREFIX = "path:"
+
+
+def ensure_view_indexes(papers_col):
+    """PDF-Aufrufe werden über das Feld "path" zugeordnet; trending_score ist Sortierfeld."""
+    papers_col.create_index([("path", ASCENDING)])
+    ensure_trending_index(papers_col)
+
+
+class ViewCounter:
+    def __init__(self, papers_col, flush_interval: float = VIEW_FLUSH_SECONDS, log_path: str = VIEW_LOG_PATH):
+        self.papers_col = papers_col
+        self.flush_interval = flush_interval
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = Counter()
+        self._log = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushed_views = 0
+        self.flushes = 0
+
+    # -----------------------------------
+    # Zählen (im Request)
+    # -----------------------------------
+
+    def _record(self, key: str):
+        with self._lock:
+            self._pending[key] += 1
+            if self._log is not None:
+                self._log.write(key + "\n")
+            should_flush = len(self._pending) >= MAX_PENDING_KEYS
+        if should_flush:
+            threading.Thread(target=self.flush, daemon=True).start()
+
+    def record_paper(self, paper_id):
+        self._record(ID_PREFIX + str(paper_id))
+
+    def record_path(self, path: str):
+        self._record(PATH_PREFIX + path)
+
+    # -----------------------------------
+    # Write-Behind
+    # -----------------------------------
+
+    def _replay_logs(self):
+        """Liest nicht geflushte Log-Reste (z.B. nach einem Absturz) wieder in den Puffer ein."""
+        for path in (self.log_path + ".flushing", self.log_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    key = line.strip()
+                    if key:
+                        self._pending[key] += 1
+            os.remove(path)
+
+    def _open_log(self):
+        # zeilengepuffert: jeder Aufruf landet sofort in der Datei (ein write-Syscall, kein fsync)
+        self._log = open(self.log_path, "a", encoding="utf-8", buffering=1)
+
+    def _to_update(self, key: str, count: int, weight: float):
+        increment = {"views": count, **view_increment(count, weight=weight)}
+        if key.startswith(ID_PREFIX):
+            try:
+                return UpdateOne({"_id": ObjectId(key[len(ID_PREFIX):])}, {"$inc": increment})
+            except Exception:
+                return None
+        return UpdateOne({"path": key[len(PATH_PREFIX):]}, {"$inc": increment})
+
+    def flush(self) -> int:
+        """Schreibt alle gepufferten Zähler in einem bulk_write; gibt die Anzahl gezählter Aufrufe zurück."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, Counter()
+                rotated = None
+                if self._log is not None:
+                    self._log.close()
+                    rotated = self.log_path + ".flushing"
+                    os.replace(self.log_path, rotated)
+                    self._open_log()
+
+            if not pending:
+                if rotated:
+                    os.remove(rotated)
+                return 0
+
+            weight = decay_weight()
+            updates = [u for u in (self._to_update(k, c, weight) for k, c in pending.items()) if u is not None]
+            try:
+                if updates:
+                    self.papers_col.bulk_write(updates, ordered=False)
+            except Exception as e:
+                # Zähler zurück in den Puffer, beim nächsten Flush erneut versuchen
+                print(f"[Views] Flush fehlgeschlagen, wird wiederholt: {e}")
+                with self._lock:
+                    self._pending.update(pending)
+                    if rotated:
+                        # Die Einträge stehen bereits im aktuellen Puffer; das rotierte Log anhängen, damit sie
+                        # auch nach einem Absturz nicht verloren gehen
+                        with open(rotated, "r", encoding="utf-8") as f:
+                            self._log.write(f.read())
+                if rotated:
+                    os.remove(rotated)
+                return 0
+
+            if rotated:
+                os.remove(rotated)
+            total = sum(pending.values())
+            self.flushed_views += total
+            self.flushes += 1
+            return total
+
+    def _run(self):
+        # Im Thread, damit startup() nicht auf MongoDB wartet
+        try:
+            ensure_view_indexes(self.papers_col)
+        except Exception as e:
+            print(f"[Views] Index auf 'path' konnte nicht angelegt werden: {e}")
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        if self.log_path:
+            self._replay_logs()
+            self._open_log()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="view-counter", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Beendet den Hintergrund-Thread und schreibt den Rest."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 5)
+            self._thread = None
+        self.flush()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+                if os.path.exists(self.log_path) and os.path.getsize(self.log_path) == 0:
+                    os.remove(self.log_path)